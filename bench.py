@@ -0,0 +1,391 @@
+"""
+Benchmark suite of the learner hot paths.
+
+Synthetic sets are generated from a seed, exercises are answered headlessly by an
+AnswerOracle through the Engine. The command line is started in new processes to time
+its first question. Results are written as json, compare two result files to find
+regressions in load time, per-question latency, search, startup time and memory.
+
+usage:
+python bench.py --sizes 1000 100000 --output results.json
+python bench.py --sizes 1000 100000 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import cycle
+
+from learner import Engine, LearnSet, Question, Scores, TextIndex, load_set, save_set, set_from_file, tokens
+
+DEFAULT_SIZES = [10, 1000, 100000]
+REGRESSION = 0.2
+MIN_DIFFERENCE = 1e-3
+
+
+def generate_cards(cards: int, hints: tuple[int, int] = (1, 4), term_length: tuple[int, int] = (4, 16), years: float = 0.1, seed: int = 1):
+    """
+    Generate synthetic cards.
+
+    variables:
+    cards - number of cards
+    hints - minimum and maximum number of hints of a card
+    term_length - minimum and maximum length of a term, terms with more than 8 letters have two words
+    years - share of cards with a year
+    seed - random seed, the same seed gives the same cards
+
+    yields:
+    (term, year or None, definition) for every card, terms are unique
+    """
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    for number in range(cards):
+        length = rng.randint(*term_length)
+        term = "".join(rng.choices(letters, k=max(length - 6, 1))) + f"{number:06x}"
+        if length > 8:
+            term = term[:length // 2] + " " + term[length // 2:]
+        year = str(rng.randint(1000, 2024)) if rng.random() < years else None
+        definition = ". ".join(
+            " ".join("".join(rng.choices(letters, k=rng.randint(2, 9))) for _ in range(rng.randint(3, 10)))
+            for _ in range(rng.randint(*hints))
+        )
+        if rng.random() < 0.3:
+            definition = f"{definition}. the {term} again"
+        yield term, year, definition
+
+
+def generate_file(file_name: str, cards: int, **options) -> str:
+    """
+    Write a synthetic set file, see generate_cards.
+
+    returns:
+    file_name
+    """
+    with open(file_name, "w", encoding="UTF-8") as file:
+        for term, year, definition in generate_cards(cards, **options):
+            file.write(f"{term} - {year} - {definition}\n" if year else f"{term} - {definition}\n")
+    return file_name
+
+
+def generate_set(cards: int, **options) -> LearnSet:
+    """Create a synthetic LearnSet in memory, see generate_cards."""
+    learn_set = LearnSet("bench")
+    for term, year, definition in generate_cards(cards, **options):
+        learn_set.add_card(term, definition, year=year)
+    return learn_set
+
+
+class AnswerOracle:
+    """
+    Scripted learner.
+
+    Answers Engine questions correctly with a probability, otherwise with a typo
+    or another term, so typo checks and closest terms are exercised too.
+    """
+
+    def __init__(self, learn_set: LearnSet, correct: float = 0.7, typo: float = 0.15, seed: int = 1) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        learn_set - answered set
+        correct - probability of a correct answer
+        typo - probability of a typo of the correct answer
+        seed - random seed
+        """
+        self.set = learn_set
+        self.correct = correct
+        self.typo = typo
+        self.rng = random.Random(seed)
+
+    def term(self, expected: str) -> str:
+        """A correct, misspelled or wrong term."""
+        roll = self.rng.random()
+        if roll < self.correct:
+            return expected
+        if roll < self.correct + self.typo and len(expected) > 2:
+            position = self.rng.randrange(len(expected))
+            return expected[:position] + self.rng.choice(string.ascii_lowercase) + expected[position + 1:]
+        return self.rng.choice(self.set.set.terms)
+
+    def answer(self, question: Question) -> str:
+        """Answer for a question."""
+        if question.exercise == "true_false":
+            return "true" if question.expected == (self.rng.random() < self.correct) else "false"
+        if question.exercise == "year":
+            return (question.expected or "") if self.rng.random() < self.correct else "0"
+        if question.exercise == "connect":
+            return ", ".join(f"{number} {self.term(term)}" for number, term in enumerate(question.expected, 1))
+        return self.term(question.expected)
+
+    def overwrite(self) -> bool:
+        """Typo overwrite decision."""
+        return self.rng.random() < 0.5
+
+
+def timed(function, repeat: int) -> dict:
+    """
+    Call function repeat times.
+
+    returns:
+    dictionary of calls, total seconds, mean, median and 99th percentile seconds per call
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "calls": repeat,
+        "seconds": sum(times),
+        "mean": sum(times) / repeat,
+        "median": times[repeat // 2],
+        "p99": times[min(int(repeat * 0.99), repeat - 1)],
+    }
+
+
+def measured(function, memory: bool = True) -> tuple[object, dict]:
+    """
+    Call function, measuring time and allocated memory.
+
+    The time is measured without tracing, memory tracing slows the call down.
+    Peak memory is measured by a second, traced call.
+
+    returns:
+    result of the first call
+    dictionary of seconds and peak allocated bytes
+    """
+    start = time.perf_counter()
+    result = function()
+    results = {"seconds": time.perf_counter() - start}
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            results["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, results
+
+
+def quiet(function):
+    """Run function with stdout discarded, the set functions print feedback."""
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            return function()
+        finally:
+            sys.stdout = stdout
+
+
+def bench_load(directory: str, cards: int, seed: int) -> tuple[LearnSet, dict]:
+    """Parse a file, load it from the compiled cache, and save and load the binary format."""
+    file_name = generate_file(os.path.join(directory, f"bench_{cards}.txt"), cards, seed=seed)
+    results = {"file_bytes": os.path.getsize(file_name)}
+    learn_set, results["parse"] = measured(lambda: quiet(lambda: set_from_file(file_name, cache=False)))
+    quiet(lambda: set_from_file(file_name, cache=True))
+    _, results["cached"] = measured(lambda: quiet(lambda: set_from_file(file_name, cache=True)))
+    binary = os.path.join(directory, f"bench_{cards}.lset")
+    _, results["save_set"] = measured(lambda: save_set(binary, learn_set))
+    _, results["load_set"] = measured(lambda: quiet(lambda: load_set(binary)))
+    return learn_set, results
+
+
+def bench_startup(file_name: str, repeat: int = 5) -> dict:
+    """
+    Time from starting "cli.py learn" in a new process to its first question.
+
+    The first run writes the compiled cache, the timed runs load it.
+    """
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py"), "learn", file_name]
+
+    def first_question() -> None:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=os.environ | {"PYTHONUNBUFFERED": "1"}, text=True)
+        try:
+            for line in process.stdout:
+                if line.startswith("#####"):
+                    return None
+            raise RuntimeError(f"{command} asked no question")
+        finally:
+            process.kill()
+            process.wait()
+
+    first_question()
+    return timed(first_question, repeat)
+
+
+def bench_exercises(learn_set: LearnSet, questions: int, seed: int) -> dict:
+    """Time question building and answer checking of every exercise, and picking terms."""
+    oracle = AnswerOracle(learn_set, seed=seed)
+    random.seed(seed)
+    results = {"get_random": timed(lambda: learn_set.get_random(1), questions)}
+    engine = Engine(learn_set, Scores.detached(learn_set.set))
+    exercises = [
+        ("multiple_choice", lambda: engine.multiple_choice(4)),
+        ("multiple_choice_hard", lambda: engine.multiple_choice(4, hard=True)),
+        ("write", engine.write),
+        ("true_false", engine.true_false),
+        ("year", engine.year),
+        ("connect", lambda: engine.connect(min(8, len(learn_set.set)))),
+    ]
+    for name, build in exercises:
+        built = []
+        results[f"{name}_question"] = timed(lambda: built.append(build()), questions)
+        pending = iter(built)
+
+        def check() -> None:
+            question = next(pending)
+            answer = oracle.answer(question)
+            if engine.answer(question, answer).pending:
+                engine.answer(question, answer, oracle.overwrite())
+
+        results[f"{name}_check"] = timed(check, questions)
+    terms = [oracle.term(learn_set.set.terms[index]) for index in random.sample(range(len(learn_set.set)), min(questions, len(learn_set.set)))]
+    answers = iter(terms * (questions // len(terms) + 1))
+    results["closest"] = timed(lambda: learn_set.closest(next(answers)), questions)
+    return results
+
+
+def bench_search(learn_set: LearnSet, queries: int, seed: int) -> dict:
+    """Build the search index, time word, two word and prefix queries of the words of random cards, and filtered sets."""
+    rng = random.Random(seed)
+    store = learn_set.set
+
+    def build() -> TextIndex:
+        index = TextIndex()
+        index.refresh(store)
+        return index
+
+    index, results = measured(build)
+    results = {"build": results}
+    words = [tokens(" ".join(store.hints(rng.randrange(len(store))))) for _ in range(queries)]
+    words = [card for card in words if card] or [["none"]]
+    single = cycle([rng.choice(card) for card in words])
+    double = cycle([" ".join(rng.sample(card, min(2, len(card)))) for card in words])
+    prefix = cycle([f"{rng.choice(card)[:2]}*" for card in words])
+    results["word"] = timed(lambda: index.query(store, next(single)), queries)
+    results["two_words"] = timed(lambda: index.query(store, next(double)), queries)
+    results["prefix"] = timed(lambda: index.query(store, next(prefix)), queries)
+    learn_set.text = index
+    results["filtered_set"] = timed(lambda: quiet(lambda: learn_set.search(next(double))), queries)
+    return results
+
+
+def bench_learn(learn_set: LearnSet, answers: int, seed: int) -> dict:
+    """Drive a learn session with the oracle: scheduler pick, question and check per answer."""
+    oracle = AnswerOracle(learn_set, seed=seed)
+    engine = Engine(learn_set, Scores.detached(learn_set.set))
+    _, setup = measured(engine.start_learn, memory=False)
+
+    def step() -> None:
+        question = engine.next()
+        if question is None:
+            engine.start_learn()
+            question = engine.next()
+        answer = oracle.answer(question)
+        if engine.answer(question, answer).pending:
+            engine.answer(question, answer, oracle.overwrite())
+
+    return {"setup": setup, "answer": timed(step, answers)}
+
+
+def run(sizes: list[int], questions: int = 1000, seed: int = 1) -> dict:
+    """
+    Run the suite for every set size.
+
+    returns:
+    dictionary of environment and results per size
+    """
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "questions": questions,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for cards in sizes:
+            learn_set, load = bench_load(directory, cards, seed)
+            report["sizes"][str(cards)] = {
+                "load": load,
+                "startup": bench_startup(os.path.join(directory, f"bench_{cards}.txt")),
+                "exercises": bench_exercises(learn_set, questions, seed),
+                "search": bench_search(learn_set, questions, seed),
+                "learn": bench_learn(learn_set, questions, seed),
+            }
+            del learn_set
+    return report
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Flatten nested results into "size/group/name/metric" keys."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}/"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float = REGRESSION) -> list[tuple[str, float, float]]:
+    """
+    Compare total times and peak memory of two reports.
+
+    Totals are compared instead of per call times, which are too noisy. Times that
+    differ by less than MIN_DIFFERENCE seconds are not compared.
+
+    returns:
+    list of (metric, old value, new value) that got worse by more than threshold
+    """
+    old_flat, new_flat = flatten(old["sizes"]), flatten(new["sizes"])
+    regressions = []
+    for key, value in new_flat.items():
+        if not key.endswith(("seconds", "peak_bytes")):
+            continue
+        before = old_flat.get(key)
+        if not key.endswith("peak_bytes") and value - (before or 0) < MIN_DIFFERENCE:
+            continue
+        if before and value > before * (1 + threshold):
+            regressions.append((key, before, value))
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point, returns 1 when a comparison finds regressions."""
+    parser = argparse.ArgumentParser(description="Benchmark the learner hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of cards, up to 10**7")
+    parser.add_argument("--questions", type=int, default=1000, help="questions per exercise")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results to a json file, default stdout")
+    parser.add_argument("--compare", help="json results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=REGRESSION, help="relative slow down reported as a regression")
+    arguments = parser.parse_args(argv)
+    report = run(arguments.sizes, arguments.questions, arguments.seed)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="UTF-8") as file:
+            json.dump(report, file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if arguments.compare:
+        with open(arguments.compare, "r", encoding="UTF-8") as file:
+            regressions = compare(json.load(file), report, arguments.threshold)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.6g} -> {after:.6g}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Command line front end of the learner.
+
+Every subcommand loads one set and runs one exercise, or converts or describes a set.
+Only argparse is imported at start, the learner is imported when a subcommand runs.
+Set files are loaded from their compiled cache ({file_name}.lset, see set_from_file)
+when it is up to date, so a large set asks its first question without parsing the file.
+
+usage:
+python cli.py learn example.txt --round-length 7
+python cli.py test example.txt --config test.json --seed 1
+python cli.py flashcards example.txt --below 3
+python cli.py convert example.txt example.lset
+python cli.py stats example.txt
+python cli.py learn example.txt --history answers.lhst --learner ann
+python cli.py stats example.txt --history answers.lhst
+python cli.py learn example.txt --search "revol* france"
+"""
+import sys
+
+
+def load(arguments):
+    """
+    Load the set of the arguments.
+
+    Files ending with .lset are binary sets (see save_set), other files are set files.
+    With --search only the cards that match the query are used, see LearnSet.search.
+
+    returns:
+    LearnSet
+    """
+    import learner
+
+    if arguments.file.endswith(learner.CACHE_SUFFIX):
+        learn_set = learner.load_set(arguments.file, arguments.name)
+    else:
+        learn_set = learner.set_from_file(
+            arguments.file,
+            arguments.name,
+            arguments.card_delimiter,
+            arguments.definition_delimiter,
+            arguments.hint_delimiter,
+            not arguments.no_cache,
+            arguments.ignore_case,
+            arguments.inflections,
+            arguments.others
+        )
+    return learn_set.search(arguments.search) if arguments.search else learn_set
+
+
+def analyze(arguments, learn_set) -> None:
+    """Record the answers to the answer history file of --history, it is created when it does not exist."""
+    if arguments.history:
+        import os
+        from learner import AnswerHistory
+
+        learn_set.analyze(arguments.learner, AnswerHistory.load(arguments.history) if os.path.exists(arguments.history) else None)
+
+
+def save_history(arguments, learn_set) -> None:
+    """Save the answer history of --history."""
+    if arguments.history and learn_set.history is not None:
+        learn_set.history.save(arguments.history)
+
+
+def learn(arguments) -> int:
+    """Learn subcommand."""
+    learn_set = load(arguments)
+    analyze(arguments, learn_set)
+    if arguments.progress:
+        learn_set.track(arguments.progress)
+    if arguments.watch:
+        learn_set.watch(arguments.file, arguments.card_delimiter, arguments.definition_delimiter, arguments.hint_delimiter, arguments.ignore_case, arguments.inflections, arguments.others)
+    try:
+        learn_set.learn(arguments.round_length, arguments.ask_years, resume=bool(arguments.progress))
+    finally:
+        save_history(arguments, learn_set)
+    return 0
+
+
+def test(arguments) -> int:
+    """Test subcommand, the configuration is a json list of [exercise, count] pairs or section dictionaries."""
+    learn_set = load(arguments)
+    analyze(arguments, learn_set)
+    try:
+        if arguments.config:
+            import json
+
+            with open(arguments.config, "r", encoding="UTF-8") as file:
+                learn_set.test(json.load(file), arguments.seed)
+        else:
+            learn_set.test(seed=arguments.seed)
+    finally:
+        save_history(arguments, learn_set)
+    return 0
+
+
+def flashcards(arguments) -> int:
+    """Flashcards subcommand, --lazy browses the file with a CardFile instead of loading the set."""
+    if arguments.lazy:
+        from learner import CardFile, LearnSet
+
+        source = CardFile(arguments.file, arguments.card_delimiter, arguments.definition_delimiter, arguments.hint_delimiter)
+        try:
+            LearnSet(arguments.name).flashcards(source=source)
+        finally:
+            source.close()
+        return 0
+    load(arguments).flashcards(arguments.below)
+    return 0
+
+
+def convert(arguments) -> int:
+    """Convert subcommand, writes a binary set when the output ends with .lset, a set file otherwise."""
+    from learner import CACHE_SUFFIX, save_set, save_set_to_file
+
+    learn_set = load(arguments)
+    if arguments.output.endswith(CACHE_SUFFIX):
+        save_set(arguments.output, learn_set)
+    else:
+        save_set_to_file(arguments.output, learn_set, arguments.card_delimiter, arguments.definition_delimiter)
+    print(f"{len(learn_set.set)} cards written to {arguments.output}")
+    return 0
+
+
+def stats(arguments) -> int:
+    """Stats subcommand, prints the size, duplicates, years, hints and scores of a set, and the answer statistics of --history."""
+    import time
+    from learner import MASTERY
+
+    start = time.perf_counter()
+    learn_set = load(arguments)
+    seconds = time.perf_counter() - start
+    store = learn_set.set
+    cards = len(store)
+    terms = len(store.index)
+    years = sum(year is not None for year in store.years)
+    hints = sum(map(len, map(store.hints, range(cards)))) if arguments.search else (store.card_ends[-1] if cards else 0)
+    scores = [score for _, score in learn_set.correct.items()]
+    print(f"Cards: {cards}")
+    print(f"Terms: {terms}")
+    print(f"Duplicate cards: {cards - terms}")
+    print(f"Cards with a year: {years}")
+    print(f"Hints per card: {hints / cards if cards else 0:.2f}")
+    print(f"Learned terms: {sum(score >= MASTERY for score in scores)}")
+    print(f"Started terms: {sum(0 < score < MASTERY for score in scores)}")
+    print(f"Load time: {seconds * 1000:.1f} ms")
+    if arguments.history:
+        history_stats(arguments)
+    return 0
+
+
+def history_stats(arguments) -> None:
+    """Print the accuracy by exercise, typo overwrite rate, time to mastery and hardest terms of the --history file."""
+    from learner import AnswerHistory
+
+    history = AnswerHistory.load(arguments.history)
+    learner = arguments.learner or None
+    print(f"Answers: {len(history)}")
+    for exercise, accuracy in history.accuracy(learner).items():
+        print(f"Accuracy of {exercise}: {accuracy['accuracy'] * 100:.1f} % of {accuracy['answers']} answers")
+    print(f"Typos overwritten: {history.typo_overwrite_rate(learner) * 100:.1f} %")
+    mastery = history.time_to_mastery(learner=learner)
+    if mastery.count:
+        print(f"Time to mastery: median {mastery.percentile(0.5) / 60:.1f} min, 90 % {mastery.percentile(0.9) / 60:.1f} min of {mastery.count} terms")
+    for term, accuracy, answers in history.hardest(learner=learner):
+        print(f"Hard term: {term} ({accuracy * 100:.1f} % of {answers} answers)")
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point, returns the exit status."""
+    import argparse
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("file", help="set file, or a binary set ending with .lset")
+    common.add_argument("--name", default="default", help="set name")
+    common.add_argument("--card-delimiter", default="\n")
+    common.add_argument("--definition-delimiter", default=" - ")
+    common.add_argument("--hint-delimiter", default=". ")
+    common.add_argument("--no-cache", action="store_true", help="parse the file, do not use or write the compiled cache")
+    common.add_argument("--ignore-case", action="store_true", help="censor the term in any case")
+    common.add_argument("--inflections", action="store_true", help="censor inflected forms of the term")
+    common.add_argument("--others", action="store_true", help="censor other terms of the set")
+    common.add_argument("--search", help="only cards with every word of the query, a word ending with * is a prefix")
+    common.add_argument("--history", help="answer history file, answers are added to it, see AnswerHistory")
+    common.add_argument("--learner", default="", help="learner name of the answers in the history")
+
+    parser = argparse.ArgumentParser(description="Learn sets of terms and definitions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("learn", parents=[common], help="learn until every term is learned")
+    command.add_argument("--round-length", type=int, default=7)
+    command.add_argument("--ask-years", action="store_true")
+    command.add_argument("--progress", help="base name of the progress files, progress is saved and resumed")
+    command.add_argument("--watch", action="store_true", help="apply edits of the set file while learning")
+    command.set_defaults(run=learn)
+    command = commands.add_parser("test", parents=[common], help="take a test")
+    command.add_argument("--config", help="json test configuration, see LearnSet.test")
+    command.add_argument("--seed", type=int, help="seed of a reproducible test")
+    command.set_defaults(run=test)
+    command = commands.add_parser("flashcards", parents=[common], help="browse the cards")
+    command.add_argument("--below", type=int, help="only cards with a score below this")
+    command.add_argument("--lazy", action="store_true", help="read cards from the file when shown, for huge files")
+    command.set_defaults(run=flashcards)
+    command = commands.add_parser("convert", parents=[common], help="convert between set files and binary sets")
+    command.add_argument("output", help="output file, a binary set when it ends with .lset")
+    command.set_defaults(run=convert)
+    command = commands.add_parser("stats", parents=[common], help="print statistics of a set")
+    command.set_defaults(run=stats)
+
+    arguments = parser.parse_args(argv)
+    try:
+        return arguments.run(arguments)
+    except (EOFError, KeyboardInterrupt):
+        print()
+        return 0
+    except (OSError, ValueError) as error:
+        print(f"{type(error).__name__}: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,275 @@
 """
 Learning tool to learn learnables for learning...
-
-TODO
-LOW PRIO:
-    # CONNECT CHECK: ASK FOR FAULTY PAIRS INDIVIDUALLY, RATHER THAN HAVING TO INSERT THE WHOLE ANSWER AGAIN
 """
-from random import randint, shuffle, sample, choice
-from difflib import SequenceMatcher
+import os
+import json
+import mmap
+import heapq
+import re
+import struct
+import sys
+import time
+import unicodedata
+import zlib
+from bisect import bisect_left, bisect_right
+from array import array
+from collections import Counter, OrderedDict
+from itertools import accumulate, chain, compress, islice
+from collections.abc import Mapping, Sequence, MutableMapping
+from functools import reduce
+from operator import and_
+from random import Random, sample, choice
+
+CACHE_SUFFIX = ".lset"
+STORE_MAGIC = b"LSET"
+STORE_VERSION = 3
+WRITE_CHUNK_SIZE = 4096
+READ_CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 1 << 14
+BLOCK_SIZE = 1 << 12
+MASTERY = 6
+DAY = 86400
+
+_HEADER = struct.Struct("<4sHI")
+_WORD = re.compile(r"[^\W_]+")
+_ASCII_WORDS = bytes(byte if chr(byte).isalnum() else 32 for byte in range(256)).lower()
+_TABLE = struct.Struct("<QQ")
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize a term or an answer for comparing.
+
+    Unicode normalized (NFKC), casefolded and whitespace collapsed.
+
+    returns:
+    normalized string
+    """
+    if text.isascii():
+        return " ".join(text.lower().split())
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def censor(term: str, definition: str) -> str:
+    """
+    Definition censor.
+
+    Removes the term from the definition and replaces it with "___".
+
+    returns:
+    censored definition
+    """
+    return definition.replace(term, "___")
+
+
+def censor_positions(term: str, definition: str) -> tuple[str, list[int]]:
+    """
+    Definition censor, that remembers where the term was.
+
+    returns:
+    censored definition
+    list of positions of the replaced terms in the censored definition
+    """
+    if not term:
+        return definition, []
+    parts = definition.split(term)
+    positions = []
+    position = len(parts[0])
+    for part in parts[1:]:
+        positions.append(position)
+        position += 3 + len(part)
+    return "___".join(parts), positions
+
+
+def uncensor(term: str, definition: str, positions, originals: dict = None) -> str:
+    """
+    Put the term back into a censored definition.
+
+    variables:
+    term - term
+    definition - censored definition
+    positions - positions of "___" that replaced the term
+    originals - dictionary of position number and replaced text, when it was not the term itself
+
+    returns:
+    raw definition
+    """
+    parts = []
+    start = 0
+    for number, position in enumerate(positions):
+        parts.append(definition[start:position])
+        parts.append(originals.get(number, term) if originals else term)
+        start = position + 3
+    parts.append(definition[start:])
+    return "".join(parts)
+
+
+def shift_offsets(offsets: array, delta: int) -> array:
+    """
+    Add delta to every offset.
+
+    The offsets are mapped in C, without a python loop per offset.
+
+    returns:
+    new array, offsets itself when delta is 0
+    """
+    return array(offsets.typecode, map(delta.__add__, offsets)) if delta else offsets
+
+
+class Censor:
+    """
+    Batch definition censor.
+
+    Besides the exact term, can censor the term in any case, inflected forms of it
+    (-s, -es, -ed, -ing, -'s) and other terms of the same set that appear in the definition.
+    Definitions are split into words once, word sequences are looked up in a table of
+    all terms, so the cost of a definition does not depend on the number of terms.
+    """
+
+    WORD = re.compile(r"\w+(?:'\w+)?")
+    SUFFIXES = ["'s", "ing", "es", "ed", "s", "d"]
+
+    def __init__(self, terms=(), ignore_case: bool = False, inflections: bool = False, others: bool = False) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        terms - all terms of the set, needed when others is True
+        ignore_case - censor the term in any case
+        inflections - censor inflected forms of the term, implies ignore_case
+        others - censor other terms of the set too
+
+        Variables:
+        self.table - set of word sequences of the terms
+        self.lengths - word counts of the terms
+        self.firsts - first words of the terms with more than one word
+        """
+        self.ignore_case = ignore_case or inflections
+        self.inflections = inflections
+        self.others = others
+        self.table: set[str] = set()
+        self.lengths = {1}
+        self.firsts: set[str] = set()
+        if others:
+            for term in terms:
+                words = self.words(term)
+                head, _, last = words.rpartition(" ")
+                if last:
+                    self.table.update(f"{head} {stem}" if head else stem for stem in self.stems(last))
+                if " " in words:
+                    self.lengths.add(words.count(" ") + 1)
+                    self.firsts.add(words.split(" ", 1)[0])
+
+    def words(self, text: str) -> str:
+        """Casefolded words of text, joined with spaces."""
+        return " ".join(self.WORD.findall(normalize(text)))
+
+    def stems(self, word: str) -> list[str]:
+        """The word and the words it can be inflected from."""
+        stems = [word]
+        if self.inflections and word[-1] in "sdg":
+            for suffix in self.SUFFIXES:
+                if word.endswith(suffix) and len(word) > len(suffix) + 1:
+                    stems.append(word[:-len(suffix)])
+                    if suffix in ("ing", "ed"):
+                        stems.append(word[:-len(suffix)] + "e")
+        return stems
+
+    def censor(self, term: str, definition: str) -> tuple[str, list[int], dict]:
+        """
+        Censor one definition.
+
+        returns:
+        censored definition
+        list of positions of "___" in the censored definition
+        dictionary of position number and replaced text, for replacements that were not the exact term
+        """
+        if not self.ignore_case and not self.others:
+            censored, positions = censor_positions(term, definition)
+            return censored, positions, {}
+        own = self.words(term)
+        own_first = own.split(" ", 1)[0]
+        head, _, last = own.rpartition(" ")
+        owns = {f"{head} {stem}" if head else stem for stem in self.stems(last)} if last else set()
+        prefix = own_first if head else min(owns, key=len, default="")
+        spans = []
+        if self.others or prefix and prefix in definition.casefold():
+            own_length = own.count(" ") + 1
+            lengths = sorted(self.lengths | {own_length} if self.others else {own_length}, reverse=True)
+            matches = [(match.start(), match.end()) for match in self.WORD.finditer(definition)]
+            words = [definition[start:end].casefold() for start, end in matches]
+            index = 0
+            while index < len(words):
+                if not self.others and not words[index].startswith(prefix):
+                    index += 1
+                    continue
+                found = 0
+                several = words[index] == own_first or words[index] in self.firsts
+                for length in lengths:
+                    if length > len(words) - index or length > 1 and not several:
+                        continue
+                    head = " ".join(words[index:index + length - 1])
+                    for last in self.stems(words[index + length - 1]):
+                        candidate = f"{head} {last}" if head else last
+                        if candidate in owns or self.others and candidate in self.table:
+                            found = length
+                            break
+                    if found:
+                        break
+                if found:
+                    spans.append((matches[index][0], matches[index + found - 1][1]))
+                    index += found
+                else:
+                    index += 1
+        if term:
+            starts = [start for start, _ in spans]
+            start = definition.find(term)
+            while start != -1:
+                end = start + len(term)
+                before = bisect_right(starts, start) - 1
+                after = before + 1
+                if (before < 0 or spans[before][1] <= start) and (after >= len(spans) or spans[after][0] >= end):
+                    spans.insert(after, (start, end))
+                    starts.insert(after, start)
+                start = definition.find(term, end)
+        parts = []
+        positions = []
+        originals = {}
+        end = 0
+        length = 0
+        for start, stop in spans:
+            parts.append(definition[end:start])
+            length += start - end
+            positions.append(length)
+            if definition[start:stop] != term:
+                originals[len(positions) - 1] = definition[start:stop]
+            parts.append("___")
+            length += 3
+            end = stop
+        parts.append(definition[end:])
+        return "".join(parts), positions, originals
+
+    def censor_all(self, terms, definitions):
+        """
+        Censor a column of definitions.
+
+        yields:
+        (censored definition, positions, originals) for every term and definition pair
+        """
+        for term, definition in zip(terms, definitions):
+            yield self.censor(term, definition)
 
 
 class LearnObject:
-    """A Learn object."""
+    """
+    A Learn object.
+
+    A LearnObject is a view of one card in a CardStore. A LearnObject created on its own holds
+    its fields until it is added to a LearnSet, which copies them into the set's store and makes
+    the object a view of the copy. Assigning term, definition, hints or year writes to the card.
+    """
+
+    __slots__ = ("_store", "index", "card")
 
     def __init__(self, term: str, definition: str, hint_delimiter: str = ". ", year: str = None) -> None:
         """
@@ -22,16 +281,173 @@ class LearnObject:
         hint_delimiter - substring where the definition is split into hints.
 
         Variables:
+        self.store - CardStore holding the card, a store of one card is made when a standalone object is asked for it
+        self.index - index of the card in self.store
+        self.card - fields of a standalone object, see fields(), None for a view
+
+        Properties:
         self.term - term
+        self.key - normalized term, used for comparing and hashing
+        self.year - year
         self.definition - definition
         self.hints - a list of hints. when doing an exercise, a hint is
                 randomly selected as the definition for the term. Allows for multiple
                 definitions to be set for one term.
         """
-        self.term = term
-        self.year = year
-        self.definition = self.definition_censor(definition)
-        self.hints = self.hint_splitter(self.definition, hint_delimiter)
+        censored, positions = censor_positions(term, definition)
+        self._store = None
+        self.index = -1
+        self.card = (term, censored, hint_delimiter, year, positions, None)
+
+    @classmethod
+    def view(cls, store: "CardStore", index: int) -> "LearnObject":
+        """
+        Create a view of a card in a store.
+
+        returns:
+        LearnObject
+        """
+        obj = cls.__new__(cls)
+        obj._store = store
+        obj.index = index
+        obj.card = None
+        return obj
+
+    @classmethod
+    def from_censored(cls, term: str, definition: str, hint_delimiter: str = ". ", year: str = None) -> "LearnObject":
+        """
+        Create a LearnObject from an already censored definition.
+
+        Used when loading compiled sets, skips definition_censor.
+
+        returns:
+        LearnObject
+        """
+        obj = cls.__new__(cls)
+        obj._store = None
+        obj.index = -1
+        obj.card = (term, definition, hint_delimiter, year, [], None)
+        return obj
+
+    @property
+    def store(self) -> "CardStore":
+        """CardStore holding the card."""
+        if self._store is None:
+            store = CardStore()
+            self.index = store.append_card(*self.card)
+            self._store = store
+            self.card = None
+        return self._store
+
+    @store.setter
+    def store(self, store: "CardStore") -> None:
+        """Make the object a view of a card of store, see CardStore.append."""
+        self._store = store
+        self.card = None
+
+    def fields(self) -> tuple:
+        """
+        Fields of the card, as CardStore.append_card takes them.
+
+        returns:
+        (term, censored definition, hint delimiter, year, censor positions, replaced texts)
+        """
+        if self._store is None:
+            return self.card
+        store, index = self._store, self.index
+        return store.terms[index], self.definition, store.delimiters[index], store.years[index], store.censored(index), store.originals(index)
+
+    def rewrite(self, term: str, definition: str, year: str | None) -> None:
+        """
+        Replace the card, keeping its hint delimiter and score.
+
+        The definition is censored for the term. The row of a stored card is replaced with
+        CardStore.splice, so the card stays a view. Cards of a LearnSet that is being learned
+        should be changed with LearnSet.patch, which also updates the scheduler.
+        """
+        censored, positions = censor_positions(term, definition)
+        if self._store is None:
+            self.card = (term, censored, self.card[2], year, positions, None)
+            return None
+        store = self._store
+        cards = CardStore()
+        cards.append_card(term, censored, store.delimiters[self.index], year, positions)
+        cards.scores[0] = store.scores[self.index]
+        store.splice(self.index, self.index + 1, cards)
+
+    @property
+    def term(self) -> str:
+        """Term, assigning it censors the definition for the new term."""
+        if self._store is None:
+            return self.card[0]
+        return self._store.terms[self.index]
+
+    @term.setter
+    def term(self, term: str) -> None:
+        """Set the term."""
+        self.rewrite(term, self.raw_definition, self.year)
+
+    @property
+    def key(self) -> str:
+        """Normalized term."""
+        if self._store is None:
+            return normalize(self.card[0])
+        return self._store.keys[self.index]
+
+    @property
+    def year(self) -> str | None:
+        """Year, None when not given."""
+        if self._store is None:
+            return self.card[3]
+        return self._store.years[self.index]
+
+    @year.setter
+    def year(self, year: str | None) -> None:
+        """Set the year."""
+        if self._store is None:
+            self.card = self.card[:3] + (year,) + self.card[4:]
+            return None
+        self._store.thaw()
+        self._store.years[self.index] = None if year is None else sys.intern(year)
+
+    @property
+    def delimiter(self) -> str:
+        """Hint delimiter."""
+        if self._store is None:
+            return self.card[2]
+        return self._store.delimiters[self.index]
+
+    @property
+    def hints(self) -> list[str]:
+        """List of hints."""
+        if self._store is None:
+            return self.card[1].split(self.card[2])
+        return self._store.hints(self.index)
+
+    @hints.setter
+    def hints(self, hints: list[str]) -> None:
+        """Set the hints, they are censored for the term."""
+        self.rewrite(self.term, self.delimiter.join(hints), self.year)
+
+    @property
+    def definition(self) -> str:
+        """Censored definition."""
+        if self._store is None:
+            return self.card[1]
+        return self.delimiter.join(self.hints)
+
+    @definition.setter
+    def definition(self, definition: str) -> None:
+        """Set the definition, it is censored for the term."""
+        self.rewrite(self.term, definition, self.year)
+
+    @property
+    def raw_definition(self) -> str:
+        """Definition before censoring."""
+        if self._store is None:
+            term, definition, _, _, positions, originals = self.card
+            return uncensor(term, definition, positions, originals)
+        return uncensor(self.term, self.definition, self._store.censored(self.index), self._store.originals(self.index))
 
     def hint_splitter(self, definition: str, hint_delimiter: str) -> list:
         """
@@ -53,313 +469,3685 @@ class LearnObject:
         returns:
         censored definition
         """
-        return definition.replace(self.term, "___")
+        return censor(self.term, definition)
 
     def lower(self) -> str:
         """
         Class lower() function.
 
-        Is needed for __eq__ function
-
         returns:
-        lowered self.term
+        normalized self.term
         """
-        return self.term.lower()
+        return self.key
 
     def __eq__(self, other) -> bool:
         """
         Class equal function.
 
-        function compares lowered self.term and a lowered string.
+        function compares normalized terms.
         will work with string and LearnObject.
 
         returns:
         bool - true if self.term and other match else false
         """
-        return self.lower() == other.lower()
+        if isinstance(other, LearnObject):
+            return self.key == other.key
+        return self.key == normalize(other)
 
+    def __hash__(self) -> int:
+        """Hash of the normalized term."""
+        return hash(self.key)
 
-class LearnSet:
-    """Set of LearnObjects, and exercise functions."""
+    def __repr__(self) -> str:
+        """Class representation."""
+        return f"LearnObject({self.term!r})"
 
-    def __init__(self, name: str, set: list[LearnObject] = [], correct: dict = {}) -> None:
+
+class StringColumn(Sequence):
+    """
+    Read-only column of strings in a utf-8 blob, used by memory-mapped stores.
+
+    String i is blob[ends[i - 1]:ends[i]]. When present is given, strings with present[i] == 0 are None.
+    """
+
+    def __init__(self, blob: memoryview, ends: memoryview, present: memoryview = None) -> None:
         """
         Class initializer.
 
         Attributes:
-        name - name of the set
-        set - list of LearnObject objects
-        correct - dictionary of term and amount of correct answers pairs
-
-        Variables:
-        self.name - name of the set
-        self.set - lost of LearnObject objects
-        self.correct - dictionary of term and amount of correct answers pairs
-        self.test_missed_answers - incorrect test answers
-        self.min_ratio - minimum ratio which lets answer overwriting. Ratio is calculated with
-                         difflib.SequenceMatcher
+        blob - utf-8 strings
+        ends - end offset of every string
+        present - optional, 0 for missing strings
         """
-        self.name = name
-        self.set: list[LearnObject] = set
-        self.correct = correct
-        self.test_missed_answers = 0
-        self.min_ratio = 0.8
-        if set:
-            self.set_info()
+        self.blob = blob
+        self.ends = ends
+        self.present = present
 
-    def __add__(self, other) -> any:
-        """
-        Class addition method.
+    def __len__(self) -> int:
+        """Number of strings."""
+        return len(self.ends)
 
-        unifies two LearnSet object together and creates a new one.
+    def __getitem__(self, index: int) -> str | None:
+        """Decode string at index."""
+        if self.present is not None and not self.present[index]:
+            return None
+        start = self.ends[index - 1] if index > 0 else 0
+        return str(self.blob[start:self.ends[index]], "UTF-8")
 
-        returns:
-        unified LearnSet with name union.
-        """
-        return LearnSet("union", self.set + other.set, self.correct | other.correct)
+    def __iter__(self):
+        """Iterate strings, an ascii blob is decoded at once and sliced."""
+        ends = self.ends.tolist()
+        blob = bytes(self.blob)
+        if blob.isascii():
+            text = blob.decode("ascii")
+            strings = [text[start:end] for start, end in zip(chain((0,), ends), ends)]
+        else:
+            strings = [str(blob[start:end], "UTF-8") for start, end in zip(chain((0,), ends), ends)]
+        if self.present is None:
+            return iter(strings)
+        return (string if present else None for string, present in zip(strings, self.present))
 
-    def set_info(self):
-        """
-        Print set info
-        """
-        print(f"Set name: {self.name}")
-        print(f"{len(self.set)} terms in the set.")
-        print(f"Typo ratio is {self.min_ratio}\n")
 
-    def add(self, obj: LearnObject) -> None:
+class TableColumn(Sequence):
+    """Read-only column of a few distinct strings, stored as ids into a table."""
+
+    def __init__(self, table: list[str], ids: memoryview) -> None:
         """
-        Add a term to the set.
+        Class initializer.
 
-        Function appends LearnObject object to self.set list.
-        also adds a record to self.correction dictionary.
+        Attributes:
+        table - list of distinct strings
+        ids - table index of every row
         """
-        self.set.append(obj)
-        self.correct[obj.term] = 0
+        self.table = table
+        self.ids = ids
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> str:
+        """String at index."""
+        return self.table[self.ids[index]]
+
+    def __iter__(self):
+        """Iterate strings."""
+        return map(self.table.__getitem__, self.ids)
+
+
+def first_indices(keys: list[str]) -> dict[str, int]:
+    """
+    Dictionary of key and index of its first occurrence, in the order of the keys.
+
+    Built in C: a dictionary keeps the position of a key when its value is replaced, so the
+    first pass is in key order, and the first occurrences of repeated keys are written over
+    the last ones from the reversed keys.
 
-    def get_result(self) -> None:
+    returns:
+    dictionary of key and index
+    """
+    index = dict(zip(keys, range(len(keys))))
+    if len(index) != len(keys):
+        index.update(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+    return index
+
+
+class MappedIndex(Mapping):
+    """
+    Read-only index of term key and index of its first card, kept in a saved store.
+
+    The index is an open addressing hash table: a key goes to slot crc32(key) & mask, or the
+    next free slot, which holds the card index + 1 (0 is an empty slot). Keys are compared
+    with the key column, so processes that map the same file share the index without
+    decoding or hashing every key. See publish_set.
+    """
+
+    def __init__(self, keys: StringColumn, slots: memoryview, rows: memoryview) -> None:
         """
-        Result function.
+        Class initializer.
 
-        prints the result of the learning session.
+        Attributes:
+        keys - key column of the store
+        slots - hash table, its length is a power of two
+        rows - sorted index of the first card of every key
         """
-        print("Your result:\n")
-        total = 0
-        for term in self.correct:
-            if self.correct[term]:
-                total += self.correct[term]
-                print(f"{term:<15}{self.correct[term]}")
-        print(f"Total: {total} out of {len(self.correct) * 6}\n")
+        self.keys = keys
+        self.slots = slots
+        self.rows = rows
+        self.mask = len(slots) - 1
 
-    def get_random(self, number: int) -> LearnObject | list[LearnObject]:
+    @staticmethod
+    def build(keys, rows: list[int]) -> array:
         """
-        Return number of random LearnObjects from self.set.
+        Hash table of the cards at rows, at most half of the slots are used.
 
         returns:
-        LearnObject, if number is 1
-        list of LearnObjects, if number is greater than 1
+        array of slots
         """
-        if number == 1:
-            return choice(self.set)
-        return sample(self.set, number)
+        size = 1 << max(3, (2 * len(rows)).bit_length())
+        mask = size - 1
+        slots = array("Q", bytes(8 * size))
+        for row in rows:
+            slot = zlib.crc32(keys[row].encode("UTF-8")) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = row + 1
+        return slots
 
-    def match_ratio(self, answer: str, correct: str) -> bool:
-        """
-        Typo checker.
+    def find(self, key: str) -> int | None:
+        """Index of the first card of key, None if not found."""
+        encoded = key.encode("UTF-8")
+        blob, ends = self.keys.blob, self.keys.ends
+        slot = zlib.crc32(encoded) & self.mask
+        while row := self.slots[slot]:
+            row -= 1
+            if blob[ends[row - 1] if row else 0:ends[row]] == encoded:
+                return row
+            slot = (slot + 1) & self.mask
+        return None
 
-        Checks for possible typos with difflib.SequenceMatcher
+    def __getitem__(self, key: str) -> int:
+        """Index of the first card of key."""
+        row = self.find(key)
+        if row is None:
+            raise KeyError(key)
+        return row
 
-        return:
-        bool - True if ratio is bigger then self.min_ratio else False
-        """
-        ratio = SequenceMatcher(None, answer, correct).ratio()
-        if ratio >= self.min_ratio:
-            return True
-        return False
+    def get(self, key: str, default: int = None) -> int | None:
+        """Index of the first card of key, default if not found."""
+        row = self.find(key)
+        return default if row is None else row
 
-    def multiple_choice(self, nr_options: int, correct: LearnObject = None) -> None:
-        """
-        Multiple choice excercise.
+    def __contains__(self, key) -> bool:
+        """Return True if a card has key."""
+        return isinstance(key, str) and self.find(key) is not None
 
-        Picks a random LearnObject from self.set and prints a random hint and multiple options.
+    def __iter__(self):
+        """Iterate keys in card order."""
+        return map(self.keys.__getitem__, self.rows)
 
-        variables:
-        nr_options - the number of choices
+    def __len__(self) -> int:
+        """Number of distinct keys."""
+        return len(self.rows)
 
-        optional:
-        correct - when provided, will use provided LearnObject as the correct answer
+    def values(self) -> memoryview:
+        """Index of the first card of every key, in card order."""
+        return self.rows
 
-        inputs:
-        answer - users answer to the question
-        """
-        if not correct:
-            correct = self.get_random(1)
-        choices = self.get_random(nr_options - 1)
-        while correct in choices:
-            choices = self.get_random(nr_options - 1)
-        choices += [correct]
-        print(choice(correct.hints) + "\n")
-        names = list(map(lambda x: x.term, choices))
-        shuffle(names)
-        print(names)
-        answer = input("Enter the correct term: ")
-        self.choice_and_answer_check(correct, answer)
-    
-    def write_answer(self, correct: LearnObject = None) -> None:
-        """
-        Writing exercise.
+    def items(self):
+        """Iterate (key, index) pairs in card order."""
+        return zip(self, self.rows)
 
-        Picks a random LearnObject from self.set.
 
-        variables:
-        optional:
-        correct - when provided, will use provided LearnObject as the correct answer
+class CardStore(Sequence):
+    """
+    Columnar card storage.
 
-        inputs:
-        answer - users answer to the question
+    Every card is a row of the columns. Terms and keys are interned strings, hints of all cards
+    are in one shared utf-8 buffer with offset arrays, scores are an array of shorts.
+    Indexing the store returns LearnObject views, which are created on access.
+
+    A store loaded with load_store reads its columns straight from a memory-mapped file, and its
+    index too when the file was saved with one (see MappedIndex). The columns are copied into
+    memory (thawed) the first time a card is added.
+    """
+
+    def __init__(self) -> None:
         """
-        if not correct:
-            correct = self.get_random(1)
-        print(choice(correct.hints) + "\n")
-        answer = input("Enter the correct term: ")
-        self.choice_and_answer_check(correct, answer)
+        Class initializer.
 
-    def choice_and_answer_check(self, correct: LearnObject, answer: str) -> None:
+        Variables:
+        self.terms - list of terms
+        self.keys - list of normalized terms
+        self.years - list of years, None when not given
+        self.delimiters - list of hint delimiters
+        self.buffer - utf-8 hints of all cards
+        self.hint_ends - end offset of every hint in self.buffer
+        self.card_ends - end index of every card in self.hint_ends
+        self.censor_positions - positions of censored terms in the definitions
+        self.censor_ends - end index of every card in self.censor_positions
+        self.censor_originals - dictionary of censor position index and replaced text, when it was not the term
+        self.scores - score of every card
+        self.index - dictionary of key and index of its first card, built on first use
+        self.mapped - True while the columns are read from a memory-mapped file
         """
-        Check whether provided answer is correct.
+        self.terms: list[str] = []
+        self.keys: list[str] = []
+        self.years: list[str | None] = []
+        self.delimiters: list[str] = []
+        self.buffer = bytearray()
+        self.hint_ends = array("Q")
+        self.card_ends = array("Q")
+        self.censor_positions = array("I")
+        self.censor_ends = array("Q")
+        self.censor_originals: dict[int, str] = {}
+        self.scores = array("h")
+        self._index: dict[str, int] | None = {}
+        self.mapped = False
 
-        Checks the multiple choice and write exercise answers.
+    def __len__(self) -> int:
+        """Number of cards."""
+        return len(self.terms)
 
-        Variables:
-        correct - the correct LearnObject object
-        answer - users answer
+    def __getitem__(self, index: int | slice) -> LearnObject | list[LearnObject]:
+        """
+        Card view.
 
-        modifications:
-        self.correct - modifies the correct LearnObjects correct value, used in learning function
-        self.test_missed_answers - modifies the amount of missed items in a test, used in test function
+        returns:
+        LearnObject, list of LearnObjects for a slice
         """
-        if correct == answer:
-            print("Correct!")
-            self.correct[correct.term] += 1
-            input("Press {enter} to continue...\n")
-        else:
-            print(f"False! Correct: {correct.term}")
-            if self.match_ratio(answer.lower(), correct.lower()):
-                if input("There seems to be a typo, overwrite? ").lower() in ["y", "yes", "true", "1", "t"]:
-                    print("Overwriting...")
-                    self.correct[correct.term] += 1
-                    input("Press {enter} to continue...\n")
-                    return None
-            self.correct[correct.term] -= 1 if self.correct[correct.term] else 0
-            self.test_missed_answers += 1
-            input("Press {enter} to continue...\n")
+        if isinstance(index, slice):
+            return [LearnObject.view(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("card index out of range")
+        return LearnObject.view(self, index)
 
-    def year(self, correct: LearnObject = None, ask: bool = True) -> None:
-        """Ask the year."""
-        if not correct:
-            correct = self.get_random(1)
-        if ask:
-            print(correct.term)
-        answer = input("Enter the correct year: ")
-        self.year_check(correct, answer)
-    
-    def year_check(self, correct: LearnObject, answer: str) -> None:
-        """Check the year."""
-        if correct.year == answer:
-            print("Correct!")
-        else:
-            print(f"False! Correct: {correct.year}")
-        input("Press {enter} to continue...\n")
+    def __add__(self, other) -> list[LearnObject]:
+        """List of the cards of both."""
+        return list(self) + list(other)
 
+    @property
+    def index(self) -> dict[str, int]:
+        """
+        Dictionary of key and index of its first card.
 
-    def learn(self, round_length: int, ask_years: bool = False) -> None:
+        Keys of a memory-mapped store are decoded into a list once, the index holds them anyway.
         """
-        Learn module.
+        if self._index is None:
+            if not isinstance(self.keys, list):
+                self.keys = list(self.keys)
+            self._index = first_indices(self.keys)
+        return self._index
 
-        Joint exercise, that uses multiple choice and write exercises.
-        keeps track of how many times a term is answered correctly.
-        dynamically changes the exercise type, if enough multiple choice
-        exercises are answered correctly.
+    def thaw(self) -> None:
+        """Copy memory-mapped columns into memory, so cards can be added."""
+        if not self.mapped:
+            return None
+        self.terms = [sys.intern(term) for term in self.terms]
+        self.keys = [sys.intern(key) for key in self.keys]
+        self.years = list(self.years)
+        self.delimiters = [sys.intern(delimiter) for delimiter in self.delimiters]
+        self.buffer = bytearray(self.buffer)
+        self.hint_ends = array("Q", self.hint_ends)
+        self.card_ends = array("Q", self.card_ends)
+        self.censor_positions = array("I", self.censor_positions)
+        self.censor_ends = array("Q", self.censor_ends)
+        self.censor_originals = dict(self.censor_originals)
+        self.scores = array("h", self.scores)
+        if not isinstance(self._index, dict):
+            self._index = None
+        self.mapped = False
 
-        finish when every term is answered correctly 6 times.
+    def append_card(self, term: str, definition: str, hint_delimiter: str = ". ", year: str = None, positions: list[int] = (), originals: dict = None) -> int:
         """
-        self.correct = {term: 0 for term in self.correct}
-        round_nr = 0
+        Add a card.
 
-        while True:
-            round_nr += 1
-            for question_number in range(round_length):
-                if all(score == 6 for score in self.correct.values()):
-                    print("Congratulations! All Done!")
-                    return None
-                print(f"##### {question_number + 1}. #####")
-                correct = self.get_random(1)
-                while self.correct[correct.term] > 5:
-                    correct = self.get_random(1)
-                if self.correct[correct.term] > 2:
-                    self.write_answer(correct)
-                else:
-                    self.multiple_choice(4, correct)
-                if correct.year:
-                    if ask_years:
-                        self.year(correct, False)
-                    else:
-                        print(correct.year)
-                        input("Press {enter} to continue...\n")
-            print("\n")
-            self.get_result()
-            if input(f"You are done with round {round_nr}! Continue? ").lower() in ["n", "no", "false", "0", "f"]:
-                print("\n")
-                break
+        variables:
+        term - term
+        definition - censored definition
+        hint_delimiter - substring where the definition is split into hints
+        year - year, optional
+        positions - positions of the censored terms in definition, see censor_positions
+        originals - replaced texts that were not the term, see Censor.censor
 
-    def connect(self, nr_options: int = 8) -> None:
+        returns:
+        index of the card
         """
-        Connect exercise.
+        self.thaw()
+        if originals:
+            first = len(self.censor_positions)
+            for number, text in originals.items():
+                self.censor_originals[first + number] = text
+        index = len(self.terms)
+        term = sys.intern(term)
+        key = normalize(term)
+        self.terms.append(term)
+        self.keys.append(term if key == term else sys.intern(key))
+        self.years.append(None if year is None else sys.intern(year))
+        self.delimiters.append(sys.intern(hint_delimiter))
+        hints = definition.encode("UTF-8").split(hint_delimiter.encode("UTF-8"))
+        end = len(self.buffer)
+        self.buffer += b"".join(hints)
+        for hint in hints:
+            end += len(hint)
+            self.hint_ends.append(end)
+        self.card_ends.append(len(self.hint_ends))
+        self.censor_positions.extend(positions)
+        self.censor_ends.append(len(self.censor_positions))
+        self.scores.append(0)
+        self.index.setdefault(key, index)
+        return index
 
-        prints a number of terms and definitions and shuffles them.
+    def extend_cards(self, terms: list[str], definitions: list[str], hint_delimiter: str = ". ", years: list = None, positions: list = None, originals: list = None) -> int:
+        """
+        Add a batch of cards.
+
+        Every column is extended at once, hints of the whole batch are encoded and
+        joined into the buffer in one go.
 
         variables:
-        nr_options - the number of randomly picked term
+        terms - list of terms
+        definitions - list of censored definitions
+        hint_delimiter - substring where the definitions are split into hints
+        years - list of years, None for no year, optional
+        positions - list of censor positions of every card, optional
+        originals - list of replaced texts of every card, optional
 
-        inputs:
-        answer - the answer to the question, has to be in Enter the correct pairs {nr} {term}, {nr} {term}, ... format.
+        returns:
+        index of the first card of the batch
         """
-        choices = self.get_random(nr_options)
-        shuffle(choices)
-        names = list(map(lambda x: x.term, choices))
-        shuffle(choices)
-        option = 1
-        for ch in choices:
-            print(f"{option}. {choice(ch.hints)}")
-            option += 1
-        print("\n")
-        print(names)
-        answer = input("\nEnter the correct pairs {nr} {term}, {nr} {term}, ...\n")
-        self.connect_check(choices, answer)
+        self.thaw()
+        first = len(self.terms)
+        terms = list(map(sys.intern, terms))
+        keys = list(map(normalize, terms))
+        self.terms += terms
+        self.keys += [term if key == term else sys.intern(key) for term, key in zip(terms, keys)]
+        self.years += [None if year is None else sys.intern(year) for year in years] if years else [None] * len(terms)
+        self.delimiters += [sys.intern(hint_delimiter)] * len(terms)
+        split = [definition.split(hint_delimiter) for definition in definitions]
+        hints = list(map(str.encode, chain.from_iterable(split)))
+        ends = accumulate(map(len, hints), initial=len(self.buffer))
+        next(ends)
+        self.hint_ends.extend(ends)
+        self.buffer += b"".join(hints)
+        ends = accumulate(map(len, split), initial=self.card_ends[-1] if self.card_ends else 0)
+        next(ends)
+        self.card_ends.extend(ends)
+        for number, card_positions in enumerate(positions or ()):
+            if originals and originals[number]:
+                start = len(self.censor_positions)
+                for position, text in originals[number].items():
+                    self.censor_originals[start + position] = text
+            self.censor_positions.extend(card_positions)
+            self.censor_ends.append(len(self.censor_positions))
+        if not positions:
+            self.censor_ends.extend([len(self.censor_positions)] * len(terms))
+        self.scores.extend(array("h", bytes(2 * len(terms))))
+        index = self.index
+        for number, key in enumerate(keys, first):
+            index.setdefault(key, number)
+        return first
 
-    def connect_answer_check(self, answer: str) -> dict:
+    def splice(self, start: int, stop: int, cards: "CardStore") -> None:
         """
-        Check the connect answer for format errors and map to dictionary.
+        Replace cards start ... stop - 1 with the cards of another store.
 
-        If an error is found, promts a new answer input.
-        maps the string input to a dictionary with definition number as the key and term as the value.
+        The columns are sliced in place, offsets of the cards after the replaced ones are
+        shifted with shift_offsets. Scores are copied from cards. The index is rebuilt on
+        next use, unless the replaced cards had the same keys.
 
-        returns:
-        dictionary of answered definition number and term pairs
+        variables:
+        start, stop - range of the replaced cards
+        cards - CardStore of the new cards, can be empty
         """
-        if "," not in answer:
-            answers = [answer.split(" ")]
-        else:
-            answers = [i.split(" ") for i in answer.split(", ")]
-        if answers == [[""]]:
-            answers = {}
-        elif not all([len(pair) == 2 and pair[0].isdigit() for pair in answers]):
-            answers = input("Format error! One or more answers are not pairs, the delimiter is wrong or pair order is reversed. Please enter the answer again.\n")
-            answers = [i.split(" ") for i in answer.split(", ")]
-        return {int(k): v for k, v in answers}
+        self.thaw()
+        first_hint = self.card_ends[start - 1] if start else 0
+        last_hint = self.card_ends[stop - 1] if stop else 0
+        first_byte = self.hint_ends[first_hint - 1] if first_hint else 0
+        last_byte = self.hint_ends[last_hint - 1] if last_hint else 0
+        first_censor = self.censor_ends[start - 1] if start else 0
+        last_censor = self.censor_ends[stop - 1] if stop else 0
+        same_keys = self.keys[start:stop] == cards.keys
+        self.hint_ends[first_hint:] = shift_offsets(cards.hint_ends, first_byte) + shift_offsets(self.hint_ends[last_hint:], len(cards.buffer) - last_byte + first_byte)
+        self.buffer[first_byte:last_byte] = cards.buffer
+        self.card_ends[start:] = shift_offsets(cards.card_ends, first_hint) + shift_offsets(self.card_ends[stop:], len(cards.hint_ends) - last_hint + first_hint)
+        self.censor_ends[start:] = shift_offsets(cards.censor_ends, first_censor) + shift_offsets(self.censor_ends[stop:], len(cards.censor_positions) - last_censor + first_censor)
+        self.censor_positions[first_censor:last_censor] = cards.censor_positions
+        if self.censor_originals or cards.censor_originals:
+            delta = len(cards.censor_positions) - last_censor + first_censor
+            originals = {number: text for number, text in self.censor_originals.items() if number < first_censor}
+            originals.update((first_censor + number, text) for number, text in cards.censor_originals.items())
+            originals.update((number + delta, text) for number, text in self.censor_originals.items() if number >= last_censor)
+            self.censor_originals = originals
+        self.terms[start:stop] = cards.terms
+        self.keys[start:stop] = cards.keys
+        self.years[start:stop] = cards.years
+        self.delimiters[start:stop] = cards.delimiters
+        self.scores[start:stop] = cards.scores
+        if not same_keys:
+            self._index = None
 
-    def connect_check(self, correct: list, answer: str) -> None:
+    def append(self, obj: LearnObject) -> int:
         """
-        Check whether provided answer is correct.
+        Copy a LearnObject into the store, obj becomes a view of the copy.
+
+        returns:
+        index of the card
+        """
+        index = self.append_card(*obj.fields())
+        obj.store = self
+        obj.index = index
+        return index
+
+    def hints(self, index: int) -> list[str]:
+        """
+        Decode hints of a card.
+
+        returns:
+        list of hints
+        """
+        first = self.card_ends[index - 1] if index else 0
+        start = self.hint_ends[first - 1] if first else 0
+        hints = []
+        for hint in range(first, self.card_ends[index]):
+            end = self.hint_ends[hint]
+            hints.append(str(self.buffer[start:end], "UTF-8"))
+            start = end
+        return hints
+
+    def texts(self, start: int = 0, stop: int = None):
+        """
+        Key and hints of cards start ... stop - 1 as one text per card, separated by newlines.
+
+        Hints are decoded in bulk, the buffer at once when it is ascii.
+
+        returns:
+        iterator of texts
+        """
+        stop = len(self) if stop is None else stop
+        first = self.card_ends[start - 1] if start else 0
+        last = self.card_ends[stop - 1] if stop else 0
+        low = self.hint_ends[first - 1] if first else 0
+        ends = shift_offsets(array("Q", self.hint_ends[first:last]), -low)
+        starts = [0] + list(ends[:-1])
+        text = str(self.buffer[low:low + ends[-1]] if ends else b"", "UTF-8")
+        if ends and len(text) == ends[-1]:
+            hints = list(map(text.__getitem__, map(slice, starts, ends)))
+        else:
+            hints = [str(self.buffer[low + begin:low + end], "UTF-8") for begin, end in zip(starts, ends)]
+        card_ends = list(shift_offsets(array("Q", self.card_ends[start:stop]), -first))
+        cards = map("\n".join, map(hints.__getitem__, map(slice, [0] + card_ends[:-1], card_ends)))
+        return map("{}\n{}".format, islice(self.keys, start, stop), cards)
+
+    def reset_scores(self) -> None:
+        """Set every score to 0."""
+        self.scores[:] = array("h", bytes(2 * len(self.scores)))
+
+    def censored(self, index: int) -> list[int]:
+        """
+        Positions of the censored terms in the definition of a card.
+
+        returns:
+        list of positions
+        """
+        start = self.censor_ends[index - 1] if index else 0
+        return list(self.censor_positions[start:self.censor_ends[index]])
+
+    def originals(self, index: int) -> dict[int, str]:
+        """
+        Replaced texts of a card that were not the term itself.
+
+        returns:
+        dictionary of position number and replaced text
+        """
+        if not self.censor_originals:
+            return {}
+        start = self.censor_ends[index - 1] if index else 0
+        return {
+            number - start: self.censor_originals[number]
+            for number in range(start, self.censor_ends[index])
+            if number in self.censor_originals
+        }
+
+
+class UnionColumn(Sequence):
+    """Column of a UnionStore, reads the same column of the member stores."""
+
+    def __init__(self, union: "UnionStore", name: str) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        union - UnionStore
+        name - name of the CardStore column
+        """
+        self.union = union
+        self.name = name
+
+    def __len__(self) -> int:
+        """Number of cards."""
+        return len(self.union)
+
+    def __getitem__(self, index: int):
+        """Value of card index."""
+        member, local = self.union.locate(index)
+        return getattr(self.union.members[member], self.name)[local]
+
+    def __iter__(self):
+        """Iterate the values of every member in order."""
+        return chain.from_iterable(getattr(member, self.name) for member in self.union.members)
+
+    def __setitem__(self, index: int, value) -> None:
+        """Set value of card index."""
+        member, local = self.union.locate(index)
+        getattr(self.union.members[member], self.name)[local] = value
+
+
+class UnionStore(Sequence):
+    """
+    Lazy union of CardStores.
+
+    Cards are not copied, indexing finds the member store with a binary search over the
+    prefix sums of the member sizes. Scores are the scores of the member stores, so
+    progress made in the union is progress made in the member sets.
+    Members should not get new cards after they are added, cards added to the union
+    go to a store of its own.
+
+    Duplicate terms are resolved by policy:
+    "first" - the first card with the term is the one that is found and scored
+    "last" - the last card with the term is the one that is found and scored
+    "error" - ValueError is raised when a duplicate term is found, the index is built when the union
+              is created, so a union of sets with duplicates is never made
+    """
+
+    POLICIES = ["first", "last", "error"]
+
+    def __init__(self, members: list = (), duplicates: str = "first") -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        members - list of CardStore or UnionStore objects, unions are flattened
+        duplicates - duplicate term policy, one of UnionStore.POLICIES
+
+        Variables:
+        self.members - list of CardStores
+        self.ends - prefix sums of member sizes
+        self.own - CardStore for cards added to the union, None until used
+        self.duplicate_indices - indices of the cards that lost to another card with the same term
+        """
+        if duplicates not in self.POLICIES:
+            raise ValueError(f"duplicates must be one of {self.POLICIES}")
+        self.duplicates = duplicates
+        self.members: list[CardStore] = []
+        self.ends: list[int] = []
+        self.own: CardStore | None = None
+        self._index: dict[str, int] | None = None
+        self.duplicate_indices: list[int] = []
+        for member in members:
+            self.add_member(member)
+        self.terms = UnionColumn(self, "terms")
+        self.keys = UnionColumn(self, "keys")
+        self.years = UnionColumn(self, "years")
+        self.scores = UnionColumn(self, "scores")
+        if duplicates == "error":
+            self.index
+
+    def __len__(self) -> int:
+        """Number of cards."""
+        return self.ends[-1] if self.ends else 0
+
+    def __getitem__(self, index: int | slice) -> LearnObject | list[LearnObject]:
+        """
+        Card view of a member store.
+
+        returns:
+        LearnObject, list of LearnObjects for a slice
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        member, local = self.locate(index)
+        return LearnObject.view(self.members[member], local)
+
+    def __add__(self, other) -> list[LearnObject]:
+        """List of the cards of both."""
+        return list(self) + list(other)
+
+    def locate(self, index: int) -> tuple[int, int]:
+        """
+        Find the member of a card.
+
+        returns:
+        (member number, index in the member)
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("card index out of range")
+        member = bisect_right(self.ends, index)
+        return member, index - (self.ends[member - 1] if member else 0)
+
+    def add_member(self, member) -> None:
+        """
+        Add a store to the union.
+
+        Cards of the new member get the indices after the current ones. When the index is
+        already built, only the new cards are indexed.
+        """
+        if isinstance(member, UnionStore):
+            for store in member.members:
+                self.add_member(store)
+            return None
+        self.members.append(member)
+        self.ends.append(len(self) + len(member))
+        if self._index is not None:
+            self.index_range(self.ends[-1] - len(member), member)
+
+    def index_range(self, start: int, member: CardStore) -> None:
+        """Add the keys of member, whose first card has index start, to the index."""
+        for local, key in enumerate(member.keys):
+            self.index_key(key, start + local)
+
+    def index_key(self, key: str, index: int) -> None:
+        """Add the key of card index to the index, following the duplicate policy. A duplicate error drops the index."""
+        if key not in self._index:
+            self._index[key] = index
+        elif self.duplicates == "error":
+            self._index = None
+            raise ValueError(f"Duplicate term: {self.terms[index]}")
+        elif self.duplicates == "last":
+            self.duplicate_indices.append(self._index[key])
+            self._index[key] = index
+        else:
+            self.duplicate_indices.append(index)
+
+    @property
+    def index(self) -> dict[str, int]:
+        """Dictionary of key and index of the card chosen by the duplicate policy, built on first use."""
+        if self._index is None:
+            self._index = {}
+            self.duplicate_indices = []
+            start = 0
+            for member in self.members:
+                self.index_range(start, member)
+                start += len(member)
+        return self._index
+
+    def append_card(self, term: str, definition: str, hint_delimiter: str = ". ", year: str = None, positions: list[int] = (), originals: dict = None) -> int:
+        """
+        Add a card to the own store of the union.
+
+        returns:
+        index of the card in the union
+        """
+        if self.own is None or self.members[-1] is not self.own:
+            self.own = CardStore()
+            self.members.append(self.own)
+            self.ends.append(len(self))
+        local = self.own.append_card(term, definition, hint_delimiter, year, positions, originals)
+        self.ends[-1] += 1
+        if self._index is not None:
+            self.index_key(self.own.keys[local], self.ends[-1] - 1)
+        return self.ends[-1] - 1
+
+    def append(self, obj: LearnObject) -> int:
+        """
+        Copy a LearnObject into the own store of the union, obj becomes a view of the copy.
+
+        returns:
+        index of the card in the union
+        """
+        index = self.append_card(*obj.fields())
+        obj.store = self.own
+        obj.index = len(self.own) - 1
+        return index
+
+    def hints(self, index: int) -> list[str]:
+        """Hints of a card, see CardStore.hints."""
+        member, local = self.locate(index)
+        return self.members[member].hints(local)
+
+    def reset_scores(self) -> None:
+        """Set every score of every member to 0."""
+        for member in self.members:
+            member.reset_scores()
+
+    def compact(self) -> CardStore:
+        """
+        Copy the union into one CardStore.
+
+        returns:
+        CardStore
+        """
+        store = CardStore()
+        for obj in self:
+            store.append_card(obj.term, obj.definition, obj.delimiter, obj.year, obj.store.censored(obj.index), obj.store.originals(obj.index))
+            store.scores[-1] = obj.store.scores[obj.index]
+        return store
+
+
+class SubsetColumn(Sequence):
+    """Column of a SubsetStore, reads the same column of the base store."""
+
+    def __init__(self, subset: "SubsetStore", name: str) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        subset - SubsetStore
+        name - name of the base store column
+        """
+        self.subset = subset
+        self.name = name
+
+    def __len__(self) -> int:
+        """Number of cards."""
+        return len(self.subset)
+
+    def __getitem__(self, index: int):
+        """Value of card index."""
+        return getattr(self.subset.base, self.name)[self.subset.rows[index]]
+
+    def __iter__(self):
+        """Iterate the values of the cards in order."""
+        return map(getattr(self.subset.base, self.name).__getitem__, self.subset.rows)
+
+    def __setitem__(self, index: int, value) -> None:
+        """Set value of card index."""
+        getattr(self.subset.base, self.name)[self.subset.rows[index]] = value
+
+
+class SubsetStore(Sequence):
+    """
+    Lazy view of some cards of a CardStore or UnionStore, see LearnSet.search.
+
+    Cards are not copied, the view keeps the indices of its cards in the base store.
+    Scores are the scores of the base store, so progress made in the view is progress made
+    in the whole set. Cards added to the view go to the base store. The view keeps the cards
+    it was made of, cards replaced in the base store later are not followed.
+    """
+
+    def __init__(self, base: "CardStore | UnionStore | SubsetStore", rows=()) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        base - store of the cards, a view of a view is flattened
+        rows - increasing card indices in base
+
+        Variables:
+        self.base - CardStore or UnionStore
+        self.rows - array of card indices in self.base
+        """
+        if isinstance(base, SubsetStore):
+            rows = [base.rows[row] for row in rows]
+            base = base.base
+        self.base = base
+        self.rows = array("Q", rows)
+        self._index: dict[str, int] | None = None
+        self.terms = SubsetColumn(self, "terms")
+        self.keys = SubsetColumn(self, "keys")
+        self.years = SubsetColumn(self, "years")
+        self.delimiters = SubsetColumn(self, "delimiters")
+        self.scores = SubsetColumn(self, "scores")
+
+    def __len__(self) -> int:
+        """Number of cards."""
+        return len(self.rows)
+
+    def __getitem__(self, index: int | slice) -> LearnObject | list[LearnObject]:
+        """
+        Card view of the base store.
+
+        returns:
+        LearnObject, list of LearnObjects for a slice
+        """
+        if isinstance(index, slice):
+            return [self.base[row] for row in self.rows[index]]
+        return self.base[self.rows[index]]
+
+    def __add__(self, other) -> list[LearnObject]:
+        """List of the cards of both."""
+        return list(self) + list(other)
+
+    @property
+    def index(self) -> dict[str, int]:
+        """Dictionary of key and index of its first card in the view, built on first use."""
+        if self._index is None:
+            self._index = first_indices(list(self.keys))
+        return self._index
+
+    def hints(self, index: int) -> list[str]:
+        """Hints of a card, see CardStore.hints."""
+        obj = self[index]
+        return obj.store.hints(obj.index)
+
+    def censored(self, index: int) -> list[int]:
+        """Censor positions of a card, see CardStore.censored."""
+        obj = self[index]
+        return obj.store.censored(obj.index)
+
+    def originals(self, index: int) -> dict[int, str]:
+        """Replaced texts of a card, see CardStore.originals."""
+        obj = self[index]
+        return obj.store.originals(obj.index)
+
+    def append_card(self, term: str, definition: str, hint_delimiter: str = ". ", year: str = None, positions: list[int] = (), originals: dict = None) -> int:
+        """
+        Add a card to the base store and to the view.
+
+        returns:
+        index of the card in the view
+        """
+        self.rows.append(self.base.append_card(term, definition, hint_delimiter, year, positions, originals))
+        if self._index is not None:
+            self._index.setdefault(self.keys[-1], len(self.rows) - 1)
+        return len(self.rows) - 1
+
+    def append(self, obj: LearnObject) -> int:
+        """
+        Copy a LearnObject into the base store, obj becomes a view of the copy.
+
+        returns:
+        index of the card in the view
+        """
+        index = self.append_card(*obj.fields())
+        copy = self[index]
+        obj.store = copy.store
+        obj.index = copy.index
+        return index
+
+    def reset_scores(self) -> None:
+        """Set the score of every card of the view to 0."""
+        scores = self.base.scores
+        for row in self.rows:
+            scores[row] = 0
+
+    def compact(self) -> CardStore:
+        """
+        Copy the cards of the view into one CardStore.
+
+        returns:
+        CardStore
+        """
+        return UnionStore.compact(self)
+
+
+class Scores(MutableMapping):
+    """
+    Score column of a CardStore or UnionStore as a dictionary of term and score pairs.
+
+    Terms are looked up by normalized key, LearnObjects of the store by index.
+    """
+
+    def __init__(self, store: "CardStore | UnionStore", scores: dict = None, column: array = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        store - CardStore or UnionStore
+        scores - initial dictionary of term and score pairs, unknown terms are skipped
+        column - own score array of the store's length, default is the store's score column
+        """
+        self.store = store
+        self.own = column
+        for term, score in (scores or {}).items():
+            if term in self:
+                self[term] = score
+
+    @classmethod
+    def detached(cls, store: "CardStore | UnionStore", scores: dict = None) -> "Scores":
+        """
+        Scores with their own column, the store's scores are not changed.
+
+        Used for sessions that share one store. Cards added to the store later get a score of 0, see column.
+        """
+        return cls(store, scores, array("h", bytes(2 * len(store))))
+
+    @property
+    def column(self) -> array:
+        """Score array, indexed like the store. An own column grows with 0 scores when cards were added to the store."""
+        if self.own is None:
+            return self.store.scores
+        missing = len(self.store) - len(self.own)
+        if missing > 0:
+            self.own.frombytes(bytes(2 * missing))
+        return self.own
+
+    def slot(self, term: str | LearnObject) -> int:
+        """
+        Index of the score of term.
+
+        raises:
+        KeyError - when term is not in the store
+        """
+        if isinstance(term, LearnObject):
+            if term.store is self.store:
+                return self.store.index[self.store.keys[term.index]]
+            key = term.key
+        else:
+            key = normalize(term)
+        index = self.store.index.get(key)
+        if index is None:
+            raise KeyError(term)
+        return index
+
+    def __getitem__(self, term: str | LearnObject) -> int:
+        """Score of term."""
+        return self.column[self.slot(term)]
+
+    def __setitem__(self, term: str | LearnObject, score: int) -> None:
+        """Set score of term."""
+        self.column[self.slot(term)] = score
+
+    def __delitem__(self, term: str | LearnObject) -> None:
+        """Scores can not be removed, resets the score instead."""
+        self[term] = 0
+
+    def __contains__(self, term) -> bool:
+        """Return True if term is in the store."""
+        try:
+            self.slot(term)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterate terms, duplicates once."""
+        for index in self.store.index.values():
+            yield self.store.terms[index]
+
+    def items(self):
+        """Iterate (term, score) pairs without looking terms up again."""
+        column = self.column
+        for index in self.store.index.values():
+            yield self.store.terms[index], column[index]
+
+    def __len__(self) -> int:
+        """Number of distinct terms."""
+        return len(self.store.index)
+
+    def __or__(self, other) -> dict:
+        """Union of scores as a dictionary."""
+        return dict(self.items()) | dict(other.items())
+
+    def reset(self) -> None:
+        """Set every score to 0."""
+        if self.own is None:
+            self.store.reset_scores()
+        else:
+            self.own[:] = array("h", bytes(2 * len(self.own)))
+
+
+class StoreTerms(Mapping):
+    """
+    Cards of a CardStore or UnionStore as a dictionary of term and LearnObject pairs.
+
+    Views are created on lookup, so they follow the store when its cards are replaced, see
+    LearnSet.patch.
+    """
+
+    def __init__(self, store: "CardStore | UnionStore") -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        store - CardStore or UnionStore
+        """
+        self.store = store
+
+    def __getitem__(self, term: str) -> LearnObject:
+        """View of the first card of term."""
+        index = self.store.index.get(normalize(term))
+        if index is None:
+            raise KeyError(term)
+        return self.store[index]
+
+    def __iter__(self):
+        """Iterate terms, duplicates once."""
+        for index in self.store.index.values():
+            yield self.store.terms[index]
+
+    def __len__(self) -> int:
+        """Number of distinct terms."""
+        return len(self.store.index)
+
+
+class Scheduler:
+    """
+    Picks the next term to learn.
+
+    Default learn policy: every term has to be answered correctly 6 times.
+    Terms that are not mastered yet are kept in buckets by score. Each bucket is a list
+    with a position index, so adding, removing and picking a term never scans the set.
+    Terms are kept by key. Learn sessions of a set use StoreScheduler.
+
+    Scheduling policies have the same methods: done(), next(), exercise(obj) and record(obj, correct).
+    """
+
+    def __init__(self, objects: list[LearnObject], scores: dict, mastery: int = MASTERY, weights: list = None, rng: Random = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        objects - list of LearnObject objects
+        scores - dictionary of term and score pairs
+        mastery - score at which a term is learned
+        weights - pick weight of every score level (0 ... mastery - 1), default all 1.
+                  eg. [3, 2, 2, 1, 1, 1] asks new terms more often
+        rng - random.Random picking the terms, eg. the seeded one of an Engine, default is a new one
+
+        Variables:
+        self.scores - scores, kept up to date by the exercises
+        self.buckets - list of term keys for every score level
+        self.position - dictionary of term key and bucket position of active terms,
+                        index in the bucket * mastery + level
+        self.objects - dictionary of term key and LearnObject pairs
+        """
+        self.scores = scores
+        self.mastery = mastery
+        self.rng = rng or Random()
+        self.weights = weights if weights else [1] * mastery
+        if len(self.weights) != mastery or any(weight <= 0 for weight in self.weights):
+            raise ValueError(f"weights must be {mastery} positive numbers")
+        self.buckets: list[list[str]] = [[] for _ in range(mastery)]
+        self.position: dict[str, int] = {}
+        self.objects: dict[str, LearnObject] = {}
+        for obj in objects:
+            if obj.key not in self.objects:
+                self.objects[obj.key] = obj
+                self.insert(obj.key, scores.get(obj.term, 0))
+
+    def __len__(self) -> int:
+        """Number of terms not yet learned."""
+        return len(self.position)
+
+    def done(self) -> bool:
+        """Return True when every term is learned."""
+        return not self.position
+
+    def insert(self, term: str, score: int) -> None:
+        """Add term key to its score bucket, learned terms are not added."""
+        if score >= self.mastery:
+            return None
+        level = max(score, 0)
+        bucket = self.buckets[level]
+        self.position[term] = len(bucket) * self.mastery + level
+        bucket.append(term)
+
+    def remove(self, term: str) -> None:
+        """Remove term from its bucket by swapping it with the last term."""
+        index, level = divmod(self.position.pop(term), self.mastery)
+        bucket = self.buckets[level]
+        last = bucket.pop()
+        if index < len(bucket):
+            bucket[index] = last
+            self.position[last] = index * self.mastery + level
+
+    def update(self, term: str, score: int) -> None:
+        """Record a new score for term."""
+        if term in self.position:
+            self.remove(term)
+        self.insert(term, score)
+
+    def add(self, term: str) -> None:
+        """Schedule a term that was added to the set, see LearnSet.patch."""
+        key = normalize(term)
+        if key not in self.position:
+            self.insert(key, self.scores.get(term, 0))
+
+    def drop(self, term: str) -> None:
+        """Stop scheduling a term that was removed from the set."""
+        key = normalize(term)
+        if key in self.position:
+            self.remove(key)
+
+    def next(self) -> LearnObject:
+        """
+        Pick the next term.
+
+        A score level is picked by weight times number of terms, then a random term from it.
+
+        returns:
+        LearnObject
+        """
+        if not self.position:
+            raise IndexError("all terms are learned")
+        target = self.rng.random() * sum(weight * len(bucket) for weight, bucket in zip(self.weights, self.buckets))
+        for weight, bucket in zip(self.weights, self.buckets):
+            target -= weight * len(bucket)
+            if bucket and target < 0:
+                break
+        return self.objects[self.rng.choice(bucket)]
+
+    def exercise(self, obj: LearnObject) -> str:
+        """Write answer after 3 correct multiple choices, multiple choice before."""
+        return "write" if self.scores[obj.term] > 2 else "multiple_choice"
+
+    def record(self, obj: LearnObject, correct: bool) -> None:
+        """Record an answer, the score itself is kept in self.scores."""
+        self.update(obj.key, self.scores[obj.term])
+
+
+class StoreScheduler(Scheduler):
+    """
+    Scheduler of the cards of a CardStore or UnionStore, the default of learn sessions.
+
+    Terms are the first cards of their keys, kept by card index in arrays: every bucket is an
+    array of card indices and position has a slot for every card. A session takes 16 bytes per
+    card and decodes no terms, so many sessions can share one store, see attach_set.
+    """
+
+    def __init__(self, store: "CardStore | UnionStore", scores: dict, mastery: int = MASTERY, weights: list = None, rng: Random = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        store - CardStore or UnionStore
+        scores, mastery, weights, rng - see Scheduler
+
+        Variables:
+        self.objects - the store
+        self.buckets - array of card indices for every score level
+        self.position - bucket position of every card, index in the bucket * mastery + level + 1,
+                        0 for cards that are not active
+        self.active - number of active terms
+        """
+        super().__init__((), scores, mastery, weights, rng)
+        self.objects = store
+        self.buckets = [array("Q") for _ in range(mastery)]
+        self.position = array("Q", bytes(8 * len(store)))
+        self.active = 0
+        column = scores.column if isinstance(scores, Scores) and scores.store is store else None
+        if column is not None and len(store.index) == len(store) and not any(column):
+            self.buckets[0] = array("Q", range(len(store)))
+            self.position = array("Q", range(1, len(store) * mastery + 1, mastery))
+            self.active = len(store)
+            return None
+        for index in sorted(store.index.values()):
+            self.insert(index, column[index] if column is not None else scores.get(store.terms[index], 0))
+
+    def __len__(self) -> int:
+        """Number of terms not yet learned."""
+        return self.active
+
+    def done(self) -> bool:
+        """Return True when every term is learned."""
+        return not self.active
+
+    def insert(self, index: int, score: int) -> None:
+        """Add the card at index to its score bucket, learned terms are not added."""
+        if score >= self.mastery:
+            return None
+        level = max(score, 0)
+        bucket = self.buckets[level]
+        self.position[index] = len(bucket) * self.mastery + level + 1
+        bucket.append(index)
+        self.active += 1
+
+    def remove(self, index: int) -> None:
+        """Remove the card at index from its bucket by swapping it with the last card."""
+        number, level = divmod(self.position[index] - 1, self.mastery)
+        self.position[index] = 0
+        bucket = self.buckets[level]
+        last = bucket.pop()
+        if number < len(bucket):
+            bucket[number] = last
+            self.position[last] = number * self.mastery + level + 1
+        self.active -= 1
+
+    def update(self, index: int, score: int) -> None:
+        """Record a new score for the card at index."""
+        if self.position[index]:
+            self.remove(index)
+        self.insert(index, score)
+
+    def add(self, term: str) -> None:
+        """Schedule the first card of term, if it is not scheduled."""
+        index = self.objects.index.get(normalize(term))
+        if index is not None and not self.position[index]:
+            self.insert(index, self.scores.get(term, 0))
+
+    def drop(self, term: str) -> None:
+        """Stop scheduling the first card of term."""
+        index = self.objects.index.get(normalize(term))
+        if index is not None and self.position[index]:
+            self.remove(index)
+
+    def splice(self, start: int, stop: int, keys: list[str]) -> None:
+        """
+        Follow CardStore.splice of the store, see LearnSet.patch.
+
+        The replaced cards are removed, the indices of the cards after them are shifted
+        and the terms of the new cards are added.
+
+        variables:
+        start, stop - range of the replaced cards
+        keys - keys of the new cards
+        """
+        for index in range(start, stop):
+            if self.position[index]:
+                self.remove(index)
+        delta = len(keys) - stop + start
+        if delta:
+            for bucket in self.buckets:
+                bucket[:] = array("Q", [index + delta if index >= stop else index for index in bucket])
+        self.position[start:stop] = array("Q", bytes(8 * len(keys)))
+        for key in dict.fromkeys(keys):
+            self.add(key)
+
+    def record(self, obj: LearnObject, correct: bool) -> None:
+        """Record an answer, the score itself is kept in self.scores."""
+        index = self.objects.index.get(obj.key)
+        if index is not None:
+            self.update(index, self.scores[obj.term])
+
+
+class Review:
+    """Spaced repetition state of one term."""
+
+    def __init__(self, ease: float = 2.5, interval: float = 0, repetitions: int = 0, due: float = 0) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        ease - interval multiplier
+        interval - days until the next review
+        repetitions - correct answers in a row
+        due - timestamp of the next review
+        """
+        self.ease = ease
+        self.interval = interval
+        self.repetitions = repetitions
+        self.due = due
+
+
+class SpacedRepetition:
+    """
+    SM-2 spaced repetition policy.
+
+    Every term has a Review state, kept by term key like the scores. Due terms are kept in a heap by due time, stale heap
+    entries are skipped when popped. Due counts are kept per day, days that have passed
+    are folded into one overdue counter, so counting due terms does not scan the set.
+    """
+
+    def __init__(self, objects: list[LearnObject], states: dict = None, clock=time.time, relearn_delay: float = 0) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        objects - list of LearnObject objects
+        states - dictionary of term and Review pairs, eg. from dump(). Terms are normalized, so states
+                 match terms that differ only in case or spacing. New terms are due now.
+        clock - function returning the current timestamp
+        relearn_delay - seconds until a missed term is asked again
+
+        Variables:
+        self.objects - dictionary of term key and LearnObject pairs
+        self.reviews - dictionary of term key and Review pairs
+        self.heap - heap of (due, order, term key)
+        self.entries - dictionary of term key and order of its live heap entry
+        self.day_counts - dictionary of day and number of terms due that day
+        self.days - heap of days in self.day_counts
+        self.overdue - number of terms due on or before self.folded_day
+        """
+        self.clock = clock
+        self.relearn_delay = relearn_delay
+        self.objects: dict[str, LearnObject] = {}
+        self.reviews: dict[str, Review] = {}
+        self.heap: list[tuple[float, int, str]] = []
+        self.entries: dict[str, int] = {}
+        self.order = 0
+        self.day_counts: dict[int, int] = {}
+        self.days: list[int] = []
+        self.overdue = 0
+        self.folded_day = -1
+        now = clock()
+        states = {normalize(term): review for term, review in (states or {}).items()}
+        for obj in objects:
+            key = obj.key
+            if key in self.objects:
+                continue
+            self.objects[key] = obj
+            review = states.get(key)
+            if isinstance(review, dict):
+                review = Review(**review)
+            if review is None:
+                review = Review(due=now)
+            self.reviews[key] = review
+            self.heap.append((review.due, self.order, key))
+            self.entries[key] = self.order
+            self.order += 1
+            self.count(review.due, 1)
+        heapq.heapify(self.heap)
+
+    def count(self, due: float, amount: int) -> None:
+        """Add amount to the due count of the day of due."""
+        day = int(due // DAY)
+        if day <= self.folded_day:
+            self.overdue += amount
+            return None
+        if day not in self.day_counts:
+            self.day_counts[day] = 0
+            heapq.heappush(self.days, day)
+        self.day_counts[day] += amount
+
+    def due_today(self) -> int:
+        """Number of terms due today or earlier."""
+        today = int(self.clock() // DAY)
+        while self.days and self.days[0] <= today:
+            self.overdue += self.day_counts.pop(heapq.heappop(self.days))
+        self.folded_day = max(self.folded_day, today)
+        return self.overdue
+
+    def peek(self) -> tuple[float, int, str] | None:
+        """Return the heap entry of the earliest due term, dropping stale entries."""
+        while self.heap:
+            _, order, term = self.heap[0]
+            if self.entries[term] == order:
+                return self.heap[0]
+            heapq.heappop(self.heap)
+        return None
+
+    def done(self) -> bool:
+        """Return True when no term is due."""
+        top = self.peek()
+        return top is None or top[0] > self.clock()
+
+    def next(self) -> LearnObject:
+        """
+        Pick the earliest due term.
+
+        returns:
+        LearnObject
+        """
+        top = self.peek()
+        if top is None:
+            raise IndexError("set is empty")
+        return self.objects[top[2]]
+
+    def add(self, term: str) -> None:
+        """Schedule a term that was added to the set, it is due now. See LearnSet.patch."""
+        key = normalize(term)
+        if key in self.reviews:
+            return None
+        review = Review(due=self.clock())
+        self.reviews[key] = review
+        heapq.heappush(self.heap, (review.due, self.order, key))
+        self.entries[key] = self.order
+        self.order += 1
+        self.count(review.due, 1)
+
+    def drop(self, term: str) -> None:
+        """Stop scheduling a term that was removed from the set, its heap entries become stale."""
+        key = normalize(term)
+        review = self.reviews.pop(key, None)
+        if review is not None:
+            self.count(review.due, -1)
+            self.entries[key] = -1
+
+    def exercise(self, obj: LearnObject) -> str:
+        """Write answer after 3 correct reviews in a row, multiple choice before."""
+        return "write" if self.reviews[obj.key].repetitions > 2 else "multiple_choice"
+
+    def record(self, obj: LearnObject, correct: bool, quality: int = None) -> None:
+        """
+        Record an answer and schedule the next review.
+
+        variables:
+        obj - answered LearnObject
+        correct - whether the answer was correct
+        quality - SM-2 answer quality 0 ... 5, default 4 if correct else 1
+        """
+        if quality is None:
+            quality = 4 if correct else 1
+        review = self.reviews[obj.key]
+        now = self.clock()
+        self.count(review.due, -1)
+        if quality < 3:
+            review.repetitions = 0
+            review.interval = 0
+            review.due = now + self.relearn_delay
+        else:
+            review.repetitions += 1
+            if review.repetitions == 1:
+                review.interval = 1
+            elif review.repetitions == 2:
+                review.interval = 6
+            else:
+                review.interval = round(review.interval * review.ease)
+            review.due = now + review.interval * DAY
+        review.ease = max(1.3, review.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.count(review.due, 1)
+        heapq.heappush(self.heap, (review.due, self.order, obj.key))
+        self.entries[obj.key] = self.order
+        self.order += 1
+
+    def dump(self) -> dict:
+        """
+        Review states, can be passed back as states.
+
+        returns:
+        dictionary of term key and review state dictionaries
+        """
+        return {term: vars(review).copy() for term, review in self.reviews.items()}
+
+
+class DistractorSampler:
+    """
+    Picks wrong options for multiple choice.
+
+    Random options are sampled as distinct indices that skip the answer, so there are no redraws.
+    Hard options are the neighbours of the answer in alphabetical term order, which share
+    the beginning of the term. The index is rebuilt only when the set changes, the
+    alphabetical order only when hard options are asked.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class initializer.
+
+        Variables:
+        self.keys - term keys of the set
+        self.first - dictionary of term key and index of its first card
+        self.repeated - dictionary of term key and list of indices, only for duplicate terms
+        self.order - set indices sorted by term key, empty until sort() is called
+        self.rank - position of every set index in self.order
+        """
+        self.objects = None
+        self.size = -1
+        self.keys: list[str] = []
+        self.first: dict[str, int] = {}
+        self.repeated: dict[str, list[int]] = {}
+        self.order: list[int] = []
+        self.rank: array = array("Q")
+
+    def refresh(self, objects: list[LearnObject]) -> None:
+        """Rebuild the indices, if objects is a different or changed list."""
+        if objects is self.objects and len(objects) == self.size:
+            return None
+        self.objects = objects
+        self.size = len(objects)
+        if isinstance(objects, CardStore):
+            self.first = objects.index
+            self.keys = objects.keys
+        else:
+            self.keys = list(objects.keys) if isinstance(objects, (CardStore, UnionStore, SubsetStore)) else [obj.key for obj in objects]
+            self.first = {}
+            for index, key in enumerate(self.keys):
+                self.first.setdefault(key, index)
+        self.repeated = {}
+        if len(self.first) < self.size:
+            for index, key in enumerate(self.keys):
+                if self.first[key] != index:
+                    self.repeated.setdefault(key, [self.first[key]]).append(index)
+        self.order = []
+        self.rank = array("Q")
+
+    def sort(self) -> None:
+        """Sort the set indices by term key, if not sorted yet."""
+        if len(self.order) == self.size:
+            return None
+        self.order = sorted(range(self.size), key=self.keys.__getitem__)
+        self.rank = array("Q", bytes(8 * self.size))
+        for position, index in enumerate(self.order):
+            self.rank[index] = position
+
+    def excluded(self, key: str) -> list[int]:
+        """Sorted indices of every card with key."""
+        if key in self.repeated:
+            return self.repeated[key]
+        if key in self.first:
+            return [self.first[key]]
+        return []
+
+    def sample(self, objects: list[LearnObject], correct: LearnObject, number: int, hard: bool = False, rng: Random = None) -> list[LearnObject]:
+        """
+        Sample wrong options.
+
+        variables:
+        objects - list of LearnObject objects to pick from
+        correct - the correct LearnObject, never picked, nor its duplicates
+        number - number of options, less are returned when the set is too small
+        hard - pick options with similar terms
+        rng - Random to sample with, optional
+
+        returns:
+        list of LearnObjects
+        """
+        self.refresh(objects)
+        excluded = self.excluded(correct.key)
+        number = max(0, min(number, self.size - len(excluded)))
+        if hard and excluded:
+            return [objects[index] for index in self.neighbours(excluded[0], number, len(excluded), rng)]
+        picked = []
+        for index in (rng.sample if rng else sample)(range(self.size - len(excluded)), number):
+            for skipped in excluded:
+                if index >= skipped:
+                    index += 1
+            picked.append(objects[index])
+        return picked
+
+    def neighbours(self, index: int, number: int, copies: int = 1, rng: Random = None) -> list[int]:
+        """
+        Return number of indices closest to index in alphabetical order, skipping the same term.
+
+        Twice as many neighbours are collected and number of them are picked randomly.
+        """
+        self.sort()
+        key = self.keys[index]
+        wanted = min(number * 2, self.size - copies)
+        found = []
+        low = high = self.rank[index]
+        while len(found) < wanted:
+            if high + 1 < self.size:
+                high += 1
+                if self.keys[self.order[high]] != key:
+                    found.append(self.order[high])
+            if low > 0 and len(found) < wanted:
+                low -= 1
+                if self.keys[self.order[low]] != key:
+                    found.append(self.order[low])
+        return (rng.sample if rng else sample)(found, number)
+
+
+def edit_distance(first: str, second: str, limit: int = None) -> int:
+    """
+    Levenshtein distance with an upper limit.
+
+    Only cells within limit of the diagonal are computed, and the computation stops
+    as soon as a whole row is over the limit.
+
+    returns:
+    edit distance, limit + 1 when the distance is over the limit
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if limit is None:
+        limit = len(first)
+    over = limit + 1
+    if len(first) - len(second) > limit:
+        return over
+    previous = [column if column <= limit else over for column in range(len(second) + 1)]
+    for row in range(1, len(first) + 1):
+        char = first[row - 1]
+        current = [over] * (len(second) + 1)
+        if row <= limit:
+            current[0] = row
+        row_min = current[0]
+        for column in range(max(1, row - limit), min(len(second), row + limit) + 1):
+            value = min(
+                previous[column - 1] + (char != second[column - 1]),
+                current[column - 1] + 1,
+                previous[column] + 1
+            )
+            current[column] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def trigrams(text: str) -> set[str]:
+    """Set of padded trigrams of text."""
+    padded = f"  {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class TypoMatcher:
+    """
+    Typo checker.
+
+    Ratio of two strings is 1 - edit distance / length of the longer one. Edit distance is
+    only computed up to the largest distance that still reaches the minimum ratio.
+    Closest term queries use a trigram index of the set, only terms that share enough
+    trigrams with the answer are compared. The index is rebuilt only when the set changes.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class initializer.
+
+        Variables:
+        self.postings - dictionary of trigram and array of card indices
+        """
+        self.store = None
+        self.size = -1
+        self.postings: dict[str, array] = {}
+
+    @staticmethod
+    def limit(first_length: int, second_length: int, min_ratio: float) -> int:
+        """Largest edit distance that reaches min_ratio."""
+        return int((1 - min_ratio) * max(first_length, second_length) + 1e-9)
+
+    def ratio(self, answer: str, correct: str, min_ratio: float = 0) -> float:
+        """
+        Similarity ratio.
+
+        returns:
+        ratio between 0 and 1, 0 when the ratio is below min_ratio
+        """
+        length = max(len(answer), len(correct))
+        if not length:
+            return 1.0
+        limit = self.limit(len(answer), len(correct), min_ratio)
+        distance = edit_distance(answer, correct, limit)
+        return 1 - distance / length if distance <= limit else 0.0
+
+    def match(self, answer: str, correct: str, min_ratio: float) -> bool:
+        """
+        Return True if answer is a typo of correct.
+
+        bool - True if ratio is at least min_ratio
+        """
+        limit = self.limit(len(answer), len(correct), min_ratio)
+        return edit_distance(answer, correct, limit) <= limit
+
+    def refresh(self, store: CardStore) -> None:
+        """Rebuild the trigram index, if store is a different or changed store."""
+        if store is self.store and len(store) == self.size:
+            return None
+        self.store = store
+        self.size = len(store)
+        self.postings = {}
+        for index in store.index.values():
+            for gram in trigrams(store.keys[index]):
+                if gram not in self.postings:
+                    self.postings[gram] = array("I")
+                self.postings[gram].append(index)
+
+    def closest(self, store: CardStore, answer: str, min_ratio: float, number: int = 1) -> list[tuple[float, int]]:
+        """
+        Closest terms to answer in store.
+
+        variables:
+        store - CardStore
+        answer - normalized answer
+        min_ratio - minimum ratio of returned terms
+        number - maximum number of terms
+
+        returns:
+        list of (ratio, card index) pairs, best first
+        """
+        self.refresh(store)
+        grams = trigrams(answer)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        longest = int(len(answer) / min_ratio) if min_ratio > 0 else len(answer) * 4
+        least = len(grams) - 3 * self.limit(len(answer), longest, min_ratio)
+        found = []
+        for index, count in shared.items():
+            if count < least:
+                continue
+            key = store.keys[index]
+            limit = self.limit(len(answer), len(key), min_ratio)
+            if abs(len(key) - len(answer)) > limit or count < len(grams) - 3 * limit:
+                continue
+            distance = edit_distance(answer, key, limit)
+            if distance <= limit:
+                found.append((1 - distance / max(len(answer), len(key), 1), index))
+        found.sort(key=lambda pair: -pair[0])
+        return found[:number]
+
+
+def tokens(text: str) -> list[str]:
+    """
+    Words of text for searching, casefolded like normalized terms.
+
+    Ascii text is split with a byte translation table, which is much faster than the regex.
+    """
+    if text.isascii():
+        return text.encode().translate(_ASCII_WORDS).decode().split()
+    return _WORD.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class TextIndex:
+    """
+    Inverted index of the words of the terms and definitions of a set.
+
+    Every word has an array of the indices of the cards that contain it, in card order.
+    Queries intersect the arrays of their words, shortest first: short candidate lists are
+    checked with binary searches, long ones are filtered through a set in C. Words ending with * are prefixes, they
+    match the words of a sorted word list, which is sorted only when a prefix is asked.
+    Cards added to the set are indexed on the next query, a replaced set is indexed again.
+    """
+
+    def __init__(self) -> None:
+        """
+        Class initializer.
+
+        Variables:
+        self.postings - dictionary of word and array of card indices
+        self.words - sorted words of self.postings, empty until a prefix is asked
+        """
+        self.store = None
+        self.size = -1
+        self.postings: dict[str, array] = {}
+        self.words: list[str] = []
+
+    def refresh(self, store: "CardStore | UnionStore | SubsetStore") -> None:
+        """Index the new cards of store, or every card if store is a different or replaced store."""
+        if store is not self.store or not 0 <= self.size <= len(store):
+            self.store = store
+            self.size = 0
+            self.postings = {}
+        if len(store) == self.size:
+            return None
+        postings = self.postings
+        if isinstance(store, CardStore):
+            texts = store.texts(self.size)
+        else:
+            texts = (f"{store.keys[index]}\n{chr(10).join(store.hints(index))}" for index in range(self.size, len(store)))
+        for index, words in enumerate(map(tokens, texts), self.size):
+            for word in words:
+                posting = postings.get(word)
+                if posting is None:
+                    postings[word] = array("I", (index,))
+                elif posting[-1] != index:
+                    posting.append(index)
+        self.size = len(store)
+        self.words = []
+
+    def lookup(self, word: str, prefix: bool = False) -> array | list[int]:
+        """
+        Card indices of a word, of every word starting with it when prefix is True.
+
+        returns:
+        increasing card indices
+        """
+        if not prefix:
+            return self.postings.get(word, ())
+        if len(self.words) != len(self.postings):
+            self.words = sorted(self.postings)
+        start = bisect_left(self.words, word)
+        stop = bisect_left(self.words, word + "\U0010ffff", start)
+        if stop - start == 1:
+            return self.postings[self.words[start]]
+        return sorted(set().union(*map(self.postings.__getitem__, self.words[start:stop])))
+
+    @staticmethod
+    def intersect(first, second) -> list[int]:
+        """Increasing card indices in both, first is the shorter one."""
+        if len(first) * 16 < len(second):
+            found = []
+            for index in first:
+                position = bisect_left(second, index)
+                if position < len(second) and second[position] == index:
+                    found.append(index)
+            return found
+        return list(filter(set(first).__contains__, second))
+
+    def query(self, store: "CardStore | UnionStore | SubsetStore", query: str) -> array:
+        """
+        Indices of the cards of store that contain every word of query.
+
+        variables:
+        store - store of the set
+        query - words separated by whitespace, a word ending with * matches every word that starts with it
+
+        returns:
+        array of increasing card indices, every card when the query has no words
+        """
+        self.refresh(store)
+        postings = []
+        for part in query.split():
+            words = tokens(part)
+            for number, word in enumerate(words, 1):
+                postings.append(self.lookup(word, number == len(words) and part.endswith("*")))
+        if not postings:
+            return array("Q", range(len(store)))
+        postings.sort(key=len)
+        found = postings[0]
+        for posting in postings[1:]:
+            if not found:
+                break
+            found = self.intersect(found, posting)
+        return array("Q", found)
+
+
+class ProgressJournal:
+    """
+    Persistent progress store.
+
+    Every answer is appended to a journal file ({file}.journal) as a line of json. Lines are
+    written in batches and fsync'd at least every sync_interval seconds. When the journal gets
+    long, the scores are compacted into a snapshot ({file}.snapshot) and the journal is emptied.
+    Loading reads the snapshot and replays only the journal lines after it.
+    Every event has a sequence number and the score after the answer, so replaying
+    an event twice (eg. after a crash during compaction) gives the same scores.
+    """
+
+    def __init__(self, file_name: str, batch_size: int = 64, sync_interval: float = 1.0, compact_every: int = 10000) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        file_name - base name of the journal and snapshot files
+        batch_size - number of events buffered before writing
+        sync_interval - maximum seconds between fsyncs
+        compact_every - number of journal events after which a snapshot is written
+
+        Variables:
+        self.scores - dictionary of term and score pairs, current progress
+        self.seq - sequence number of the last event
+        self.pending - events not written yet
+        self.journal_events - number of events in the journal file
+        """
+        self.file_name = file_name
+        self.journal_name = file_name + ".journal"
+        self.snapshot_name = file_name + ".snapshot"
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.scores: dict[str, int] = {}
+        self.seq = 0
+        self.pending: list[str] = []
+        self.journal_events = 0
+        self.last_sync = time.monotonic()
+        self.load()
+        self.file = open(self.journal_name, "a", encoding="UTF-8")
+
+    def load(self) -> None:
+        """
+        Read the snapshot and replay the journal tail.
+
+        Broken lines of an interrupted write are skipped. A broken last line is cut off and
+        a complete one is terminated, so that the next event starts on a line of its own.
+        """
+        try:
+            with open(self.snapshot_name, "r", encoding="UTF-8") as file:
+                snapshot = json.load(file)
+            self.scores = snapshot["scores"]
+            self.seq = snapshot["seq"]
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.journal_name, "r+b") as file:
+                end = 0
+                for line in file:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        if line.endswith(b"\n"):
+                            end += len(line)
+                        continue
+                    end += len(line)
+                    if not line.endswith(b"\n"):
+                        file.write(b"\n")
+                        end += 1
+                    self.journal_events += 1
+                    if event["seq"] <= self.seq:
+                        continue
+                    self.seq = event["seq"]
+                    if event.get("reset"):
+                        self.scores = {}
+                    else:
+                        self.scores[event["term"]] = event["score"]
+                file.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def append(self, term: str, exercise: str, result: bool, score: int, latency: float = None) -> None:
+        """
+        Record an answer.
+
+        variables:
+        term - answered term
+        exercise - exercise type, eg. "write"
+        result - True if answered correctly
+        score - score of the term after the answer
+        latency - seconds the user took to answer
+        """
+        self.scores[term] = score
+        self.write({
+            "term": term,
+            "exercise": exercise,
+            "result": result,
+            "score": score,
+            "time": time.time(),
+            "latency": latency
+        })
+
+    def reset(self) -> None:
+        """Record that every score was set to 0."""
+        self.scores = {}
+        self.write({"reset": True, "time": time.time()})
+
+    def write(self, event: dict) -> None:
+        """Buffer an event, flush when the batch is full or the sync interval has passed."""
+        self.seq += 1
+        event["seq"] = self.seq
+        self.pending.append(json.dumps(event) + "\n")
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write and fsync buffered events, compact if the journal is long."""
+        self.flush_pending()
+        self.last_sync = time.monotonic()
+        if self.journal_events >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Write a snapshot of the scores and empty the journal.
+
+        The snapshot is written to a temporary file and moved in place, so there is always
+        either the old or the new snapshot on disk.
+        """
+        self.flush_pending()
+        temp_name = self.snapshot_name + ".tmp"
+        with open(temp_name, "w", encoding="UTF-8") as file:
+            json.dump({"seq": self.seq, "scores": self.scores}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, self.snapshot_name)
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.journal_events = 0
+
+    def flush_pending(self) -> None:
+        """Write buffered events without compacting."""
+        if self.pending:
+            self.file.write("".join(self.pending))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.journal_events += len(self.pending)
+            self.pending = []
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        self.flush()
+        self.file.close()
+
+
+class Histogram:
+    """
+    Latency histogram with power of two buckets.
+
+    Bucket n counts durations of 2^(n-1) to 2^n microseconds, so adding a value is
+    a few integer operations and percentiles are accurate to a factor of two.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        """
+        Class initializer.
+
+        Variables:
+        self.count - number of values
+        self.total - sum of values in seconds
+        self.min, self.max - smallest and biggest value in seconds
+        self.buckets - count of every bucket
+        """
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = array("Q", bytes(8 * 40))
+
+    def add(self, seconds: float) -> None:
+        """Add a duration."""
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1000000).bit_length(), 39)] += 1
+
+    def percentile(self, share: float) -> float:
+        """
+        Upper bound of the bucket of a percentile.
+
+        variables:
+        share - percentile between 0 and 1, eg. 0.99
+
+        returns:
+        seconds, 0 when empty
+        """
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for bucket, number in enumerate(self.buckets):
+            seen += number
+            if seen >= rank and number:
+                return min((1 << bucket) / 1000000, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        """Summary and non-empty buckets as a json-ready dictionary."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets_us": {1 << bucket: number for bucket, number in enumerate(self.buckets) if number},
+        }
+
+
+class Instruments:
+    """
+    Exercise timing and profiling.
+
+    For every exercise type three durations are recorded in histograms: building the
+    question (build), the user's response time (response) and checking the answer (check).
+    Per term, answers, response time and check time are summed. Optionally, learn() and test()
+    run under cProfile and tracemalloc.
+    """
+
+    PHASES = ("build", "response", "check")
+
+    def __init__(self, per_term: bool = True, profile: bool = False, trace_memory: bool = False) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        per_term - record totals per term
+        profile - run learn() and test() with cProfile
+        trace_memory - run learn() and test() with tracemalloc
+
+        Variables:
+        self.histograms - dictionary of exercise and {phase: Histogram} pairs
+        self.terms - dictionary of term and [answers, correct, response seconds, check seconds]
+        self.counters - Counter of answers, correct answers, typos and pending results
+        self.profiles - dictionary of run name and pstats.Stats
+        self.memory - dictionary of run name and list of (allocation place, size in bytes, count) pairs
+        """
+        self.per_term = per_term
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.histograms: dict[str, dict[str, Histogram]] = {}
+        self.terms: dict[str, list] = {}
+        self.counters = Counter()
+        self.profiles: dict = {}
+        self.memory: dict[str, list] = {}
+
+    def add(self, exercise: str, phase: str, seconds: float) -> None:
+        """Add a duration of a phase of an exercise."""
+        phases = self.histograms.get(exercise)
+        if phases is None:
+            phases = self.histograms[exercise] = {phase: Histogram() for phase in self.PHASES}
+        phases[phase].add(seconds)
+
+    def answered(self, question: "Question", result: "Result", check: float) -> None:
+        """Record a checked answer, see Engine.answer."""
+        self.add(question.exercise, "check", check)
+        if result.pending:
+            self.counters["pending"] += 1
+            return
+        self.counters["answers"] += 1
+        self.counters["correct"] += result.correct
+        self.counters["typos"] += result.typo
+        if result.latency is not None:
+            self.add(question.exercise, "response", result.latency)
+        if self.per_term and question.card is not None:
+            totals = self.terms.get(question.card.term)
+            if totals is None:
+                totals = self.terms[question.card.term] = [0, 0, 0.0, 0.0]
+            totals[0] += 1
+            totals[1] += result.correct
+            totals[2] += result.latency or 0.0
+            totals[3] += check
+
+    def response_time(self, term: str) -> float | None:
+        """Mean response time of a term in seconds, None when it was not answered."""
+        totals = self.terms.get(term)
+        return totals[2] / totals[0] if totals else None
+
+    def slowest(self, number: int = 10) -> list[tuple[str, float]]:
+        """Terms with the longest mean response time, slowest first."""
+        return heapq.nlargest(number, ((term, totals[2] / totals[0]) for term, totals in self.terms.items()), key=lambda pair: pair[1])
+
+    def run(self, name: str, function, *args, **kwargs):
+        """
+        Call function, with cProfile and tracemalloc when they are turned on.
+
+        Results are saved to self.profiles[name] and self.memory[name].
+
+        returns:
+        result of function
+        """
+        profiler = None
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        if self.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if profiler:
+                import pstats
+                profiler.disable()
+                self.profiles[name] = pstats.Stats(profiler)
+            if self.trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self.memory[name] = [(str(stat.traceback), stat.size, stat.count) for stat in snapshot.statistics("lineno")[:20]]
+
+    def dump(self) -> dict:
+        """All recorded data as a json-ready dictionary."""
+        data = {
+            "counters": dict(self.counters),
+            "exercises": {exercise: {phase: histogram.as_dict() for phase, histogram in phases.items()} for exercise, phases in self.histograms.items()},
+            "terms": {term: {"answers": totals[0], "correct": totals[1], "response": totals[2], "check": totals[3]} for term, totals in self.terms.items()},
+            "memory": self.memory,
+        }
+        if self.profiles:
+            data["profiles"] = {name: self.top(stats) for name, stats in self.profiles.items()}
+        return data
+
+    @staticmethod
+    def top(stats, number: int = 20) -> list[dict]:
+        """Functions with the most own time of pstats.Stats."""
+        rows = sorted(stats.stats.items(), key=lambda row: row[1][2], reverse=True)[:number]
+        return [{"function": f"{file}:{line}({name})", "calls": calls, "own": own, "cumulative": cumulative} for (file, line, name), (_, calls, own, cumulative, _) in rows]
+
+    def export(self, file_name: str) -> None:
+        """Write dump() to a json file."""
+        with open(file_name, "w", encoding="UTF-8") as file:
+            json.dump(self.dump(), file, indent=1)
+
+    def report(self) -> None:
+        """Print a summary table of the exercises."""
+        print(f"{'exercise':<17}{'phase':<10}{'count':>7}{'mean ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+        for exercise, phases in self.histograms.items():
+            for phase, histogram in phases.items():
+                if histogram.count:
+                    summary = histogram.as_dict()
+                    print(f"{exercise:<17}{phase:<10}{histogram.count:>7}{summary['mean'] * 1000:>10.3f}{summary['p90'] * 1000:>10.3f}{summary['p99'] * 1000:>10.3f}")
+
+
+class AnswerHistory:
+    """
+    Columnar history of answers, for learner statistics.
+
+    Every answer is a row of arrays: term, exercise, learner, flags (correct, typo), the score
+    after the answer, time and response time. Terms, exercises and learners are stored as
+    numbers of their name tables. Aggregates are counted in C over whole columns with Counter,
+    compress and map, without a python loop per answer; filters are masks of the same kind.
+    Totals per exercise and per term are rolled up when an answer is added, so unfiltered
+    queries and the summary of a round do not scan the history.
+    Histories of many sessions and learners are saved with save, and merged with extend.
+    """
+
+    CORRECT = 1
+    TYPO = 2
+    COLUMNS = (("terms", "I"), ("exercises", "B"), ("learners", "I"), ("flags", "B"), ("scores", "h"), ("times", "d"), ("latencies", "f"))
+    NAMES = ("terms", "exercises", "learners")
+    MAGIC = b"LHST"
+
+    def __init__(self) -> None:
+        """
+        Class initializer.
+
+        Variables:
+        self.terms, self.exercises, self.learners - arrays of term, exercise and learner numbers
+        self.flags - array of CORRECT and TYPO bits of every answer
+        self.scores - array of scores after the answers, -1 when the answer did not change a score
+        self.times - array of answer times, seconds since the epoch
+        self.latencies - array of response times in seconds, nan when not known
+        self.names - dictionary of column and list of names, the number of a name is its index
+        self.numbers - dictionary of column and dictionary of name and number
+        self.exercise_totals - [answers, correct, typos, overwritten typos] of every exercise number
+        self.term_answers, self.term_correct - answers and correct answers of every term number
+        """
+        for column, typecode in self.COLUMNS:
+            setattr(self, column, array(typecode))
+        self.names: dict[str, list[str]] = {column: [] for column in self.NAMES}
+        self.numbers: dict[str, dict[str, int]] = {column: {} for column in self.NAMES}
+        self.exercise_totals: list[list[int]] = []
+        self.term_answers = array("I")
+        self.term_correct = array("I")
+
+    def __len__(self) -> int:
+        """Number of answers."""
+        return len(self.terms)
+
+    def number(self, column: str, name: str) -> int:
+        """Number of a term, exercise or learner name, new names get the next number."""
+        numbers = self.numbers[column]
+        number = numbers.get(name)
+        if number is None:
+            number = numbers[name] = len(self.names[column])
+            self.names[column].append(name)
+            if column == "terms":
+                self.term_answers.append(0)
+                self.term_correct.append(0)
+            elif column == "exercises":
+                self.exercise_totals.append([0, 0, 0, 0])
+        return number
+
+    def append(self, term: str, exercise: str, correct: bool, typo: bool = False, score: int = -1, latency: float = None, learner: str = "", when: float = None) -> None:
+        """
+        Add an answer and roll it up.
+
+        variables:
+        term - answered term
+        exercise - exercise type
+        correct - True if answered correctly or a typo was overwritten
+        typo - True if the answer was a typo
+        score - score of the term after the answer, -1 when not changed
+        latency - response time in seconds, optional
+        learner - name of the learner
+        when - answer time, default is now
+        """
+        term_number = self.number("terms", term)
+        exercise_number = self.number("exercises", exercise)
+        self.terms.append(term_number)
+        self.exercises.append(exercise_number)
+        self.learners.append(self.number("learners", learner))
+        self.flags.append((self.CORRECT if correct else 0) | (self.TYPO if typo else 0))
+        self.scores.append(score)
+        self.times.append(time.time() if when is None else when)
+        self.latencies.append(float("nan") if latency is None else latency)
+        totals = self.exercise_totals[exercise_number]
+        totals[0] += 1
+        totals[1] += bool(correct)
+        totals[2] += bool(typo)
+        totals[3] += bool(typo and correct)
+        self.term_answers[term_number] += 1
+        self.term_correct[term_number] += bool(correct)
+
+    def answered(self, question: "Question", result: "Result", learner: str = "") -> None:
+        """Add a checked answer, every pair of a connect answer is an answer, see Engine.answer."""
+        if result.pending:
+            return None
+        when = time.time()
+        if question.exercise == "connect":
+            for _, term, _, correct, typo in result.pairs:
+                self.append(term, "connect", correct, typo, -1, result.latency, learner, when)
+        elif question.card is not None:
+            self.append(question.card.term, question.exercise, result.correct, result.typo, -1 if result.score is None else result.score, result.latency, learner, when)
+
+    def rollup(self) -> None:
+        """Count the rolled up totals of the whole history again, see load and extend."""
+        totals = self.count("exercises")
+        self.exercise_totals = [totals.get(number, [0, 0, 0, 0]) for number in range(len(self.names["exercises"]))]
+        totals = self.count("terms")
+        terms = range(len(self.names["terms"]))
+        self.term_answers = array("I", [totals[term][0] if term in totals else 0 for term in terms])
+        self.term_correct = array("I", [totals[term][1] if term in totals else 0 for term in terms])
+
+    def mask(self, learner: str = None, since: float = None, until: float = None):
+        """
+        Answers of learner from since until until, as an iterator of booleans over the rows.
+
+        returns:
+        iterator, None when there is no filter
+        """
+        masks = []
+        if learner is not None:
+            masks.append(map(self.numbers["learners"].get(learner, -1).__eq__, self.learners))
+        if since is not None:
+            masks.append(map(float(since).__le__, self.times))
+        if until is not None:
+            masks.append(map(float(until).__gt__, self.times))
+        return reduce(lambda first, second: map(and_, first, second), masks) if masks else None
+
+    def count(self, column: str, mask=None) -> dict[int, list[int]]:
+        """
+        [answers, correct, typos, overwritten typos] of every number of the terms or exercises column.
+
+        Numbers and flags are counted in one pass as number * 4 + flags, only the rows of mask when given.
+        """
+        codes = map(int.__add__, map((4).__mul__, getattr(self, column)), self.flags)
+        totals: dict[int, list[int]] = {}
+        for code, count in Counter(codes if mask is None else compress(codes, mask)).items():
+            number, flags = divmod(code, 4)
+            counts = totals.get(number)
+            if counts is None:
+                counts = totals[number] = [0, 0, 0, 0]
+            counts[0] += count
+            if flags & self.CORRECT:
+                counts[1] += count
+            if flags & self.TYPO:
+                counts[2] += count
+                if flags & self.CORRECT:
+                    counts[3] += count
+        return totals
+
+    def totals(self, column: str, learner: str = None, since: float = None, until: float = None) -> dict[int, list[int]]:
+        """
+        [answers, correct, typos, overwritten typos] of every number of the terms or exercises column, see count.
+
+        Unfiltered totals are the rolled up ones, terms only roll up answers and correct answers.
+        """
+        mask = self.mask(learner, since, until)
+        if mask is not None:
+            return self.count(column, mask)
+        if column == "exercises":
+            return dict(enumerate(self.exercise_totals))
+        return {number: [answers, correct, 0, 0] for number, (answers, correct) in enumerate(zip(self.term_answers, self.term_correct)) if answers}
+
+    def accuracy(self, learner: str = None, since: float = None, until: float = None) -> dict[str, dict]:
+        """
+        Accuracy by exercise type.
+
+        variables:
+        learner - only the answers of learner, optional
+        since, until - only the answers from since until until, seconds since the epoch, optional
+
+        returns:
+        dictionary of exercise and {"answers", "correct", "accuracy", "typos", "overwritten"}
+        """
+        return {
+            self.names["exercises"][number]: {"answers": answers, "correct": correct, "accuracy": correct / answers, "typos": typos, "overwritten": overwritten}
+            for number, (answers, correct, typos, overwritten) in self.totals("exercises", learner, since, until).items()
+            if answers
+        }
+
+    def hardest(self, number: int = 10, min_answers: int = 3, learner: str = None, since: float = None, until: float = None) -> list[tuple[str, float, int]]:
+        """
+        Terms with the lowest accuracy, of the terms answered at least min_answers times.
+
+        Ties are broken by the number of answers, more answers first.
+
+        returns:
+        list of (term, accuracy, answers), hardest first
+        """
+        totals = self.totals("terms", learner, since, until)
+        found = heapq.nsmallest(
+            number,
+            ((counts[1] / counts[0], -counts[0], term) for term, counts in totals.items() if counts[0] >= min_answers)
+        )
+        return [(self.names["terms"][term], accuracy, -answers) for accuracy, answers, term in found]
+
+    def typo_overwrite_rate(self, learner: str = None, since: float = None, until: float = None) -> float:
+        """
+        Share of typos that were overwritten as correct, see LearnSet.choice_and_answer_check.
+
+        returns:
+        share between 0 and 1, 0 when there were no typos
+        """
+        totals = self.totals("exercises", learner, since, until).values()
+        typos = sum(counts[2] for counts in totals)
+        return sum(counts[3] for counts in totals) / typos if typos else 0.0
+
+    def time_to_mastery(self, mastery: int = MASTERY, learner: str = None, since: float = None, until: float = None) -> Histogram:
+        """
+        Time from the first answer of a term to the first answer with a score of mastery, of every learner and term.
+
+        The rows are keyed by learner and term in C, the first rows of the keys are found by
+        building dictionaries of the reversed rows. Only the learned terms are looped over.
+
+        variables:
+        mastery - score of a learned term
+        learner, since, until - see accuracy
+
+        returns:
+        Histogram of seconds
+        """
+        learners, terms, scores, times = self.learners, self.terms, self.scores, self.times
+        mask = self.mask(learner, since, until)
+        if mask is not None:
+            mask = bytes(mask)
+            learners, terms, scores, times = (array(column.typecode, compress(column, mask)) for column in (learners, terms, scores, times))
+        keys = array("Q", map(int.__or__, map((1 << 32).__mul__, learners), terms))
+        rows = range(len(keys))
+        first = dict(zip(reversed(keys), reversed(rows)))
+        learned = bytes(map(mastery.__le__, scores))
+        learned_first = dict(zip(reversed(array("Q", compress(keys, learned))), reversed(array("Q", compress(rows, learned)))))
+        histogram = Histogram()
+        for key, row in learned_first.items():
+            histogram.add(times[row] - times[first[key]])
+        return histogram
+
+    def summary(self, since: int = 0) -> dict:
+        """
+        Summary of the answers from answer number since, eg. of a learn round.
+
+        Only the answers since are read, so the summary of a round takes no time in a long history.
+
+        returns:
+        dictionary of "answers", "correct", "typos", "overwritten" and "scores", the last score of every scored term
+        """
+        flags = self.flags[since:]
+        scores = {}
+        for term, score in zip(self.terms[since:], self.scores[since:]):
+            if score >= 0:
+                scores[self.names["terms"][term]] = score
+        return {
+            "answers": len(flags),
+            "correct": sum(map(self.CORRECT.__and__, flags)),
+            "typos": sum(map(bool, map(self.TYPO.__and__, flags))),
+            "overwritten": flags.count(self.CORRECT | self.TYPO),
+            "scores": scores,
+        }
+
+    def extend(self, other: "AnswerHistory") -> None:
+        """Add the answers of another history, eg. of another learner. Its names are numbered again in C."""
+        for column in self.NAMES:
+            numbers = array("I", [self.number(column, name) for name in other.names[column]])
+            getattr(self, column).extend(array(getattr(self, column).typecode, map(numbers.__getitem__, getattr(other, column))))
+        for column in "flags", "scores", "times", "latencies":
+            getattr(self, column).extend(getattr(other, column))
+        self.rollup()
+
+    def save(self, file_name: str) -> None:
+        """
+        Save the history to a binary file.
+
+        A json header with the names and the number of answers is followed by the raw columns.
+        The file is written under a temporary name and moved in place.
+        """
+        header = json.dumps({"rows": len(self), "names": self.names}).encode("UTF-8")
+        temp_name = f"{file_name}.{os.getpid()}.tmp"
+        with open(temp_name, "wb") as file:
+            file.write(_HEADER.pack(self.MAGIC, 1, len(header)))
+            file.write(header)
+            for column, _ in self.COLUMNS:
+                getattr(self, column).tofile(file)
+        os.replace(temp_name, file_name)
+
+    @classmethod
+    def load(cls, file_name: str) -> "AnswerHistory":
+        """
+        Load a history saved with save.
+
+        returns:
+        AnswerHistory
+
+        raises:
+        ValueError - when the file is not a history file
+        """
+        history = cls()
+        with open(file_name, "rb") as file:
+            head = file.read(_HEADER.size)
+            if len(head) < _HEADER.size or head[:4] != cls.MAGIC:
+                raise ValueError(f"{file_name} is not a history file")
+            _, _, length = _HEADER.unpack(head)
+            header = json.loads(file.read(length))
+            for column, _ in cls.COLUMNS:
+                getattr(history, column).fromfile(file, header["rows"])
+        history.names = header["names"]
+        history.numbers = {column: {name: number for number, name in enumerate(names)} for column, names in history.names.items()}
+        history.rollup()
+        return history
+
+
+TRUE_ANSWERS = ["true", "t", "yes", "y", "1"]
+FALSE_ANSWERS = ["false", "f", "no", "n", "0"]
+
+
+class Question:
+    """
+    One exercise question, created by Engine.
+
+    A question holds everything needed to show it and to check the answer,
+    so questions of many sessions can wait for answers at the same time.
+    """
+
+    __slots__ = ("exercise", "card", "prompt", "options", "cards", "expected", "scheduled", "asked", "answered", "offered", "given")
+
+    def __init__(self, exercise: str, card: LearnObject | None, prompt: str, options: list[str] = None, cards: list[LearnObject] = None, expected=None, scheduled: bool = False) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        exercise - exercise type: "multiple_choice", "write", "year", "true_false" or "connect"
+        card - asked LearnObject, None for connect
+        prompt - text of the question, a hint or a term
+        options - terms to choose from, for multiple choice and connect
+        cards - LearnObjects of the numbered hints, for connect
+        expected - correct answer: a term, a year, True or False, or a list of terms for connect
+        scheduled - True if the card was picked by the learn scheduler
+
+        Variables:
+        self.asked - time the question was created
+        self.answered - time of the first answer
+        self.offered - connect only, dictionary of normalized term and number of its hint
+        self.given - connect only, dictionary of number and term of the valid pairs answered so far
+        """
+        self.exercise = exercise
+        self.card = card
+        self.prompt = prompt
+        self.options = options or []
+        self.cards = cards or []
+        self.expected = expected
+        self.scheduled = scheduled
+        self.offered = {obj.key: number for number, obj in enumerate(self.cards, 1)}
+        self.given: dict[int, str] = {}
+        self.asked = time.perf_counter()
+        self.answered: float | None = None
+
+    def __repr__(self) -> str:
+        return f"Question({self.exercise!r}, {self.prompt!r})"
+
+
+class Result:
+    """
+    Checked answer, returned by Engine.answer.
+
+    A pending result has a typo that needs an overwrite decision, nothing is
+    recorded until the answer is given again with overwrite set.
+    """
+
+    __slots__ = ("question", "answer", "correct", "expected", "typo", "meant", "pairs", "faulty", "pending", "latency", "score")
+
+    def __init__(self, question: Question, answer, correct: bool, expected, typo: bool = False, meant: str = None, pairs: list[tuple] = None, latency: float = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        question - answered Question
+        answer - given answer
+        correct - True if answered correctly or a typo was overwritten
+        expected - correct answer, see Question
+        typo - True if a wrong answer is close to the correct one
+        meant - closest term to a wrong answer, None if there is none
+        pairs - connect only, list of (number, expected term, answered term or None, correct, typo)
+        latency - seconds between the question and the answer
+
+        Variables:
+        self.faulty - connect only, pairs that were not understood and have to be given again
+        self.pending - True if an overwrite decision is needed, or there are faulty pairs
+        self.score - score of the card after the answer, None when scores were not changed
+        """
+        self.question = question
+        self.answer = answer
+        self.correct = correct
+        self.expected = expected
+        self.typo = typo
+        self.meant = meant
+        self.pairs = pairs or []
+        self.faulty: list[str] = []
+        self.pending = False
+        self.latency = latency
+        self.score: int | None = None
+
+    def __repr__(self) -> str:
+        return f"Result({self.question.exercise!r}, correct={self.correct}, pending={self.pending})"
+
+
+class Engine:
+    """
+    Headless exercise engine.
+
+    Creates Question objects and checks answers without input() and print(), so any
+    number of sessions can be driven from one process. LearnSet uses an Engine for its
+    command line exercises.
+
+    Checking an answer is one call. When a wrong answer looks like a typo, the result
+    is pending: answer the same question again with overwrite True or False.
+    """
+
+    PAIR_SEPARATOR = re.compile(r"[,;\n]")
+    PAIR = re.compile(r"\s*(\d+)[.:)]?\s+(\S.*?)\s*")
+
+    def __init__(self, learn_set: "LearnSet", scores: Scores = None, journal: ProgressJournal = None, rng: Random = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        learn_set - LearnSet to take the cards, distractors and typo checks from
+        scores - Scores of the session, default is learn_set.correct
+        journal - ProgressJournal to record answers to, optional
+        rng - Random to pick cards, hints and options with, a seeded one gives the same questions
+
+        Variables:
+        self.scheduler - learn scheduling policy, see start_learn
+        self.missed - number of wrong answers since start_test
+        self.instruments - Instruments to record timings to, None when off
+        self.history - AnswerHistory to record answers to, None when off
+        self.learner - learner name of the answers in self.history
+        """
+        self.set = learn_set
+        self.rng = rng or Random()
+        self.scores = learn_set.correct if scores is None else scores
+        self.journal = journal
+        self.scheduler: Scheduler | SpacedRepetition | None = None
+        self.missed = 0
+        self.instruments: Instruments | None = None
+        self.history: AnswerHistory | None = None
+        self.learner = ""
+
+    def built(self, question: Question, start: float) -> Question:
+        """Record the build time of question, which was started at start."""
+        if self.instruments:
+            self.instruments.add(question.exercise, "build", question.asked - start)
+        return question
+
+    def pick(self, correct: LearnObject = None) -> LearnObject:
+        """Return correct, or a random card when it is not given."""
+        return correct if correct else self.rng.choice(self.set.set)
+
+    def multiple_choice(self, nr_options: int = 4, correct: LearnObject = None, hard: bool = False) -> Question:
+        """
+        Multiple choice question: a random hint and nr_options terms.
+
+        hard - when True, options are terms similar to the correct one
+        """
+        start = time.perf_counter()
+        correct = self.pick(correct)
+        names = [obj.term for obj in self.set.distractors.sample(self.set.set, correct, nr_options - 1, hard, self.rng)]
+        names.append(correct.term)
+        self.rng.shuffle(names)
+        return self.built(Question("multiple_choice", correct, self.rng.choice(correct.hints), names, expected=correct.term), start)
+
+    def write(self, correct: LearnObject = None) -> Question:
+        """Writing question: a random hint, the term has to be written."""
+        start = time.perf_counter()
+        correct = self.pick(correct)
+        return self.built(Question("write", correct, self.rng.choice(correct.hints), expected=correct.term), start)
+
+    def year(self, correct: LearnObject = None) -> Question:
+        """Year question: the term, its year has to be written."""
+        start = time.perf_counter()
+        correct = self.pick(correct)
+        return self.built(Question("year", correct, correct.term, expected=correct.year), start)
+
+    def true_false(self, correct: LearnObject = None) -> Question:
+        """
+        True or false question: a hint and a term, which is its term half of the time.
+
+        correct - when provided, the term of the question
+        """
+        start = time.perf_counter()
+        term = definition = self.pick(correct)
+        if len(self.set.index) > 1 and self.rng.randint(0, 1):
+            while definition.key == term.key:
+                definition = self.rng.choice(self.set.set)
+        return self.built(Question("true_false", term, f"{self.rng.choice(definition.hints)}\n{term.term}", expected=term is definition), start)
+
+    def connect(self, nr_options: int = 8, cards: list[LearnObject] = None) -> Question:
+        """
+        Connect question: numbered hints and shuffled terms, pairs have to be matched.
+
+        cards - when provided, the cards of the question
+        """
+        start = time.perf_counter()
+        cards = list(cards) if cards else self.rng.sample(self.set.set, min(nr_options, len(self.set.set)))
+        names = [obj.term for obj in cards]
+        self.rng.shuffle(names)
+        self.rng.shuffle(cards)
+        prompt = "\n".join(f"{number}. {self.rng.choice(obj.hints)}" for number, obj in enumerate(cards, 1))
+        return self.built(Question("connect", None, prompt, names, cards, [obj.term for obj in cards]), start)
+
+    def ask(self, exercise: str, *args, **kwargs) -> Question:
+        """
+        Create a question of an exercise type.
+
+        raises:
+        ValueError - when the exercise is unknown
+        """
+        if exercise not in ("multiple_choice", "write", "year", "true_false", "connect"):
+            raise ValueError(f"Unknown exercise: {exercise}")
+        return getattr(self, exercise)(*args, **kwargs)
+
+    def start_learn(self, weights: list = None, scheduler: Scheduler | SpacedRepetition = None, resume: bool = False) -> None:
+        """
+        Start a learn session, see LearnSet.learn.
+
+        weights - pick weight for every score level, see Scheduler
+        scheduler - scheduling policy, default is StoreScheduler picking with the rng of the engine
+        resume - continue with the current scores instead of starting from 0
+        """
+        if not resume:
+            self.scores.reset()
+            if self.journal:
+                self.journal.reset()
+        self.scheduler = StoreScheduler(self.set.set, self.scores, MASTERY, weights, self.rng) if scheduler is None else scheduler
+
+    def next(self, nr_options: int = 4) -> Question | None:
+        """
+        Next learn question, picked by the scheduler.
+
+        returns:
+        multiple choice or write Question
+        None when the session is done
+        """
+        if self.scheduler is None:
+            self.start_learn(resume=True)
+        if self.scheduler.done():
+            return None
+        card = self.scheduler.next()
+        if self.scheduler.exercise(card) == "write":
+            question = self.write(card)
+        else:
+            question = self.multiple_choice(nr_options, card)
+        question.scheduled = True
+        return question
+
+    def start_test(self) -> None:
+        """Reset the number of missed answers."""
+        self.missed = 0
+
+    def answer(self, question: Question, answer, overwrite: bool | set = None) -> Result:
+        """
+        Check an answer.
+
+        variables:
+        question - answered Question
+        answer - answer text. For connect also a dictionary of number and term pairs
+        overwrite - decision for a typo of a pending result. For connect True, False
+                    or a set of pair numbers to overwrite
+
+        modifications:
+        scores - +1 for a correct multiple choice or write answer, -1 for a wrong one
+        self.missed - +1 for every wrong answer or connect pair
+
+        returns:
+        Result
+
+        raises:
+        ValueError - when the answer is not valid for the question (eg. not true or false)
+        """
+        start = time.perf_counter()
+        result = self.evaluate(question, answer, overwrite)
+        if self.instruments:
+            self.instruments.answered(question, result, time.perf_counter() - start)
+        if self.history is not None:
+            self.history.answered(question, result, self.learner)
+        return result
+
+    def evaluate(self, question: Question, answer, overwrite: bool | set = None) -> Result:
+        """Check an answer, see answer."""
+        if question.answered is None:
+            question.answered = time.perf_counter()
+        latency = question.answered - question.asked
+        if question.exercise == "connect":
+            return self.check_connect(question, answer, overwrite, latency)
+        if question.exercise == "true_false":
+            answer = answer.strip().lower()
+            if answer not in TRUE_ANSWERS and answer not in FALSE_ANSWERS:
+                raise ValueError("Please enter true or false!")
+            result = Result(question, answer, (answer in TRUE_ANSWERS) == question.expected, question.expected, latency=latency)
+        elif question.exercise == "year":
+            result = Result(question, answer, answer.strip() == question.expected, question.expected, latency=latency)
+        else:
+            result = Result(question, answer, question.card == answer, question.expected, latency=latency)
+            if not result.correct:
+                if self.set.match_ratio(normalize(answer), question.card.key):
+                    result.typo = True
+                    if overwrite is None:
+                        result.pending = True
+                        return result
+                    result.correct = bool(overwrite)
+                else:
+                    meant = self.set.closest(answer)
+                    result.meant = meant[0].term if meant else None
+            score = self.scores[question.card]
+            result.score = score + 1 if result.correct else max(score - 1, 0)
+            self.scores[question.card] = result.score
+        if not result.correct:
+            self.missed += 1
+        if question.scheduled and self.scheduler:
+            self.scheduler.record(question.card, result.correct)
+        if question.card is not None:
+            self.record(question.card, question.exercise, result.correct, latency)
+        return result
+
+    def check_connect(self, question: Question, answer, overwrite: bool | set, latency: float) -> Result:
+        """
+        Check a connect answer, see answer.
+
+        Pairs are added to the pairs answered before, so faulty pairs can be given again on their own.
+        A pair is faulty when it can not be parsed, its number has no hint, or its term is
+        neither offered nor a typo of the correct term. Terms are looked up in question.offered,
+        so checking is linear in the number of pairs.
+        """
+        answers, faulty = (answer, []) if isinstance(answer, dict) else self.parse_pairs(answer)
+        for number, given in answers.items():
+            if 0 < number <= len(question.cards) and (normalize(given) in question.offered or self.set.match_ratio(normalize(given), question.cards[number - 1].key)):
+                question.given[number] = given
+            else:
+                faulty.append(f"{number} {given}")
+        pending = bool(faulty) and overwrite is None
+        pairs = []
+        for number, obj in enumerate(question.cards, 1):
+            given = question.given.get(number)
+            key = None if given is None else normalize(given)
+            correct = key == obj.key
+            typo = key is not None and not correct and key not in question.offered
+            if typo:
+                if overwrite is None:
+                    pending = True
+                else:
+                    correct = overwrite is True or overwrite is not False and number in overwrite
+            pairs.append((number, obj.term, given, correct, typo))
+        result = Result(question, dict(question.given), all(pair[3] for pair in pairs), question.expected, any(pair[4] for pair in pairs), pairs=pairs, latency=latency)
+        result.faulty = faulty
+        result.pending = pending
+        if not pending:
+            self.missed += sum(not pair[3] for pair in pairs)
+        return result
+
+    @classmethod
+    def parse_pairs(cls, answer: str) -> tuple[dict[int, str], list[str]]:
+        """
+        Parse a connect answer in "{nr} {term}, {nr} {term}, ..." format in one pass.
+
+        Pairs can also be separated by ";" or new lines, the number can end with ".", ":" or ")".
+
+        returns:
+        dictionary of definition number and term pairs
+        list of parts that are not pairs
+        """
+        answers = {}
+        faulty = []
+        for part in cls.PAIR_SEPARATOR.split(answer):
+            if not part.strip():
+                continue
+            match = cls.PAIR.fullmatch(part)
+            if match:
+                answers[int(match[1])] = match[2]
+            else:
+                faulty.append(part.strip())
+        return answers, faulty
+
+    def record(self, obj: LearnObject, exercise: str, result: bool, latency: float = None) -> None:
+        """Record an answer to the journal, see LearnSet.record_answer."""
+        if self.journal:
+            self.journal.append(obj.term, exercise, result, self.scores[obj], latency)
+
+    def result(self) -> tuple[list[tuple[str, int]], int, int]:
+        """
+        Session result.
+
+        returns:
+        list of (term, score) pairs of terms with a score
+        total score
+        maximum total score
+        """
+        scored = [(term, score) for term, score in self.scores.items() if score]
+        return scored, sum(score for _, score in scored), len(self.scores) * MASTERY
+
+
+class TestGenerator:
+    """
+    Generates whole tests from a declarative configuration.
+
+    A configuration is a list of sections, every section is a dictionary:
+    {"exercise": "multiple_choice", "count": 4, "difficulty": "hard", "options": 4}
+    or an (exercise, count) pair like in LearnSet.test. Connect sections are one question with count pairs
+    of different terms, at most as many pairs as the set has terms.
+
+    The cards of a test are sampled at once, without replacement across the set while it is big enough.
+    Year questions are drawn first, the other sections are drawn from the remaining terms.
+    The pools of cards that can be asked are cached until the set changes. Tests with the same seed
+    and configuration are the same, so exam variants can be generated ahead.
+    """
+
+    EXERCISES = ("true_false", "multiple_choice", "connect", "write", "year")
+
+    def __init__(self, learn_set: "LearnSet") -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        learn_set - LearnSet to generate tests of
+
+        Variables:
+        self.pools - dictionary of pool name and sorted list of card indices, "terms" has one card of every term,
+                     "years" only cards with a year
+        self.store, self.size - store and length the pools were made of
+        """
+        self.set = learn_set
+        self.pools: dict[str, list[int]] = {}
+        self.store = None
+        self.size = -1
+
+    def pool(self, name: str) -> list[int]:
+        """Card indices of a pool, see self.pools. Pools are rebuilt when the set changes."""
+        store = self.set.set
+        if store is not self.store or len(store) != self.size:
+            self.store = store
+            self.size = len(store)
+            terms = sorted(store.index.values())
+            self.pools = {"terms": terms, "years": [index for index in terms if store.years[index] is not None]}
+        return self.pools[name]
+
+    @classmethod
+    def sections(cls, configuration: list) -> list[dict]:
+        """
+        Normalize a configuration.
+
+        returns:
+        list of dictionaries with exercise, count, difficulty and options
+
+        raises:
+        ValueError - when a section is not a pair or a dictionary, its exercise is missing or unknown,
+                     its count is not a number of at least 0 or it has less than 2 options
+        """
+        if not isinstance(configuration, (list, tuple)):
+            raise ValueError(f"A configuration is a list of sections: {configuration!r}")
+        sections = []
+        for section in configuration:
+            if isinstance(section, (list, tuple)) and len(section) == 2:
+                section = {"exercise": section[0], "count": section[1]}
+            elif not isinstance(section, dict):
+                raise ValueError(f"A section is an (exercise, count) pair or a dictionary: {section!r}")
+            section = {"count": 1, "difficulty": "normal", "options": 4} | section
+            if "exercise" not in section:
+                raise ValueError(f"Section without an exercise: {section}")
+            if not isinstance(section["exercise"], str) or section["exercise"] not in cls.EXERCISES:
+                raise ValueError(f"Unknown exercise: {section['exercise']!r}")
+            for name, minimum in ("count", 0), ("options", 2):
+                if not isinstance(section[name], int) or isinstance(section[name], bool) or section[name] < minimum:
+                    raise ValueError(f"{name} has to be an integer of at least {minimum}: {section}")
+            if section["difficulty"] not in ("normal", "hard"):
+                raise ValueError(f"Unknown difficulty: {section['difficulty']!r}")
+            sections.append(section)
+        return sections
+
+    def draw(self, rng: Random, pool: list[int], number: int) -> list[int]:
+        """Sample number indices of pool, without replacement until the pool is used up."""
+        drawn = []
+        while len(drawn) < number and pool:
+            drawn += rng.sample(pool, min(number - len(drawn), len(pool)))
+        return drawn
+
+    def distinct(self, rng: Random, pool: list[int], indices: list[int]) -> list[int]:
+        """Indices without repeats, for one connect question. Repeats are replaced by other indices of pool."""
+        unique = list(dict.fromkeys(indices))
+        missing = min(len(indices), len(pool)) - len(unique)
+        if missing:
+            chosen = set(unique)
+            unique += rng.sample([index for index in pool if index not in chosen], missing)
+        return unique
+
+    def generate(self, configuration: list = None, seed: int = None) -> list[Question]:
+        """
+        Generate a test.
+
+        variables:
+        configuration - list of sections, see TestGenerator. Default is the LearnSet.test configuration
+        seed - random seed, the same seed gives the same test
+
+        returns:
+        list of Questions in configuration order
+        """
+        sections = self.sections(configuration or [("true_false", 4), ("multiple_choice", 4), ("connect", 8), ("write", 4)])
+        rng = Random(seed)
+        engine = Engine(self.set, rng=rng)
+        engine.instruments = self.set.instruments
+        store = self.set.set
+        wanted = {"terms": 0, "years": 0}
+        for section in sections:
+            wanted["years" if section["exercise"] == "year" else "terms"] += section["count"]
+        years = self.draw(rng, self.pool("years"), wanted["years"])
+        terms = self.pool("terms")
+        taken = set(years)
+        if taken and len(terms) - len(taken) >= wanted["terms"]:
+            terms = [index for index in terms if index not in taken]
+        drawn = {"terms": iter(self.draw(rng, terms, wanted["terms"])), "years": iter(years)}
+        questions = []
+        for section in sections:
+            exercise = section["exercise"]
+            indices = list(islice(drawn["years" if exercise == "year" else "terms"], section["count"]))
+            if exercise == "connect":
+                indices = self.distinct(rng, self.pool("terms"), indices)
+            cards = [store[index] for index in indices]
+            if exercise == "connect":
+                if cards:
+                    questions.append(engine.connect(len(cards), cards))
+            elif exercise == "multiple_choice":
+                questions += [engine.multiple_choice(section["options"], card, section["difficulty"] == "hard") for card in cards]
+            else:
+                questions += [getattr(engine, exercise)(card) for card in cards]
+        return questions
+
+    def variants(self, count: int, configuration: list = None, seed: int = 0) -> list[list[Question]]:
+        """Generate count tests with seeds seed, seed + 1, ..."""
+        return [self.generate(configuration, seed + number) for number in range(count)]
+
+
+class Flashcards:
+    """
+    Flashcards browser.
+
+    Browses a CardStore, UnionStore or CardFile. Cards are read only when they are shown,
+    so browsing a memory-mapped store or a CardFile starts instantly. Cards without data and
+    cards that do not pass the filter are skipped.
+    """
+
+    def __init__(self, source, filter=None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        source - CardStore, UnionStore or CardFile
+        filter - function of LearnObject, cards for which it returns False are skipped, optional
+
+        Variables:
+        self.position - index of the shown card, -1 before the first
+        self.flipped - True when the definition is shown
+        """
+        self.source = source
+        self.filter = filter
+        self.position = -1
+        self.flipped = False
+
+    def exists(self, index: int) -> bool:
+        """Return True if the source has a card at index."""
+        if isinstance(self.source, CardFile):
+            return self.source.exists(index)
+        return 0 <= index < len(self.source)
+
+    def shown(self, index: int) -> LearnObject | None:
+        """Card at index, None when it is skipped."""
+        card = self.source[index]
+        if card is None or self.filter and not self.filter(card):
+            return None
+        return card
+
+    def seek(self, start: int, step: int) -> LearnObject | None:
+        """Move to the first shown card from start in step direction, None if there is none."""
+        index = start
+        while self.exists(index):
+            card = self.shown(index)
+            if card is not None:
+                self.position = index
+                self.flipped = False
+                return card
+            index += step
+        return None
+
+    @property
+    def current(self) -> LearnObject | None:
+        """Shown card."""
+        return self.source[self.position] if self.position >= 0 else None
+
+    @property
+    def number(self) -> int:
+        """Number of the shown card from 1, lines of a CardFile without data are not counted."""
+        if isinstance(self.source, CardFile):
+            return self.source.number(self.position)
+        return self.position + 1
+
+    def first(self) -> LearnObject | None:
+        """Move to the first card."""
+        return self.seek(0, 1)
+
+    def next(self) -> LearnObject | None:
+        """Move to the next card, None at the end."""
+        return self.seek(self.position + 1, 1)
+
+    def last(self) -> LearnObject | None:
+        """Move to the previous card, None at the beginning."""
+        return self.seek(self.position - 1, -1) if self.position > 0 else None
+
+    def jump(self, term: str) -> LearnObject | None:
+        """Move to the card of term, None if it is not found or skipped."""
+        if isinstance(self.source, CardFile):
+            index = self.source.find(term)
+        else:
+            index = self.source.index.get(normalize(term))
+        if index is None or self.shown(index) is None:
+            return None
+        self.position = index
+        self.flipped = False
+        return self.source[index]
+
+    def flip(self) -> str:
+        """Turn the card, returns the text now shown."""
+        self.flipped = not self.flipped
+        card = self.current
+        return card.definition if self.flipped else card.term
+
+
+class LearnSet:
+    """Set of LearnObjects, and exercise functions."""
+
+    def __init__(self, name: str, set: list[LearnObject] = [], correct: dict = {}) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        name - name of the set
+        set - list of LearnObject objects, a CardStore or a UnionStore
+        correct - dictionary of term and amount of correct answers pairs
+
+        Variables:
+        self.name - name of the set
+        self.set - CardStore of the cards, works like a list of LearnObject objects
+        self.correct - Scores, dictionary of term and amount of correct answers pairs
+        self.test_missed_answers - incorrect test answers, see Engine.missed
+        self.min_ratio - minimum ratio which lets answer overwriting. Ratio is calculated with
+                         edit distance, see TypoMatcher
+        self.distractors - DistractorSampler for multiple choice options
+        self.typos - TypoMatcher for typo checks and closest terms
+        self.duplicates - LearnObjects whose term was already in the set
+        self.engine - Engine, creates the questions and checks the answers of the exercises
+        self.instruments - Instruments of the exercises, None until instrument() is called
+        self.tests - TestGenerator of the set
+        self.watcher - SetWatcher of the source file, None until watch() is called
+        self.text - TextIndex of the words of the cards, built on the first search
+        self.history - AnswerHistory of the answers, None until analyze() is called
+        """
+        self.name = name
+        self.duplicates: list[LearnObject] = []
+        if isinstance(set, (CardStore, UnionStore, SubsetStore)):
+            self.set = set
+        else:
+            self.set = CardStore()
+            for obj in set:
+                self.add(obj)
+        self.correct = Scores(self.set, correct)
+        self.min_ratio = 0.8
+        self.distractors = DistractorSampler()
+        self.typos = TypoMatcher()
+        self.journal: ProgressJournal | None = None
+        self.engine = Engine(self)
+        self.instruments: Instruments | None = None
+        self.tests = TestGenerator(self)
+        self.watcher: SetWatcher | None = None
+        self.text = TextIndex()
+        self.history: AnswerHistory | None = None
+        if set:
+            self.set_info()
+
+    def __add__(self, other) -> any:
+        """
+        Class addition method.
+
+        unifies two LearnSet object together and creates a new one, see union.
+
+        returns:
+        unified LearnSet with name union.
+        """
+        return union(self, other)
+
+    def set_info(self):
+        """
+        Print set info
+        """
+        print(f"Set name: {self.name}")
+        print(f"{len(self.set)} terms in the set.")
+        print(f"Typo ratio is {self.min_ratio}\n")
+
+    @property
+    def test_missed_answers(self) -> int:
+        """Number of incorrect test answers."""
+        return self.engine.missed
+
+    @test_missed_answers.setter
+    def test_missed_answers(self, missed: int) -> None:
+        self.engine.missed = missed
+
+    @property
+    def index(self) -> dict[str, int]:
+        """Dictionary of term key and index of its first card in self.set."""
+        return self.set.index
+
+    def add(self, obj: LearnObject) -> None:
+        """
+        Add a term to the set.
+
+        Function copies the LearnObject into self.set, obj becomes a view of the copy.
+        The score of the new card starts at 0.
+        """
+        self.check_duplicate(self.set.append(obj))
+
+    def add_card(self, term: str, definition: str, hint_delimiter: str = ". ", year: str = None, censored: bool = False) -> None:
+        """
+        Add a term to the set without creating a LearnObject.
+
+        variables:
+        term - term
+        definition - term definition
+        hint_delimiter - substring where the definition is split into hints
+        year - year, optional
+        censored - True if the term is already removed from the definition
+        """
+        positions = []
+        if not censored:
+            definition, positions = censor_positions(term, definition)
+        self.check_duplicate(self.set.append_card(term, definition, hint_delimiter, year, positions))
+
+    def patch(self, start: int, stop: int, cards: CardStore) -> tuple[list[str], list[str], list[str]]:
+        """
+        Replace cards start ... stop - 1 with new cards, keeping progress.
+
+        New cards with a term of a replaced card get its score, in the set and in the
+        engine's own score column. The running learn scheduler stops asking removed terms
+        and starts asking new ones. See SetWatcher.
+
+        variables:
+        start, stop - range of the replaced cards
+        cards - CardStore of the new cards
+
+        returns:
+        (new terms, removed terms, changed terms)
+
+        raises:
+        TypeError - when the set is not a CardStore
+        """
+        store = self.set
+        if not isinstance(store, CardStore):
+            raise TypeError("only a set of one CardStore can be patched")
+        store.thaw()
+        replaced: dict[str, int] = {}
+        for index in range(start, stop):
+            replaced.setdefault(store.keys[index], index)
+        own = self.engine.scores.own
+        own_scores = array("h")
+        added, changed, seen = [], [], set()
+        for index, key in enumerate(cards.keys):
+            previous = replaced.get(key)
+            own_scores.append(own[previous] if own is not None and previous is not None and previous < len(own) else 0)
+            if key in seen:
+                continue
+            seen.add(key)
+            if previous is None:
+                if key not in store.index:
+                    added.append(cards.terms[index])
+                continue
+            cards.scores[index] = store.scores[previous]
+            if store.terms[previous] != cards.terms[index] or store.years[previous] != cards.years[index] or store.hints(previous) != cards.hints(index):
+                changed.append(cards.terms[index])
+        gone = {key: store.terms[index] for key, index in replaced.items() if key not in seen}
+        same_keys = store.keys[start:stop] == cards.keys
+        store.splice(start, stop, cards)
+        if own is not None and stop <= len(own):
+            own[start:stop] = own_scores
+        removed = [term for key, term in gone.items() if key not in store.index]
+        self.text.size = -1
+        if not same_keys:
+            for derived in self.distractors, self.typos, self.tests:
+                derived.size = -1
+            scheduler = self.engine.scheduler
+            if isinstance(scheduler, StoreScheduler):
+                scheduler.splice(start, stop, cards.keys)
+            elif scheduler is not None:
+                scheduler.objects = StoreTerms(store)
+                for term in removed:
+                    scheduler.drop(term)
+                for term in added:
+                    scheduler.add(term)
+        return added, removed, changed
+
+    def watch(self, file_name: str, card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", ignore_case: bool = False, inflections: bool = False, others: bool = False) -> "SetWatcher":
+        """
+        Apply edits of the set file while learning, see SetWatcher and reload().
+
+        variables:
+        file_name - the file the set was loaded from
+        card_delimiter, definition_delimiter, hint_delimiter, ignore_case, inflections, others - see set_from_file
+
+        returns:
+        SetWatcher
+        """
+        self.watcher = SetWatcher(self, file_name, card_delimiter, definition_delimiter, hint_delimiter, ignore_case, inflections, others)
+        return self.watcher
+
+    def reload(self) -> "ReloadReport | None":
+        """
+        Apply the edits of the watched file, if it changed.
+
+        returns:
+        ReloadReport, None when there is no watcher or the file did not change
+        """
+        if self.watcher is None:
+            return None
+        report = self.watcher.check()
+        if report is None:
+            return None
+        for card in report.bad_cards:
+            print(f"No data found: {card}")
+        if report.added or report.removed or report.changed:
+            print(f"\nSet reloaded: {len(report.added)} new, {len(report.removed)} removed, {len(report.changed)} changed terms.\n")
+        return report
+
+    def check_duplicate(self, index: int) -> None:
+        """
+        Check whether the card at index has a term that was already in the set.
+
+        Duplicates are added to self.duplicates.
+        """
+        if self.set.index[self.set.keys[index]] != index:
+            print(f"Duplicate term: {self.set.terms[index]}")
+            self.duplicates.append(self.set[index])
+
+    def find(self, term: str) -> LearnObject | None:
+        """
+        Find a LearnObject by term.
+
+        Term is normalized, so case and extra whitespace do not matter.
+
+        returns:
+        LearnObject, if found
+        None otherwise
+        """
+        index = self.set.index.get(normalize(term))
+        return None if index is None else self.set[index]
+
+    def search(self, query: str, name: str = None) -> "LearnSet":
+        """
+        Set of the cards whose term or definition has every word of query.
+
+        Words are compared casefolded, a word ending with * matches every word that starts
+        with it, eg. "french revol*". The cards are not copied, the new set is a view of this
+        set (see SubsetStore), so progress made in it is progress made in this set.
+
+        variables:
+        query - words separated by whitespace
+        name - name of the new set, default is the name of this set and the query
+
+        returns:
+        LearnSet
+        """
+        return LearnSet(name or f"{self.name}: {query}", SubsetStore(self.set, self.text.query(self.set, query)))
+
+    def track(self, file_name: str, **options) -> ProgressJournal:
+        """
+        Save progress to a journal and load the saved progress.
+
+        variables:
+        file_name - base name of the progress files
+        options - ProgressJournal options
+
+        returns:
+        ProgressJournal
+        """
+        if self.journal:
+            self.journal.close()
+        self.journal = self.engine.journal = ProgressJournal(file_name, **options)
+        for term, score in self.journal.scores.items():
+            if term in self.correct:
+                self.correct[term] = score
+        return self.journal
+
+    def instrument(self, per_term: bool = True, profile: bool = False, trace_memory: bool = False) -> Instruments:
+        """
+        Record exercise timings, see Instruments.
+
+        variables:
+        per_term - record totals per term
+        profile - run learn() and test() with cProfile
+        trace_memory - run learn() and test() with tracemalloc
+
+        returns:
+        Instruments
+        """
+        self.instruments = self.engine.instruments = Instruments(per_term, profile, trace_memory)
+        return self.instruments
+
+    def analyze(self, learner: str = "", history: AnswerHistory = None) -> AnswerHistory:
+        """
+        Record every answer to a columnar history, for statistics, see AnswerHistory.
+
+        The result of a learn round is then summed up from the answers of the round.
+
+        variables:
+        learner - learner name of the answers
+        history - AnswerHistory to add to, eg. one loaded with AnswerHistory.load, default is a new one
+
+        returns:
+        AnswerHistory
+        """
+        self.history = self.engine.history = AnswerHistory() if history is None else history
+        self.engine.learner = learner
+        return self.history
+
+    def record_answer(self, obj: LearnObject, exercise: str, result: bool, latency: float = None) -> None:
+        """
+        Record an answer to the tracked progress.
+
+        variables:
+        obj - answered LearnObject
+        exercise - exercise type
+        result - True if answered correctly
+        latency - seconds the user took to answer
+        """
+        self.engine.record(obj, exercise, result, latency)
+
+    def get_result(self, since: int = None) -> None:
+        """
+        Result function.
+
+        prints the result of the learning session. With a history (see analyze) and since,
+        the answers from answer number since are summed up instead of going over every term.
+        """
+        print("Your result:\n")
+        if self.history is not None and since is not None:
+            summary = self.history.summary(since)
+            for term, score in summary["scores"].items():
+                print(f"{term:<15}{score}")
+            print(f"Correct: {summary['correct']} out of {summary['answers']}, typos: {summary['typos']}, overwritten: {summary['overwritten']}\n")
+            return None
+        scored, total, maximum = self.engine.result()
+        for term, score in scored:
+            print(f"{term:<15}{score}")
+        print(f"Total: {total} out of {maximum}\n")
+
+    def get_random(self, number: int) -> LearnObject | list[LearnObject]:
+        """
+        Return number of random LearnObjects from self.set.
+
+        returns:
+        LearnObject, if number is 1
+        list of LearnObjects, if number is greater than 1
+        """
+        if number == 1:
+            return choice(self.set)
+        return sample(self.set, number)
+
+    def match_ratio(self, answer: str, correct: str) -> bool:
+        """
+        Typo checker.
+
+        Checks for possible typos with TypoMatcher
+
+        return:
+        bool - True if ratio is bigger then self.min_ratio else False
+        """
+        return self.typos.match(answer, correct, self.min_ratio)
+
+    def closest(self, answer: str, number: int = 1) -> list[LearnObject]:
+        """
+        Terms closest to answer.
+
+        Only terms with at least self.min_ratio similarity are returned.
+
+        returns:
+        list of LearnObjects, best first
+        """
+        return [self.set[index] for _, index in self.typos.closest(self.set, normalize(answer), self.min_ratio, number)]
+
+    def multiple_choice(self, nr_options: int, correct: LearnObject = None, hard: bool = False) -> bool:
+        """
+        Multiple choice excercise.
+
+        Picks a random LearnObject from self.set and prints a random hint and multiple options.
+
+        variables:
+        nr_options - the number of choices
+
+        optional:
+        correct - when provided, will use provided LearnObject as the correct answer
+        hard - when True, options are terms similar to the correct one
+
+        inputs:
+        answer - users answer to the question
+
+        returns:
+        bool - True if answered correctly
+        """
+        return self.present(self.engine.multiple_choice(nr_options, correct, hard)).correct
+
+    def write_answer(self, correct: LearnObject = None) -> bool:
+        """
+        Writing exercise.
+
+        Picks a random LearnObject from self.set.
+
+        variables:
+        optional:
+        correct - when provided, will use provided LearnObject as the correct answer
+
+        inputs:
+        answer - users answer to the question
+
+        returns:
+        bool - True if answered correctly
+        """
+        return self.present(self.engine.write(correct)).correct
+
+    def ask(self, question: Question, prompt: str) -> Result:
+        """
+        Read an answer and check it, see check.
+
+        Asks again while the answer is not valid for the question.
+
+        returns:
+        Result
+        """
+        answer = input(prompt)
+        while True:
+            try:
+                return self.check(question, answer)
+            except ValueError as error:
+                answer = input(f"{error} ")
+
+    def check(self, question: Question, answer) -> Result:
+        """
+        Check an answer with self.engine and print feedback.
+
+        When the answer looks like a typo, the user is asked whether to overwrite it.
+
+        returns:
+        Result
+
+        raises:
+        ValueError - when the answer is not valid for the question, see Engine.answer
+        """
+        result = self.engine.answer(question, answer)
+        if question.exercise == "connect":
+            return self.connect_feedback(result)
+        if result.pending:
+            print(f"False! Correct: {result.expected}")
+            overwrite = input("There seems to be a typo, overwrite? ").lower() in ["y", "yes", "true", "1", "t"]
+            if overwrite:
+                print("Overwriting...")
+            result = self.engine.answer(question, answer, overwrite)
+        elif result.correct:
+            print("Correct!")
+        elif question.exercise == "true_false":
+            print(f"Incorrect! It was {result.expected}")
+        else:
+            print(f"False! Correct: {result.expected}")
+            if result.meant:
+                print(f"Did you mean {result.meant}?")
+        input("Press {enter} to continue...\n")
+        return result
+
+    def choice_and_answer_check(self, correct: LearnObject, answer: str) -> bool:
+        """
+        Check whether provided answer is correct.
+
+        Checks the multiple choice and write exercise answers.
+
+        Variables:
+        correct - the correct LearnObject object
+        answer - users answer
+
+        modifications:
+        self.correct - modifies the correct LearnObjects correct value, used in learning function
+        self.test_missed_answers - modifies the amount of missed items in a test, used in test function
+
+        returns:
+        bool - True if correct or a typo was overwritten
+        """
+        return self.check(Question("write", correct, "", expected=correct.term), answer).correct
+
+    def year(self, correct: LearnObject = None, ask: bool = True) -> bool:
+        """Ask the year."""
+        question = self.engine.year(correct)
+        if ask:
+            print(question.prompt)
+        return self.ask(question, "Enter the correct year: ").correct
+
+    def year_check(self, correct: LearnObject, answer: str) -> bool:
+        """Check the year."""
+        return self.check(Question("year", correct, correct.term, expected=correct.year), answer).correct
+
+    def learn(self, round_length: int, ask_years: bool = False, weights: list = None, scheduler: Scheduler | SpacedRepetition = None, resume: bool = False) -> None:
+        """
+        Learn module.
+
+        Joint exercise, that uses multiple choice and write exercises.
+        keeps track of how many times a term is answered correctly.
+        dynamically changes the exercise type, if enough multiple choice
+        exercises are answered correctly.
+
+        finish when every term is answered correctly 6 times.
+
+        optional:
+        weights - pick weight for every score level, see Scheduler
+        scheduler - scheduling policy, eg. SpacedRepetition(set.set). Default is StoreScheduler,
+                    which finishes when every term is answered correctly 6 times.
+        resume - continue with the current scores instead of starting from 0, see track()
+        """
+        self.engine.start_learn(weights, scheduler, resume)
+        try:
+            if self.instruments:
+                self.instruments.run("learn", self.learn_rounds, round_length, ask_years)
+            else:
+                self.learn_rounds(round_length, ask_years)
+        finally:
+            if self.journal:
+                self.journal.flush()
+
+    def learn_rounds(self, round_length: int, ask_years: bool) -> None:
+        """Learn rounds until done or the user stops, see learn()."""
+        round_nr = 0
+
+        while True:
+            round_nr += 1
+            start = len(self.history) if self.history is not None else None
+            for question_number in range(round_length):
+                self.reload()
+                question = self.engine.next(4)
+                if question is None:
+                    print("Congratulations! All Done!")
+                    return None
+                print(f"##### {question_number + 1}. #####")
+                self.present(question)
+                if question.card.year:
+                    if ask_years:
+                        self.year(question.card, False)
+                    else:
+                        print(question.card.year)
+                        input("Press {enter} to continue...\n")
+            print("\n")
+            self.get_result(start)
+            if input(f"You are done with round {round_nr}! Continue? ").lower() in ["n", "no", "false", "0", "f"]:
+                print("\n")
+                break
+
+    def connect(self, nr_options: int = 8) -> None:
+        """
+        Connect exercise.
+
+        prints a number of terms and definitions and shuffles them.
+
+        variables:
+        nr_options - the number of randomly picked term
+
+        inputs:
+        answer - the answer to the question, has to be in Enter the correct pairs {nr} {term}, {nr} {term}, ... format.
+        """
+        self.present(self.engine.connect(nr_options))
+
+    def connect_answer_check(self, answer: str) -> dict:
+        """
+        Check the connect answer for format errors and map to dictionary.
+
+        If a pair is not understood, only that pair is asked again.
+        maps the string input to a dictionary with definition number as the key and term as the value.
+
+        returns:
+        dictionary of answered definition number and term pairs
+        """
+        answers, faulty = Engine.parse_pairs(answer)
+        while faulty:
+            print(f"Format error! Not pairs: {'; '.join(faulty)}")
+            answer = input("Enter these pairs again, or press {enter} to skip them:\n")
+            if not answer.strip():
+                break
+            more, faulty = Engine.parse_pairs(answer)
+            answers.update(more)
+        return answers
+
+    def connect_check(self, correct: list, answer: str) -> None:
+        """
+        Check whether provided answer is correct.
 
         Checks the connect exercise.
 
@@ -369,33 +4157,46 @@ class LearnSet:
         modifies:
         self.test_missed_answers - modifies the amount of missed items in a test, used in test function
         """
-        answers = self.connect_answer_check(answer)
-        incorrect_amount = 0
-        for index in range(len(correct)):
-            if index + 1 not in answers:
-                print(f"{index + 1} was not answered. {index + 1} is {correct[index].term}")
-                self.test_missed_answers += 1
-                incorrect_amount += 1
-                input("Press {enter} to continue...\n")
-            elif correct[index] != answers[index + 1]:
-                print(f"Incorrect! {index + 1} is {correct[index].term}, not {answers[index + 1]}")
-                if self.match_ratio(answers[index + 1].lower(), correct[index].lower()):
+        question = Question("connect", None, "", [obj.term for obj in correct], correct, [obj.term for obj in correct])
+        self.check(question, self.connect_answer_check(answer))
+
+    def connect_feedback(self, result: Result) -> Result:
+        """
+        Print feedback for every connect pair, see check.
+
+        Faulty pairs are asked again, typos of a pending result are overwritten when the user agrees.
+
+        returns:
+        Result
+        """
+        while result.pending and result.faulty:
+            print(f"Not understood: {'; '.join(result.faulty)}")
+            answer = input("Enter these pairs again, or press {enter} to skip them:\n")
+            result = self.engine.answer(result.question, answer)
+        overwrite = set()
+        for number, expected, given, correct, typo in result.pairs:
+            if correct:
+                continue
+            if given is None:
+                print(f"{number} was not answered. {number} is {expected}")
+            else:
+                print(f"Incorrect! {number} is {expected}, not {given}")
+                if typo and result.pending:
                     if input("There seems to be a typo, overwrite? ").lower() in ["y", "yes", "true", "1", "t"]:
                         print("Overwriting...")
-                    else:
-                        self.test_missed_answers += 1
-                        incorrect_amount += 1
-                else:
-                    self.test_missed_answers += 1
-                    incorrect_amount += 1
-                input("Press {enter} to continue...\n")
+                        overwrite.add(number)
+            input("Press {enter} to continue...\n")
+        if result.pending:
+            result = self.engine.answer(result.question, result.answer, overwrite)
+        incorrect_amount = sum(not pair[3] for pair in result.pairs)
         if incorrect_amount == 0:
             print("All are Correct!")
         else:
-            print(f"{incorrect_amount} out of {len(correct)} were incorrect.")
+            print(f"{incorrect_amount} out of {len(result.pairs)} were incorrect.")
         input("Press {enter} to continue...\n")
+        return result
 
-    def true_false(self) -> None:
+    def true_false(self) -> bool:
         """
         True or False exercise.
 
@@ -405,25 +4206,13 @@ class LearnSet:
         answer - answer to the question, has to be one of:
                  ["true", "t", "yes", "y"] is True and
                  ["false", "f", "no", "n"] is False
+
+        returns:
+        bool - True if answered correctly
         """
-        if randint(0,1):
-            correct = self.get_random(1)
-            print(choice(correct.hints))
-            print(correct.term)
-            answer = input("True or False? ").lower()
-            while answer not in ["true", "t", "yes", "y", "false", "f", "no", "n"]:
-                answer = input("Please enter true or false! ")
-            self.true_false_check(True, answer)
-        else:
-            term, definition = self.get_random(2)
-            print(choice(definition.hints))
-            print(term.term)
-            answer = input("True or False? ").lower()
-            while answer not in ["true", "t", "yes", "y", "false", "f", "no", "n", ""]:
-                answer = input("Please enter true or false! ")
-            self.true_false_check(False, answer)
+        return self.present(self.engine.true_false()).correct
 
-    def true_false_check(self, correct: bool, answer: str) -> None:
+    def true_false_check(self, correct: bool, answer: str) -> bool:
         """
         Check whether provided answer is correct.
 
@@ -433,26 +4222,29 @@ class LearnSet:
         True and answer is one of ["true", "t", "y", "yes"]
         False and answer is one of ["false", "f", "no", "n"]
 
-        incorrect otherwise.
-        """
-        if answer in ["true", "t", "y", "yes"] and correct or answer in ["false", "f", "no", "n"] and not correct:
-            print("Correct!")
-            input("Press {enter} to continue...\n")
-        else:
-            print(f"Incorrect! It was {str(correct)}")
-            self.test_missed_answers += 1
-            input("Press {enter} to continue...\n")
+        incorrect otherwise. Any other answer is asked again, like in ask.
+
+        returns:
+        bool - True if answered correctly
+        """
+        question = Question("true_false", None, "", expected=correct)
+        while True:
+            try:
+                return self.check(question, answer).correct
+            except ValueError as error:
+                answer = input(f"{error} ")
 
-    def test(self, configuration: list = [("true_false", 4), ("multiple_choice", 4), ("connect", 8), ("write", 4)]) -> None:
+    def test(self, configuration: list = [("true_false", 4), ("multiple_choice", 4), ("connect", 8), ("write", 4)], seed: int = None) -> None:
         """
         A test module.
 
-        Creates a test based on the configuration.
+        Creates a test based on the configuration, see TestGenerator.
+        The whole test is generated before the first question.
 
         configuration:
-        a list of tuples with (exercise_type, number_of_questions) pairs.
+        a list of tuples with (exercise_type, number_of_questions) pairs,
+        or dictionaries with exercise, count, difficulty and options.
         exercises are printed in the order of the list.
-        if an exercise is not found, the pair is skipped.
 
         default configuration:
         [
@@ -462,105 +4254,1073 @@ class LearnSet:
             ("write", 4)
         ]
 
+        optional:
+        seed - random seed, the same seed gives the same test
+
         gives feedback based on how many questions were answered incorrectly.
         """
-        self.test_missed_answers = 0
-
-        for exercise, number in configuration:
-            if exercise == "true_false":
-                print("True OR False?\n")
-                print("-" * 20)
-                for question_number in range(number):
-                    print(f"##### {question_number + 1}. #####")
-                    self.true_false()
-
-            elif exercise == "multiple_choice":
-                print("\n\nMultiple Choice\n")
-                print("-" * 20)
-                for question_number in range(number):
-                    print(f"##### {question_number + 1}. #####")
-                    self.multiple_choice(4)
+        questions = self.tests.generate(configuration, seed)
+        self.engine.start_test()
+        if self.instruments:
+            self.instruments.run("test", self.test_questions, questions)
+        else:
+            self.test_questions(questions)
+        total = sum(section["count"] for section in TestGenerator.sections(configuration))
+        print(f"Well Done! You missed {self.test_missed_answers} out of {total} questions.")
 
-            elif exercise == "write":
-                print("\n\nCorrect Answer\n")
+    def test_questions(self, questions: list[Question]) -> None:
+        """Ask the questions of a test, see test()."""
+        titles = {
+            "true_false": "True OR False?\n",
+            "multiple_choice": "\n\nMultiple Choice\n",
+            "write": "\n\nCorrect Answer\n",
+            "year": "\n\nYear\n",
+            "connect": "\n\nConnect\n",
+        }
+        exercise = None
+        for question in questions:
+            if question.exercise != exercise or question.exercise == "connect":
+                exercise = question.exercise
+                question_number = 0
+                print(titles[exercise])
                 print("-" * 20)
-                for question_number in range(number):
-                    print(f"##### {question_number + 1}. #####")
-                    self.write_answer()
+            if exercise != "connect":
+                question_number += 1
+                print(f"##### {question_number}. #####")
+            self.present(question)
 
-            elif exercise == "connect":
-                print("\n\nConnect\n")
-                print("-" * 20)
-                self.connect(number)
+    def present(self, question: Question) -> Result:
+        """Print a question and ask its answer, see ask."""
+        if question.exercise == "connect":
+            print(question.prompt)
+            print("\n")
+            print(question.options)
+            return self.ask(question, "\nEnter the correct pairs {nr} {term}, {nr} {term}, ...\n")
+        if question.exercise in ("true_false", "year"):
+            print(question.prompt)
+            return self.ask(question, "True or False? " if question.exercise == "true_false" else "Enter the correct year: ")
+        print(question.prompt + "\n")
+        if question.options:
+            print(question.options)
+        return self.ask(question, "Enter the correct term: ")
 
-        print(f"Well Done! You missed {self.test_missed_answers} out of {sum(map(lambda x: x[1], configuration))} questions.")
+    def flashcards(self, below: int = None, source=None) -> None:
+        """
+        Print terms and definitions.
 
-    def flashcards(self) -> None:
-        """Print terms and definitions."""
-        nr = 0
-        term = self.set[nr]
-        flipped = True
+        optional:
+        below - show only cards with a score below this
+        source - cards to browse instead of self.set, eg. a CardFile of a huge set file
+        """
+        browser = Flashcards(self.set if source is None else source, None if below is None else lambda obj: self.correct.get(obj, 0) < below)
+        term = browser.first()
+        if term is None:
+            print("No cards to show.")
+            return None
 
-        print(f"Term #{nr + 1}")
+        print(f"Term #{browser.number}")
         print(term.term)
         while True:
-            inp = input("Next(K), Last(L), Flip(F), Exit(E)? ").lower()
-            if inp not in ["k", "l", "f", "e"]:
+            inp = input("Next(K), Last(L), Flip(F), Jump(J), Exit(E)? ").lower()
+            if inp not in ["k", "l", "f", "j", "e"]:
                 continue
             if inp == "e":
                 print("\nExiting...")
                 break
             if inp == "f":
-                print(term.definition if flipped else term.term)
-                flipped = not flipped
+                print(browser.flip())
                 continue
             if inp == "k":
-                if nr == len(self.set) - 1:
+                term = browser.next()
+                if term is None:
                     over = input("This is the last term. Start over(Y)? ").lower()
-                    nr = -1 if over == "y" else len(self.set) - 2
-                nr += 1
+                    term = browser.first() if over == "y" else browser.current
             elif inp == "l":
-                if nr == 0:
+                term = browser.last()
+                if term is None:
                     print("This is the first term...")
-                    nr = 1
-                nr -= 1
-            term = self.set[nr]
-            print(f"\nTerm #{nr + 1}")
+                    term = browser.current
+            elif inp == "j":
+                term = browser.jump(input("Term: "))
+                if term is None:
+                    print("Term not found.")
+                    term = browser.current
+            print(f"\nTerm #{browser.number}")
             print(term.term)
-            
 
 
-def set_from_file(file_name: str, set_name: str = "default", card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ") -> LearnSet:
+def union(*sets: LearnSet, name: str = "union", duplicates: str = "first") -> LearnSet:
+    """
+    Unify sets without copying their cards.
+
+    The new set is a lazy view of the sets, see UnionStore. Progress made in the union
+    is saved in the scores of the unified sets.
+
+    variables:
+    sets - LearnSet objects
+    name - name of the new set
+    duplicates - how to resolve duplicate terms, "first", "last" or "error"
+
+    returns:
+    LearnSet
+    """
+    return LearnSet(name, UnionStore([set.set for set in sets], duplicates))
+
+
+class CardFile:
+    """
+    Lazy cards of a set file.
+
+    The file is memory-mapped and card start offsets are found on demand, so opening a
+    file of any size is instant. Cards are parsed and censored when they are read, decoded
+    cards are kept in an LRU cache. Reading a card that is not cached also decodes the
+    next prefetch cards.
+    """
+
+    def __init__(self, file_name: str, card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", cache_size: int = 1024, prefetch: int = 16) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        file_name - name of the set file
+        card_delimiter, definition_delimiter, hint_delimiter - see set_from_file
+        cache_size - maximum number of decoded cards kept
+        prefetch - number of cards decoded ahead
+
+        Variables:
+        self.starts - start offset of every card found so far
+        self.numbers - number of cards with data before every card, counted so far, see number
+        self.complete - True when the whole file is scanned
+        self.cache - LRU dictionary of card index and LearnObject (None for comments and bad cards)
+        """
+        self.file_name = file_name
+        self.card_delimiter = card_delimiter
+        self.delimiter = card_delimiter.encode("UTF-8")
+        self.definition_delimiter = definition_delimiter
+        self.hint_delimiter = hint_delimiter
+        self.cache_size = cache_size
+        self.prefetch = prefetch
+        self.cache: OrderedDict[int, LearnObject | None] = OrderedDict()
+        self.starts = array("Q", [0])
+        self.numbers = array("Q", [0])
+        with open(file_name, "rb") as file:
+            self.size = os.fstat(file.fileno()).st_size
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.complete = not self.size
+
+    def close(self) -> None:
+        """Close the memory map."""
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+    def scan(self, cards: int = None, offset: int = None) -> None:
+        """
+        Find card starts, until more than cards are known or offset is passed.
+
+        Chunks are split on the card delimiter at once, without a python loop per card.
+        """
+        width = len(self.delimiter)
+        while not self.complete and (cards is not None and len(self.starts) <= cards or offset is not None and self.starts[-1] <= offset):
+            position = self.starts[-1]
+            chunk = self.map[position:position + READ_CHUNK_SIZE]
+            last = chunk.rfind(self.delimiter)
+            if last == -1:
+                end = self.map.find(self.delimiter, position + len(chunk) - width + 1)
+                if end == -1:
+                    self.complete = True
+                else:
+                    self.starts.append(end + width)
+                continue
+            starts = accumulate((len(part) + width for part in chunk[:last].split(self.delimiter)), initial=position)
+            next(starts)
+            self.starts.extend(starts)
+            if self.starts[-1] >= self.size:
+                self.complete = True
+
+    def exists(self, index: int) -> bool:
+        """Return True if the file has a card at index."""
+        if index < 0:
+            return False
+        self.scan(cards=index + 1)
+        return index < len(self.starts) and self.starts[index] < self.size
+
+    def __len__(self) -> int:
+        """Number of cards, scans the whole file."""
+        self.scan(cards=float("inf"))
+        return len(self.starts) - (self.starts[-1] >= self.size)
+
+    def raw(self, index: int) -> str:
+        """Text of the card at index."""
+        self.scan(cards=index + 1)
+        start = self.starts[index]
+        end = self.starts[index + 1] - len(self.delimiter) if index + 1 < len(self.starts) else self.size
+        card = self.map[start:end].decode("UTF-8")
+        return card.rstrip("\r") if self.card_delimiter == "\n" else card
+
+    def decode(self, index: int) -> LearnObject | None:
+        """Parse and censor the card at index, None for comments and cards without data."""
+        parsed = parse_card(self.raw(index), self.definition_delimiter)
+        if not isinstance(parsed, tuple):
+            return None
+        term, year, definition = parsed
+        return LearnObject(term, definition, self.hint_delimiter, year)
+
+    def number(self, index: int) -> int:
+        """
+        Number of the card at index from 1, comments and cards without data are not counted.
+
+        This is the number the card has in a set loaded from the file. Cards before index are
+        checked once on the raw bytes, the counts are kept for later calls.
+        """
+        self.scan(cards=index + 1)
+        known = len(self.numbers) - 1
+        if known < index:
+            delimiter = self.definition_delimiter.encode("UTF-8")
+            cards = self.map[self.starts[known]:self.starts[index]].split(self.delimiter)[:index - known]
+            data = (not card.startswith(b"\\\\") and 1 <= card.count(delimiter) <= 2 for card in cards)
+            self.numbers.extend(islice(accumulate(data, initial=self.numbers[-1]), 1, None))
+        return self.numbers[index] + 1
+
+    def __getitem__(self, index: int) -> LearnObject | None:
+        """
+        Card at index, see decode.
+
+        raises:
+        IndexError - when there is no card at index
+        """
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+        if not self.exists(index):
+            raise IndexError(index)
+        for ahead in range(index, index + max(self.prefetch, 1)):
+            if ahead not in self.cache and self.exists(ahead):
+                self.cache[ahead] = self.decode(ahead)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return self.cache[index] if index in self.cache else self.decode(index)
+
+    def find(self, term: str) -> int | None:
+        """
+        Index of the first card of term.
+
+        The memory-mapped file is searched for the term as written first, then with a regular
+        expression where case and extra whitespace do not matter.
+
+        returns:
+        index, None if not found
+        """
+        key = normalize(term)
+        if not key:
+            return None
+        head = term.strip().encode("UTF-8")
+        position = -1
+        if self.map[:len(head)] == head:
+            position = 0
+        else:
+            found = self.map.find(self.delimiter + head)
+            position = found + len(self.delimiter) if found != -1 else -1
+        while position != -1:
+            if self.is_card(position, key):
+                return self.index_of(position)
+            found = self.map.find(self.delimiter + head, position)
+            position = found + len(self.delimiter) if found != -1 else -1
+        pattern = rb"\s+".join(re.escape(word.encode("UTF-8")) for word in key.split(" "))
+        for match in re.finditer(rb"(?i:" + pattern + rb")", self.map):
+            start = self.map.rfind(self.delimiter, 0, match.start())
+            start = 0 if start == -1 else start + len(self.delimiter)
+            if self.is_card(start, key):
+                return self.index_of(start)
+        return None
+
+    def is_card(self, position: int, key: str) -> bool:
+        """Return True if the card starting at position has the term key."""
+        end = self.map.find(self.delimiter, position)
+        card = self.map[position:end if end != -1 else self.size].decode("UTF-8", "replace")
+        return not card.startswith("\\\\") and normalize(card.split(self.definition_delimiter, 1)[0]) == key and self.definition_delimiter in card
+
+    def index_of(self, position: int) -> int:
+        """Index of the card starting at position."""
+        self.scan(offset=position)
+        return bisect_right(self.starts, position) - 1
+
+
+class ReloadReport:
+    """Result of applying the edits of a watched file, see SetWatcher."""
+
+    def __init__(self, file_name: str) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        file_name - name of the file
+
+        Variables:
+        self.added - terms that are new in the set
+        self.removed - terms that are no longer in the set
+        self.changed - terms whose card changed
+        self.bad_cards - re-parsed cards without data
+        self.cards - number of re-parsed cards
+        self.bytes - number of re-parsed bytes
+        """
+        self.file_name = file_name
+        self.added: list[str] = []
+        self.removed: list[str] = []
+        self.changed: list[str] = []
+        self.bad_cards: list[str] = []
+        self.cards = 0
+        self.bytes = 0
+
+    def __repr__(self) -> str:
+        """Class representation."""
+        return f"ReloadReport({self.file_name!r}, added={len(self.added)}, removed={len(self.removed)}, changed={len(self.changed)}, cards={self.cards}, bytes={self.bytes})"
+
+
+class SetWatcher:
+    """
+    Applies edits of a set file to a live LearnSet.
+
+    The watcher keeps the file offset of every card of the set and crc32 checksums of the
+    file in BLOCK_SIZE blocks, counted from the start and from the end. When the file
+    changes, the blocks that still match at both ends give the edited byte range. Only the
+    cards that overlap it are parsed and censored again, and replace the old cards with
+    LearnSet.patch, so progress of every unchanged term is kept.
+
+    Checksumming reads the whole file in C, parsing and censoring cost only depends on
+    the size of the edit. Cards of the set must come from the file in order, cards added
+    in code after loading are kept. When other terms are censored (see Censor), an edit that
+    changes the terms of the file re-parses the whole file, as other definitions can name them.
+    """
+
+    def __init__(self, learn_set: "LearnSet", file_name: str, card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", ignore_case: bool = False, inflections: bool = False, others: bool = False) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        learn_set - LearnSet loaded from file_name, its set must be a CardStore
+        file_name - name of the set file
+        card_delimiter, definition_delimiter, hint_delimiter, ignore_case, inflections, others - see set_from_file
+
+        Variables:
+        self.censor - Censor of the edited cards, it has the terms of the file when others is True
+        self.offsets - file offset of every card of the set that is in the file
+        self.forward - checksums of the full blocks from the start of the file
+        self.backward - checksums of the full blocks from the end of the file
+        self.stat - (modification time, size) of the indexed file
+
+        raises:
+        TypeError - when the set is not a CardStore
+        ValueError - when the file has more cards than the set
+        """
+        if not isinstance(learn_set.set, CardStore):
+            raise TypeError("only a set of one CardStore can be watched")
+        self.set = learn_set
+        self.file_name = file_name
+        self.card_delimiter = card_delimiter
+        self.delimiter = card_delimiter.encode("UTF-8")
+        self.definition_delimiter = definition_delimiter
+        self.hint_delimiter = hint_delimiter
+        self.ignore_case = ignore_case
+        self.inflections = inflections
+        self.others = others
+        self.censor = Censor(ignore_case=ignore_case, inflections=inflections)
+        self.offsets = array("Q")
+        self.forward = array("I")
+        self.backward = array("I")
+        self.size = 0
+        self.stat: tuple[int, int] | None = None
+        self.index()
+        if others:
+            self.censor = Censor(list(islice(learn_set.set.terms, len(self.offsets))), ignore_case, inflections, others)
+
+    def index(self) -> None:
+        """
+        Find the file offset of every card of the set and checksum the file.
+
+        When every card of the file has data, the card starts found by CardFile are the offsets,
+        otherwise every card is parsed once to skip comments and cards without data.
+        """
+        stat = os.stat(self.file_name)
+        cards = CardFile(self.file_name, self.card_delimiter, self.definition_delimiter, self.hint_delimiter)
+        try:
+            number = len(cards)
+            if number == len(self.set.set):
+                offsets = cards.starts[:number]
+            else:
+                offsets = array("Q", (cards.starts[index] for index in range(number) if isinstance(parse_card(cards.raw(index), self.definition_delimiter), tuple)))
+            if len(offsets) > len(self.set.set):
+                raise ValueError(f"{self.file_name} has more cards than the set")
+            self.offsets = offsets
+            self.size = cards.size
+            self.forward, self.backward = self.checksums(cards.map, cards.size)
+        finally:
+            cards.close()
+        self.stat = (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def checksums(data, size: int) -> tuple[array, array]:
+        """
+        Checksums of the full blocks of data.
+
+        returns:
+        (checksums from the start, checksums from the end)
+        """
+        forward = array("I", (zlib.crc32(data[start:start + BLOCK_SIZE]) for start in range(0, size - BLOCK_SIZE + 1, BLOCK_SIZE)))
+        backward = array("I", (zlib.crc32(data[end - BLOCK_SIZE:end]) for end in range(size, BLOCK_SIZE - 1, -BLOCK_SIZE)))
+        return forward, backward
+
+    @staticmethod
+    def matching(old: array, new: array) -> int:
+        """Number of equal leading checksums."""
+        for number, (first, second) in enumerate(zip(old, new)):
+            if first != second:
+                return number
+        return min(len(old), len(new))
+
+    def check(self) -> ReloadReport | None:
+        """
+        Apply the edits of the file to the set, if the file changed.
+
+        returns:
+        ReloadReport, None when the file did not change or can not be read
+        """
+        try:
+            stat = os.stat(self.file_name)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) == self.stat:
+            return None
+        try:
+            with open(self.file_name, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        except OSError:
+            return None
+        try:
+            report = self.apply(data, size)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self.stat = (stat.st_mtime_ns, stat.st_size)
+        return report
+
+    def apply(self, data, size: int) -> ReloadReport:
+        """
+        Re-parse the edited cards of the new file contents and patch the set.
+
+        The edited range is widened to whole cards of the set: it starts at the last card
+        that starts before the edit, and ends at the first card whose preceding delimiter
+        is after the edit. Both are card starts in the old and in the new file.
+
+        variables:
+        data - new file contents
+        size - size of data
+
+        returns:
+        ReloadReport
+        """
+        report = ReloadReport(self.file_name)
+        forward, backward = self.checksums(data, size)
+        prefix = self.matching(self.forward, forward) * BLOCK_SIZE
+        suffix = min(self.matching(self.backward, backward) * BLOCK_SIZE, min(self.size, size) - prefix)
+        width = len(self.delimiter)
+        first = bisect_right(self.offsets, prefix) - 1
+        if first < 0:
+            first, start = 0, 0
+        else:
+            start = self.offsets[first]
+        last = bisect_left(self.offsets, self.size - suffix + width)
+        end = (self.offsets[last] if last < len(self.offsets) else self.size) + size - self.size
+        starts, terms, years, definitions = self.parse(data, size, start, end, report)
+        if self.others and set(terms) != set(map(self.set.set.terms.__getitem__, range(first, last))):
+            report.bad_cards.clear()
+            first, last, start, end = 0, len(self.offsets), 0, size
+            starts, terms, years, definitions = self.parse(data, size, start, end, report)
+            self.censor = Censor(terms, self.ignore_case, self.inflections, self.others)
+        cards = CardStore()
+        if terms:
+            censored = list(self.censor.censor_all(terms, definitions))
+            cards.extend_cards(terms, [card[0] for card in censored], self.hint_delimiter, years, [card[1] for card in censored], [card[2] for card in censored])
+        report.added, report.removed, report.changed = self.set.patch(first, last, cards)
+        report.cards = len(cards)
+        report.bytes = end - start
+        self.offsets[first:] = starts + shift_offsets(self.offsets[last:], size - self.size)
+        self.forward, self.backward, self.size = forward, backward, size
+        return report
+
+    def parse(self, data, size: int, start: int, end: int, report: ReloadReport) -> tuple[array, list, list, list]:
+        """
+        Parse the cards of data from offset start to offset end, cards without data go to the report.
+
+        returns:
+        (file offsets, terms, years, definitions) of the cards
+        """
+        width = len(self.delimiter)
+        chunk = data[start:end - width] if end < size else data[start:end]
+        parts = chunk.split(self.delimiter) if end > start else []
+        if end == size and parts and not parts[-1]:
+            parts.pop()
+        offsets = accumulate((len(part) + width for part in parts), initial=start)
+        starts, terms, years, definitions = array("Q"), [], [], []
+        for part, offset in zip(parts, offsets):
+            card = part.decode("UTF-8")
+            parsed = parse_card(card, self.definition_delimiter)
+            if parsed is None:
+                continue
+            if isinstance(parsed, str):
+                report.bad_cards.append(parsed)
+                continue
+            starts.append(offset)
+            terms.append(parsed[0])
+            years.append(parsed[1])
+            definitions.append(parsed[2])
+        return starts, terms, years, definitions
+
+
+def iter_raw_cards(file_name: str, card_delimiter: str = "\n"):
+    """
+    Stream raw cards from a file.
+
+    Reads the file in chunks and yields cards as soon as they are complete,
+    so the whole file is never held in memory.
+
+    yields:
+    card strings
+    """
+    with open(f"{file_name}", "r", encoding="UTF-8") as file:
+        buffer = ""
+        while True:
+            chunk = file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            cards = buffer.split(card_delimiter)
+            buffer = cards.pop()
+            yield from cards
+        yield buffer
+
+
+def iter_cards(file_name: str, card_delimiter: str = "\n", definition_delimiter: str = " - "):
+    """
+    Stream cards from a file.
+
+    variables:
+    file_name - name of the file
+    card_delimiter - delimiter of cards, default newline (\n)
+    definition_delimiter - delimiter of term and definition, default " - "
+
+    yields:
+    (term, year, definition) tuple, year is None when not given
+    raw card string, when the card has no data
+    comments (cards starting with \\\\) are skipped
+    """
+    for card in iter_raw_cards(file_name, card_delimiter):
+        parsed = parse_card(card, definition_delimiter)
+        if parsed is not None:
+            yield parsed
+
+
+def parse_card(card: str, definition_delimiter: str = " - ") -> tuple | str | None:
+    """
+    Parse one card.
+
+    returns:
+    (term, year, definition) tuple, year is None when not given
+    the card itself, when no data is found
+    None, when the card is a comment
+    """
+    if card.startswith("\\\\"):
+        return None
+    split = card.split(definition_delimiter)
+    if len(split) == 2:
+        term, definition = split
+        return term, None, definition
+    if len(split) == 3:
+        term, year, definition = split
+        return term, year, definition
+    return card
+
+
+def cache_key(file_name: str, card_delimiter: str, definition_delimiter: str, hint_delimiter: str, ignore_case: bool = False, inflections: bool = False, others: bool = False) -> bytes:
+    """
+    Compiled set cache key.
+
+    Key changes when the file path, modification time, size, any of the delimiters
+    or the censor options change.
+
+    returns:
+    key as bytes
+    """
+    stat = os.stat(file_name)
+    return json.dumps([
+        os.path.abspath(file_name),
+        stat.st_mtime_ns,
+        stat.st_size,
+        card_delimiter,
+        definition_delimiter,
+        hint_delimiter,
+        ignore_case,
+        inflections,
+        others
+    ]).encode("UTF-8")
+
+
+def encode_strings(strings, ends: array, present: array = None):
+    """
+    Encode strings to utf-8 in chunks.
+
+    Appends the end offset of every string to ends, and 0 or 1 to present for None strings.
+
+    yields:
+    utf-8 chunks
+    """
+    end = 0
+    chunk = []
+    for string in strings:
+        if present is not None:
+            present.append(string is not None)
+        encoded = b"" if string is None else string.encode("UTF-8")
+        end += len(encoded)
+        ends.append(end)
+        chunk.append(encoded)
+        if len(chunk) >= WRITE_CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk = []
+    yield b"".join(chunk)
+
+
+def save_store(file_name: str, store: CardStore, key: bytes = b"", index: bool = False, report: "LoadReport" = None) -> None:
+    """
+    Save a CardStore to a binary file.
+
+    File layout:
+    header - magic, version, key length, key, table offset and length
+    sections - the columns of the store, 8 byte aligned
+    table - json with the card count, hint delimiters, the offset and length of every section
+            and the bad cards and duplicates of the report
+
+    Columns are written as they are, strings are encoded in chunks, so saving never builds
+    the whole file in memory. The file is written under a temporary name and moved in place.
+
+    variables:
+    file_name - name of the file
+    store - CardStore, a UnionStore or SubsetStore is copied into one store first
+    key - cache key, see cache_key
+    index - also save the key index as a hash table, see MappedIndex
+    report - LoadReport of the parsed file, its bad cards and duplicates are loaded with the store, optional
+    """
+    if not isinstance(store, CardStore):
+        store = store.compact()
+    temp_name = f"{file_name}.{os.getpid()}.tmp"
+    sections = {}
+    try:
+        with open(temp_name, "wb") as file:
+            file.write(_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(key)))
+            file.write(key)
+            table_position = file.tell()
+            file.write(_TABLE.pack(0, 0))
+
+            def section(name: str, chunks) -> None:
+                file.write(b"\0" * (-file.tell() % 8))
+                start = file.tell()
+                for chunk in chunks:
+                    file.write(chunk)
+                sections[name] = [start, file.tell() - start]
+
+            def strings(name: str, column, optional: bool = False) -> None:
+                if isinstance(column, StringColumn):
+                    section(name, [column.blob])
+                    section(name + "_ends", [column.ends])
+                    if optional:
+                        section(name + "_present", [column.present])
+                    return None
+                ends = array("Q")
+                present = array("B") if optional else None
+                section(name, encode_strings(column, ends, present))
+                section(name + "_ends", [ends])
+                if optional:
+                    section(name + "_present", [present])
+
+            for name in ["hint_ends", "card_ends", "censor_positions", "censor_ends", "scores", "buffer"]:
+                section(name, [getattr(store, name)])
+            strings("terms", store.terms)
+            strings("keys", store.keys)
+            strings("years", store.years, optional=True)
+            if isinstance(store.delimiters, TableColumn):
+                table, ids = store.delimiters.table, store.delimiters.ids
+            else:
+                table, ids = [], array("H")
+                positions = {}
+                for delimiter in store.delimiters:
+                    if delimiter not in positions:
+                        positions[delimiter] = len(table)
+                        table.append(delimiter)
+                    ids.append(positions[delimiter])
+            section("delimiters", [ids])
+            section("censor_originals", [json.dumps(list(store.censor_originals.items())).encode("UTF-8")])
+            if index:
+                if isinstance(store.index, MappedIndex):
+                    slots, rows = store.index.slots, store.index.rows
+                else:
+                    rows = array("Q", sorted(store.index.values()))
+                    slots = MappedIndex.build(store.keys, rows)
+                section("index_slots", [slots])
+                section("index_rows", [rows])
+
+            file.write(b"\0" * (-file.tell() % 8))
+            table_offset = file.tell()
+            content = {"count": len(store), "delimiters": table, "sections": sections}
+            if report is not None:
+                content["bad_cards"] = report.bad_cards
+                content["duplicates"] = report.duplicates
+            content = json.dumps(content).encode("UTF-8")
+            file.write(content)
+            file.seek(table_position)
+            file.write(_TABLE.pack(table_offset, len(content)))
+        os.replace(temp_name, file_name)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def load_store(file_name: str, key: bytes = None, shared: bool = False, report: "LoadReport" = None) -> CardStore:
+    """
+    Load a CardStore from a binary file.
+
+    The file is memory-mapped copy-on-write, the columns of the store are views of the map.
+    Nothing is decoded until it is used and changed scores are never written back to the file.
+    A saved index is used as it is, see MappedIndex.
+
+    variables:
+    file_name - name of the file
+    key - when given, the key the file was saved with has to match
+    shared - map the file read-only, pages are never copied and the scores can not be changed
+    report - LoadReport to fill with the bad cards and duplicates the file was saved with, optional
+
+    raises:
+    ValueError - when the file is not a saved store, has a different version or key
+
+    returns:
+    CardStore
+    """
+    with open(file_name, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ if shared else mmap.ACCESS_COPY)
+    try:
+        magic, version, key_length = _HEADER.unpack_from(mapped, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{file_name} is not a version {STORE_VERSION} set file")
+        position = _HEADER.size
+        if key is not None and mapped[position:position + key_length] != key:
+            raise ValueError(f"{file_name} is out of date")
+        table_offset, table_length = _TABLE.unpack_from(mapped, position + key_length)
+        table = json.loads(mapped[table_offset:table_offset + table_length])
+    except (ValueError, struct.error):
+        mapped.close()
+        raise
+    view = memoryview(mapped)
+
+    def column(name: str, format: str = "B") -> memoryview:
+        start, length = table["sections"][name]
+        return view[start:start + length].cast(format)
+
+    store = CardStore()
+    store.mapped = True
+    store.terms = StringColumn(column("terms"), column("terms_ends", "Q"))
+    store.keys = StringColumn(column("keys"), column("keys_ends", "Q"))
+    store.years = StringColumn(column("years"), column("years_ends", "Q"), column("years_present"))
+    store.delimiters = TableColumn(table["delimiters"], column("delimiters", "H"))
+    store.buffer = column("buffer")
+    store.hint_ends = column("hint_ends", "Q")
+    store.card_ends = column("card_ends", "Q")
+    store.censor_positions = column("censor_positions", "I")
+    store.censor_ends = column("censor_ends", "Q")
+    store.censor_originals = {int(number): text for number, text in json.loads(bytes(column("censor_originals")))}
+    store.scores = column("scores", "h")
+    store._index = None
+    if "index_slots" in table["sections"]:
+        store._index = MappedIndex(store.keys, column("index_slots", "Q"), column("index_rows", "Q"))
+    if report is not None:
+        report.cards = len(store)
+        report.bad_cards = [tuple(card) for card in table.get("bad_cards", [])]
+        report.duplicates = [tuple(card) for card in table.get("duplicates", [])]
+    return store
+
+
+def save_set(file_name: str, set: "LearnSet") -> None:
+    """
+    Save a LearnSet to a binary file.
+
+    Lossless: keeps years, raw and censored definitions, hints and scores. See save_store.
+    """
+    save_store(file_name, set.set)
+
+
+def load_set(file_name: str, set_name: str = "default") -> "LearnSet":
+    """
+    Load a LearnSet saved with save_set.
+
+    returns:
+    LearnSet object
+    """
+    set = LearnSet(set_name, load_store(file_name))
+    if not set.set:
+        set.set_info()
+    return set
+
+
+def publish_set(file_name: str, set: "LearnSet") -> None:
+    """
+    Save a LearnSet for worker processes, see attach_set.
+
+    The file is saved with its key index. A file in /dev/shm is kept in shared memory.
+    """
+    save_store(file_name, set.set, index=True)
+
+
+def attach_set(file_name: str, set_name: str = "default") -> "LearnSet":
+    """
+    Use a LearnSet published with publish_set.
+
+    The file is memory-mapped read-only: terms, hints, years and the key index are shared by every
+    process that attaches it, nothing is copied or decoded up front. Scores are a private column of
+    the process, sessions take their own with Scores.detached. Adding cards copies the set into the
+    process, the private score columns grow with it.
+
+    returns:
+    LearnSet object
+    """
+    store = load_store(file_name, shared=True)
+    set = LearnSet(set_name, store)
+    set.correct = set.engine.scores = Scores.detached(store)
+    return set
+
+
+class LoadReport:
+    """Result of loading one file."""
+
+    def __init__(self, file_name: str) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        file_name - name of the file
+
+        Variables:
+        self.cards - number of cards loaded
+        self.bad_cards - list of (card number, card) pairs of cards without data
+        self.duplicates - list of (card number, term) pairs of terms that were already in the file
+        self.error - error message, when the file could not be loaded
+        self.cache - name of the compiled set the cards were saved to
+        self.store - CardStore, when the cards were not saved to a compiled set
+        """
+        self.file_name = file_name
+        self.cards = 0
+        self.bad_cards: list[tuple[int, str]] = []
+        self.duplicates: list[tuple[int, str]] = []
+        self.error: str | None = None
+        self.cache: str | None = None
+        self.store: CardStore | None = None
+
+    def __repr__(self) -> str:
+        """Class representation."""
+        if self.error:
+            return f"LoadReport({self.file_name!r}, error={self.error!r})"
+        return f"LoadReport({self.file_name!r}, cards={self.cards}, bad_cards={len(self.bad_cards)}, duplicates={len(self.duplicates)})"
+
+
+def compile_file(file_name: str, card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", report: LoadReport = None, ignore_case: bool = False, inflections: bool = False, others: bool = False) -> CardStore:
+    """
+    Parse and censor a file into a CardStore.
+
+    Cards without data and duplicate terms are recorded in the report.
+    When other terms are censored, all cards are parsed first and the definitions
+    are censored as one column, see Censor.
+
+    variables:
+    file_name, card_delimiter, definition_delimiter, hint_delimiter - see set_from_file
+    report - LoadReport to record problems in, optional
+    ignore_case, inflections, others - censor options, see Censor
+
+    returns:
+    CardStore
+    """
+    report = report or LoadReport(file_name)
+    store = CardStore()
+    numbers, terms, years, definitions = [], [], [], []
+
+    def flush(censor: Censor) -> None:
+        censored = list(censor.censor_all(terms, definitions))
+        first = store.extend_cards(terms, [card[0] for card in censored], hint_delimiter, years, [card[1] for card in censored], [card[2] for card in censored])
+        for index, number in enumerate(numbers, first):
+            if store.index[store.keys[index]] != index:
+                report.duplicates.append((number, store.terms[index]))
+        for column in numbers, terms, years, definitions:
+            column.clear()
+
+    censor = Censor(ignore_case=ignore_case, inflections=inflections)
+    for number, card in enumerate(iter_raw_cards(file_name, card_delimiter), 1):
+        parsed = parse_card(card, definition_delimiter)
+        if parsed is None:
+            continue
+        if isinstance(parsed, str):
+            report.bad_cards.append((number, parsed))
+            continue
+        numbers.append(number)
+        terms.append(parsed[0])
+        years.append(parsed[1])
+        definitions.append(parsed[2])
+        if not others and len(numbers) == BATCH_SIZE:
+            flush(censor)
+    if numbers:
+        flush(Censor(terms, ignore_case, inflections, others) if others else censor)
+    report.cards = len(store)
+    return store
+
+
+def load_file(job: tuple[str, dict, bool]) -> LoadReport:
+    """
+    Load one file for sets_from_files, runs in a worker process.
+
+    The cards are saved to the compiled set cache, so the main process can memory-map them.
+    When the cache can not be used, the store is returned in the report.
+
+    variables:
+    job - (file name, delimiter settings, use cache)
+
+    returns:
+    LoadReport
+    """
+    file_name, settings, cache = job
+    report = LoadReport(file_name)
+    try:
+        key = cache_key(file_name, **settings)
+        if cache:
+            try:
+                load_store(file_name + CACHE_SUFFIX, key, report=report)
+                report.cache = file_name + CACHE_SUFFIX
+                return report
+            except (OSError, ValueError, KeyError, struct.error):
+                pass
+        store = compile_file(file_name, report=report, **settings)
+        if cache:
+            try:
+                save_store(file_name + CACHE_SUFFIX, store, key, index=True, report=report)
+                report.cache = file_name + CACHE_SUFFIX
+                return report
+            except OSError:
+                pass
+        report.store = store
+    except (OSError, UnicodeError) as error:
+        report.error = f"{type(error).__name__}: {error}"
+    return report
+
+
+def sets_from_files(files: str | list[str], set_name: str = "union", card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", settings: dict = None, duplicates: str = "first", processes: int = None, cache: bool = True, ignore_case: bool = False, inflections: bool = False, others: bool = False) -> tuple[LearnSet, list[LoadReport]]:
+    """
+    Create one LearnSet from many files.
+
+    Files are parsed and censored in a process pool. Every worker saves its file to the
+    compiled set cache, the main process memory-maps them and unifies them with a UnionStore.
+
+    variables:
+    files - list of file names or a glob pattern, eg. "sets/*.txt"
+    set_name - name of the set
+    card_delimiter, definition_delimiter, hint_delimiter - default delimiters, see set_from_file
+    settings - dictionary of file name and dictionary of delimiters and censor options for that file,
+               eg. {"dates.txt": {"definition_delimiter": "\t"}}
+    duplicates - duplicate term policy between files, see UnionStore
+    processes - number of worker processes, default number of cpus. 1 loads in this process
+    cache - use and write compiled set caches, default True
+    ignore_case, inflections, others - default censor options, see set_from_file.
+                                       others only censors terms of the same file
+
+    returns:
+    LearnSet object
+    list of LoadReports, one for every file in order
+    """
+    if isinstance(files, str):
+        import glob
+        files = sorted(glob.glob(files))
+    defaults = {
+        "card_delimiter": card_delimiter,
+        "definition_delimiter": definition_delimiter,
+        "hint_delimiter": hint_delimiter,
+        "ignore_case": ignore_case,
+        "inflections": inflections,
+        "others": others
+    }
+    settings = settings or {}
+    jobs = [(file_name, defaults | settings.get(file_name, {}), cache) for file_name in files]
+    if processes == 1 or len(jobs) < 2:
+        reports = list(map(load_file, jobs))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as pool:
+            reports = list(pool.map(load_file, jobs))
+    stores = []
+    for report in reports:
+        if report.store is not None:
+            stores.append(report.store)
+        elif report.cache:
+            try:
+                stores.append(load_store(report.cache))
+            except (OSError, ValueError, struct.error) as error:
+                report.error = f"{type(error).__name__}: {error}"
+    return LearnSet(set_name, UnionStore(stores, duplicates)), reports
+
+
+def set_from_file(file_name: str, set_name: str = "default", card_delimiter: str = "\n", definition_delimiter: str = " - ", hint_delimiter: str = ". ", cache: bool = True, ignore_case: bool = False, inflections: bool = False, others: bool = False) -> LearnSet:
     """
     Create a LearnSet object from a file.
 
+    The file is streamed card by card. When cache is enabled, a compiled set is
+    saved next to the file ({file_name}.lset, see save_store) and later loads of
+    the unchanged file memory-map it instead of parsing the file again. Bad cards and
+    duplicate terms are saved with it, so they are reported by every load.
+
     variables:
     file_name - name of the file
     set_name - name of the set
     card_delimiter - delimiter of cards, default newline (\n)
     definition_delimiter - delimiter of term and definition, default tab (\t)
     hint_delimiter - delimiter of hints in definition, default period (. )
+    cache - use and write the compiled set cache, default True
+    ignore_case - censor the term in definitions in any case, default False
+    inflections - censor inflected forms of the term (terms, termed, ...), default False
+    others - censor other terms of the set in definitions, default False
 
     returns
     LearnSet object
     """
-
-    with open(f"{file_name}", "r", encoding="UTF-8") as file:
-        set = LearnSet(set_name, [], {})
-        for card in file.read().split(card_delimiter):
-            if card.startswith("\\\\"):
-                continue
-            split = card.split(definition_delimiter)
-            if len(split) == 2:
-                term, definition = split
-                set.add(LearnObject(term, definition, hint_delimiter))
-            elif len(split) == 3:
-                term, year, definition = split
-                set.add(LearnObject(term, definition, hint_delimiter, year))
-            else:
-                print(f"No data found: {card}")
+    censoring = {"ignore_case": ignore_case, "inflections": inflections, "others": others}
+    key = cache_key(file_name, card_delimiter, definition_delimiter, hint_delimiter, **censoring) if cache else None
+    report = LoadReport(file_name)
+    store = None
+    if cache:
+        try:
+            store = load_store(file_name + CACHE_SUFFIX, key, report=report)
+        except (OSError, ValueError, KeyError, struct.error):
+            report = LoadReport(file_name)
+    if store is None:
+        store = compile_file(file_name, card_delimiter, definition_delimiter, hint_delimiter, report, **censoring)
+        if cache:
+            try:
+                save_store(file_name + CACHE_SUFFIX, store, key, index=True, report=report)
+            except OSError:
+                pass
+    for _, card in report.bad_cards:
+        print(f"No data found: {card}")
+    for _, term in report.duplicates:
+        print(f"Duplicate term: {term}")
+    set = LearnSet(set_name, store)
+    if report.duplicates:
+        set.duplicates = [store[index] for index in range(len(store)) if store.index[store.keys[index]] != index]
+    if not store:
         set.set_info()
-        return set
+    return set
 
 
 def save_set_to_file(file_name: str, set: LearnSet, card_delimiter: str = "\n", definition_delimiter: str = " - ") -> None:
@@ -572,47 +5332,20 @@ def save_set_to_file(file_name: str, set: LearnSet, card_delimiter: str = "\n",
     set - LearnSet object, which will be saved
     card_delimiter - delimiter of cards, default newline (\n)
     definition_delimiter - delimiter of term and definition, default tab (\t)
+
+    Cards are written one by one with the uncensored definition and the year, when given.
+    Use save_set for a lossless binary copy with progress.
     """
     with open(f"{file_name}", "w", encoding="UTF-8") as file:
-        content = card_delimiter.join([definition_delimiter.join([card.term, card.definition]) for card in set.set])
-        file.write(content)
+        for index, card in enumerate(set.set):
+            if index:
+                file.write(card_delimiter)
+            fields = [card.term, card.raw_definition] if card.year is None else [card.term, card.year, card.raw_definition]
+            file.write(definition_delimiter.join(fields))
 
 
 
 if __name__ == "__main__":
-    example = set_from_file(
-        file_name="example.txt",
-        set_name="default",
-        card_delimiter="\n",
-        definition_delimiter=" - ",
-        hint_delimiter=". "
-    )
-
-    # learn
-    example.learn(round_length=7)
-
-    #test
-    # example.test()
-
-    # flashcards
-    # example.flashcards()
-
-    # create new set
-    example = LearnSet(name="example")
-
-    # add terms
-    example.add(
-        LearnObject(
-            term="term1", 
-            definition="Definition - hint1. hint2.", 
-            year="year1",           # optional
-            hint_delimiter=". "     # default value, optional
-        )
-    )
-
-    # optional: save set, to load later
-    # save_set_to_file(
-    #     file_name="example_set",
-    #     set=example
-    #     # optionally add custom delimiters
-    # )
\ No newline at end of file
+    from cli import main
+
+    sys.exit(main())
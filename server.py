@@ -0,0 +1,541 @@
+"""
+Classroom server for the learner.
+
+Runs many learn, test and flashcards sessions in one asyncio process. Sessions share
+read-only LearnSets, every session has its own Engine and scores.
+Sessions are used over HTTP (json) or a WebSocket, see SessionServer.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import time
+from itertools import count
+
+from learner import CACHE_SUFFIX, Engine, LearnSet, Question, Result, Scores, attach_set, set_from_file
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 1 << 20
+STATUS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class Session:
+    """
+    One learner's session.
+
+    Modes:
+    learn - questions picked by the scheduler until every term is learned
+    test - questions of a test configuration, see LearnSet.test
+    flashcards - browse the cards, answers are "k" (next), "l" (last) and "f" (flip)
+    """
+
+    def __init__(self, session_id: str, learn_set: LearnSet, mode: str = "learn", configuration: list = None, nr_options: int = 4, seed: int = None) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        session_id - id of the session
+        learn_set - shared LearnSet, it is not changed
+        mode - "learn", "test" or "flashcards"
+        configuration - test configuration, see TestGenerator
+        nr_options - number of options of multiple choice questions, at least 2
+        seed - random seed of the test, optional
+
+        Variables:
+        self.engine - Engine of the session, with its own scores
+        self.question - Question waiting for an answer, None when done
+        self.plan - questions of a test that are not asked yet, last first
+        self.card - index of the shown flashcard
+        self.flipped - True when the flashcard shows the definition
+        self.used - last time the session was used
+        """
+        if mode not in ("learn", "test", "flashcards"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if not isinstance(nr_options, int) or isinstance(nr_options, bool) or nr_options < 2:
+            raise ValueError(f"nr_options has to be an integer of at least 2: {nr_options!r}")
+        self.id = session_id
+        self.set = learn_set
+        self.mode = mode
+        self.nr_options = nr_options
+        self.engine = Engine(learn_set, Scores.detached(learn_set.set))
+        self.question: Question | None = None
+        self.plan: list[Question] = []
+        self.card = 0
+        self.flipped = False
+        self.answers = 0
+        self.used = time.monotonic()
+        if mode == "learn":
+            self.engine.start_learn(resume=True)
+            self.question = self.engine.next(nr_options)
+        elif mode == "test":
+            self.engine.start_test()
+            self.plan = learn_set.tests.generate(configuration, seed)[::-1]
+            self.question = self.next_test()
+
+    def next_test(self) -> Question | None:
+        """Next question of the test, None when the test is done."""
+        return self.plan.pop() if self.plan else None
+
+    def state(self) -> dict:
+        """Current question or flashcard, as a json-ready dictionary."""
+        if self.mode == "flashcards":
+            if not self.set.set:
+                return {"session": self.id, "card": 0, "cards": 0, "done": True}
+            self.card = min(self.card, len(self.set.set) - 1)
+            card = self.set.set[self.card]
+            return {"session": self.id, "card": self.card + 1, "cards": len(self.set.set), "text": card.definition if self.flipped else card.term}
+        if self.question is None:
+            done = {"session": self.id, "done": True}
+            if self.mode == "test":
+                done["missed"] = self.engine.missed
+            else:
+                _, done["total"], done["maximum"] = self.engine.result()
+            return done
+        return {"session": self.id, "exercise": self.question.exercise, "prompt": self.question.prompt, "options": self.question.options}
+
+    def answer(self, answer, overwrite: bool | list = None) -> dict:
+        """
+        Answer the waiting question.
+
+        variables:
+        answer - answer text, see Engine.answer, a json object of pair number and term for connect
+        overwrite - typo decision for a pending result, true or false, a list of pair numbers for connect
+
+        returns:
+        dictionary of the result and the next state
+
+        raises:
+        ValueError - when the answer is not valid, or there is no question
+        """
+        self.used = time.monotonic()
+        connect = self.question is not None and self.question.exercise == "connect"
+        if not isinstance(answer, str) and not (connect and isinstance(answer, dict)):
+            raise ValueError("The answer has to be a string, or a json object of pair numbers and terms for connect.")
+        if overwrite is not None and not isinstance(overwrite, (bool, list)):
+            raise ValueError("overwrite has to be true, false or a list of pair numbers.")
+        if self.mode == "flashcards":
+            return self.flip(answer)
+        if self.question is None:
+            raise ValueError("The session is done.")
+        if isinstance(answer, dict):
+            try:
+                answer = {int(number): given for number, given in answer.items()}
+            except ValueError:
+                raise ValueError("Pair numbers of a connect answer have to be integers.") from None
+            if not all(isinstance(given, str) for given in answer.values()):
+                raise ValueError("Terms of a connect answer have to be strings.")
+        if isinstance(overwrite, list):
+            overwrite = set(overwrite)
+        result = self.engine.answer(self.question, answer, overwrite)
+        if not result.pending:
+            self.answers += 1
+            if self.mode == "learn":
+                self.question = self.engine.next(self.nr_options)
+            else:
+                self.question = self.next_test()
+        return {"result": result_json(result), **self.state()}
+
+    def flip(self, action: str) -> dict:
+        """Move or flip the flashcard, see Session."""
+        if not self.set.set:
+            raise ValueError("The set has no cards.")
+        action = str(action).strip().lower()
+        if action == "k":
+            self.card = (self.card + 1) % len(self.set.set)
+            self.flipped = False
+        elif action == "l":
+            self.card = max(self.card - 1, 0)
+            self.flipped = False
+        elif action == "f":
+            self.flipped = not self.flipped
+        else:
+            raise ValueError("Next(K), Last(L) or Flip(F)?")
+        return self.state()
+
+
+def result_json(result: Result) -> dict:
+    """Result as a json-ready dictionary."""
+    return {
+        "correct": result.correct,
+        "expected": result.expected,
+        "typo": result.typo,
+        "meant": result.meant,
+        "pairs": result.pairs,
+        "faulty": result.faulty,
+        "pending": result.pending,
+        "score": result.score,
+    }
+
+
+class SessionServer:
+    """
+    asyncio server of many sessions.
+
+    HTTP routes, bodies are json:
+    POST /sessions                  {"set", "mode", "configuration", "nr_options", "seed"} starts a session
+    GET /sessions/{id}              current question
+    POST /sessions/{id}/answer      {"answer", "overwrite"} answers it, returns the result and the next question
+    DELETE /sessions/{id}           ends a session
+    GET /stats                      number of sessions, answers and answers per second
+    GET /ws                         WebSocket, messages are the bodies above with an "action":
+                                    "start", "state", "answer" or "end" (and "session" for the last three)
+
+    Back-pressure: new sessions are refused (503) at max_sessions, every connection handles one
+    request at a time and waits for its writes to drain. Sessions idle for idle_timeout seconds are evicted.
+    """
+
+    def __init__(self, sets: dict[str, LearnSet], max_sessions: int = 10000, idle_timeout: float = 600, max_connections: int = 1000) -> None:
+        """
+        Class initializer.
+
+        Attributes:
+        sets - dictionary of set name and LearnSet pairs, shared by the sessions
+        max_sessions - maximum number of open sessions
+        idle_timeout - seconds after which an unused session is evicted
+        max_connections - maximum number of connections handled at once, others wait
+
+        Variables:
+        self.sessions - dictionary of session id and Session pairs
+        self.answers - number of answers since start
+        self.evicted - number of evicted sessions
+        """
+        self.sets = sets
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.connections = asyncio.Semaphore(max_connections)
+        self.sessions: dict[str, Session] = {}
+        self.ids = count(1)
+        self.answers = 0
+        self.evicted = 0
+        self.started = time.monotonic()
+        self.server: asyncio.Server | None = None
+        self.evictor: asyncio.Task | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.Server:
+        """Start listening, port 0 picks a free port."""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.evictor = asyncio.create_task(self.evict_loop())
+        return self.server
+
+    async def close(self) -> None:
+        """Stop listening and evicting."""
+        if self.evictor:
+            self.evictor.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self.server.sockets[0].getsockname()[1]
+
+    async def evict_loop(self) -> None:
+        """Evict idle sessions every quarter of idle_timeout."""
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove sessions idle for longer than idle_timeout.
+
+        returns:
+        number of evicted sessions
+        """
+        limit = time.monotonic() - self.idle_timeout
+        idle = [session_id for session_id, session in self.sessions.items() if session.used < limit]
+        for session_id in idle:
+            del self.sessions[session_id]
+        self.evicted += len(idle)
+        return len(idle)
+
+    def stats(self) -> dict:
+        """Server statistics."""
+        elapsed = time.monotonic() - self.started
+        return {"sessions": len(self.sessions), "answers": self.answers, "evicted": self.evicted, "answers_per_second": self.answers / elapsed if elapsed else 0}
+
+    def dispatch(self, action: str, body: dict) -> tuple[int, dict]:
+        """
+        Run one action.
+
+        returns:
+        HTTP status code and response dictionary
+        """
+        try:
+            if action == "start":
+                if len(self.sessions) >= self.max_sessions and not self.evict():
+                    return 503, {"error": "Too many sessions."}
+                name = body.get("set") or next(iter(self.sets))
+                if name not in self.sets:
+                    return 404, {"error": f"Unknown set: {name}"}
+                session_id = str(next(self.ids))
+                session = Session(session_id, self.sets[name], body.get("mode", "learn"), body.get("configuration"), body.get("nr_options", 4), body.get("seed"))
+                self.sessions[session_id] = session
+                return 201, session.state()
+            if action == "stats":
+                return 200, self.stats()
+            session = self.sessions.get(str(body.get("session")))
+            if session is None:
+                return 404, {"error": "Unknown session."}
+            if action == "state":
+                session.used = time.monotonic()
+                return 200, session.state()
+            if action == "answer":
+                response = session.answer(body.get("answer", ""), body.get("overwrite"))
+                self.answers += 1
+                return 200, response
+            if action == "end":
+                del self.sessions[session.id]
+                return 200, {"session": session.id, "ended": True}
+            return 400, {"error": f"Unknown action: {action}"}
+        except (ValueError, TypeError) as error:
+            return 400, {"error": str(error)}
+
+    def route(self, method: str, path: str, body: dict) -> tuple[int, dict]:
+        """Map an HTTP request to an action, see dispatch."""
+        parts = path.strip("/").split("/")
+        if parts == ["sessions"] and method == "POST":
+            return self.dispatch("start", body)
+        if parts == ["stats"] and method == "GET":
+            return self.dispatch("stats", body)
+        if len(parts) >= 2 and parts[0] == "sessions":
+            body["session"] = parts[1]
+            if len(parts) == 2 and method == "GET":
+                return self.dispatch("state", body)
+            if len(parts) == 2 and method == "DELETE":
+                return self.dispatch("end", body)
+            if parts[2:] == ["answer"] and method == "POST":
+                return self.dispatch("answer", body)
+            return 405, {"error": "Method not allowed."}
+        return 404, {"error": "Not found."}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle one connection, requests are read one at a time (keep-alive)."""
+        async with self.connections:
+            try:
+                while True:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                        await self.websocket(reader, writer, headers)
+                        break
+                    status, response = self.parse_and_route(method, path, body)
+                    await write_response(writer, status, response)
+                    if headers.get("connection", "").lower() == "close":
+                        break
+            except ValueError as error:
+                try:
+                    await write_response(writer, 400, {"error": str(error)})
+                except ConnectionError:
+                    pass
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                pass
+            finally:
+                writer.close()
+
+    def parse_and_route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        """Parse the json body and route the request."""
+        if len(body) > MAX_BODY:
+            return 413, {"error": "Body too large."}
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "Body is not json."}
+        if not isinstance(data, dict):
+            return 400, {"error": "Body is not a json object."}
+        return self.route(method, path, data)
+
+    async def websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict) -> None:
+        """Serve json messages over a WebSocket, see SessionServer."""
+        accept = base64.b64encode(hashlib.sha1((headers.get("sec-websocket-key", "") + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+        await writer.drain()
+        while True:
+            opcode, payload = await read_frame(reader)
+            if opcode == 8:
+                writer.write(frame(b"", 8))
+                await writer.drain()
+                return
+            if opcode == 9:
+                writer.write(frame(payload, 10))
+            elif opcode == 1:
+                try:
+                    data = json.loads(payload)
+                    status, response = self.dispatch(data.pop("action", ""), data) if isinstance(data, dict) else (400, {"error": "Message is not a json object."})
+                except ValueError:
+                    status, response = 400, {"error": "Message is not json."}
+                response["status"] = status
+                writer.write(frame(json.dumps(response).encode()))
+            await writer.drain()
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict, bytes] | None:
+    """
+    Read one HTTP request.
+
+    returns:
+    method, path, dictionary of lowercased header names and values, body
+    None when the connection is closed
+
+    raises:
+    ValueError - when the request line or the Content-Length is malformed
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("Malformed request line.") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ValueError("Content-Length is not a number.") from None
+    if length < 0:
+        raise ValueError("Content-Length is negative.")
+    if length > MAX_BODY:
+        raise ConnectionError("Body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+async def write_response(writer: asyncio.StreamWriter, status: int, response: dict) -> None:
+    """Write a json HTTP response and wait until it is sent."""
+    body = json.dumps(response).encode()
+    writer.write(f"HTTP/1.1 {status} {STATUS.get(status, '')}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """
+    Read one WebSocket frame, fragmented messages are not supported.
+
+    returns:
+    opcode and unmasked payload
+    """
+    first, second = await reader.readexactly(2)
+    length = second & 127
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_BODY:
+        raise ConnectionError("Frame too large.")
+    mask = await reader.readexactly(4) if second & 128 else b""
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    return first & 15, payload
+
+
+def frame(payload: bytes, opcode: int = 1, mask: bytes = b"") -> bytes:
+    """Encode a WebSocket frame. Clients have to mask their frames."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 128 | opcode, length | (128 if mask else 0))
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 128 | opcode, 126 | (128 if mask else 0), length)
+    else:
+        header = struct.pack("!BBQ", 128 | opcode, 127 | (128 if mask else 0), length)
+    if mask:
+        payload = mask + bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    return header + payload
+
+
+async def scripted_client(host: str, port: int, answers: int, mode: str = "learn") -> int:
+    """
+    Scripted learner for testing, answers over one keep-alive HTTP connection.
+
+    The expected answer is not sent to clients, so the client guesses from the options,
+    or answers with the first option.
+
+    variables:
+    answers - maximum number of answers
+    mode - session mode, see Session
+
+    returns:
+    number of answers given
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(method: str, path: str, body: dict = None) -> dict:
+        data = json.dumps(body or {}).encode()
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+        await writer.drain()
+        _, _, _, response = await read_request(reader)  # the status line parses like a request line
+        return json.loads(response)
+
+    state = await request("POST", "/sessions", {"mode": mode})
+    session = state["session"]
+    given = 0
+    try:
+        while given < answers and not state.get("done") and "error" not in state:
+            answer = state["options"][0] if state.get("options") else "t"
+            if state.get("exercise") == "connect":
+                answer = ", ".join(f"{number} {term}" for number, term in enumerate(state["options"], 1))
+            state = await request("POST", f"/sessions/{session}/answer", {"answer": answer, "overwrite": False})
+            given += 1
+        await request("DELETE", f"/sessions/{session}")
+    finally:
+        writer.close()
+    return given
+
+
+async def benchmark(learn_set: LearnSet, clients: int = 1000, answers: int = 50) -> dict:
+    """
+    Run a server and many scripted clients in one process.
+
+    returns:
+    dictionary of clients, answers, seconds and answers per second
+    """
+    server = SessionServer({learn_set.name: learn_set}, max_sessions=clients)
+    await server.start(port=0)
+    start = time.perf_counter()
+    given = await asyncio.gather(*(scripted_client("127.0.0.1", server.port, answers) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+    return {"clients": clients, "answers": sum(given), "seconds": elapsed, "answers_per_second": sum(given) / elapsed}
+
+
+def main(argv: list[str] = None) -> None:
+    """Command line entry point: serve set files, or benchmark with scripted clients."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve learn sessions over HTTP and WebSocket.")
+    parser.add_argument("files", nargs="+", help="set files, or sets published with publish_set ending with .lset, the file name is the set name")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=600)
+    parser.add_argument("--benchmark", type=int, metavar="CLIENTS", help="run scripted clients instead of serving")
+    arguments = parser.parse_args(argv)
+    sets = {name: attach_set(name, name) if name.endswith(CACHE_SUFFIX) else set_from_file(name, set_name=name) for name in arguments.files}
+    if arguments.benchmark:
+        print(json.dumps(asyncio.run(benchmark(next(iter(sets.values())), arguments.benchmark))))
+        return
+
+    async def serve() -> None:
+        server = SessionServer(sets, arguments.max_sessions, arguments.idle_timeout)
+        await server.start(arguments.host, arguments.port)
+        print(f"Serving {', '.join(sets)} on http://{arguments.host}:{server.port}")
+        await server.server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
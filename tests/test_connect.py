@@ -0,0 +1,53 @@
+"""Tests of connect answers, see Engine.parse_pairs."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import Engine, LearnSet
+
+
+@pytest.mark.parametrize("answer, pairs", [
+    ("1 term1, 2 term2", {1: "term1", 2: "term2"}),
+    ("1. term1; 2: term2\n3) term3", {1: "term1", 2: "term2", 3: "term3"}),
+    ("  1   two words  ,2 term2,", {1: "two words", 2: "term2"}),
+    ("12 term12", {12: "term12"}),
+    ("1 term1, 1 again", {1: "again"}),
+    ("", {}),
+])
+def test_pairs(answer, pairs):
+    assert Engine.parse_pairs(answer) == (pairs, [])
+
+
+@pytest.mark.parametrize("answer, pairs, faulty", [
+    ("1 term1, term2", {1: "term1"}, ["term2"]),
+    ("x term1; 2term2", {}, ["x term1", "2term2"]),
+    ("1, 2 term2", {2: "term2"}, ["1"]),
+])
+def test_faulty_pairs(answer, pairs, faulty):
+    assert Engine.parse_pairs(answer) == (pairs, faulty)
+
+
+def test_connect_answer():
+    learn_set = LearnSet("connect")
+    for number in range(1, 5):
+        learn_set.add_card(f"term{number}", f"definition {number}")
+    question = learn_set.engine.ask("connect", 4)
+    answer = ", ".join(f"{number} {card.term}" for number, card in enumerate(question.cards, 1))
+    assert learn_set.engine.answer(question, answer).correct
+
+
+def test_faulty_pairs_are_answered_again():
+    learn_set = LearnSet("connect")
+    for number in range(1, 5):
+        learn_set.add_card(f"term{number}", f"definition {number}")
+    question = learn_set.engine.ask("connect", 4)
+    terms = [card.term for card in question.cards]
+    result = learn_set.engine.answer(question, f"1 {terms[0]}, 2 {terms[1]}, nonsense")
+    assert result.pending
+    assert result.faulty == ["nonsense"]
+    result = learn_set.engine.answer(question, f"3 {terms[2]}; 4 {terms[3]}")
+    assert not result.pending
+    assert result.correct
@@ -0,0 +1,81 @@
+"""Tests of the progress journal, see ProgressJournal."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import ProgressJournal
+
+
+def written(tmp_path, **options) -> str:
+    """Write a journal with a few answers and a truncated last line, returns the file name."""
+    file_name = str(tmp_path / "progress")
+    journal = ProgressJournal(file_name, **options)
+    journal.append("term1", "write", True, 1)
+    journal.append("term2", "write", False, 0)
+    journal.append("term1", "multiple_choice", True, 2)
+    journal.close()
+    with open(file_name + ".journal", "a", encoding="UTF-8") as file:
+        file.write('{"term": "term3", "exercise": "wri')
+    return file_name
+
+
+def test_replay_skips_a_truncated_last_line(tmp_path):
+    journal = ProgressJournal(written(tmp_path))
+    assert journal.scores == {"term1": 2, "term2": 0}
+    assert journal.seq == 3
+    journal.close()
+
+
+def test_append_after_a_truncated_last_line(tmp_path):
+    file_name = written(tmp_path)
+    journal = ProgressJournal(file_name)
+    journal.append("term3", "write", True, 1)
+    journal.close()
+    journal = ProgressJournal(file_name)
+    assert journal.scores == {"term1": 2, "term2": 0, "term3": 1}
+    assert journal.seq == 4
+    journal.close()
+
+
+def test_compaction_after_a_truncated_last_line(tmp_path):
+    file_name = written(tmp_path)
+    journal = ProgressJournal(file_name)
+    journal.append("term3", "write", True, 1)
+    journal.compact()
+    journal.close()
+    assert os.path.getsize(file_name + ".journal") == 0
+    journal = ProgressJournal(file_name)
+    assert journal.scores == {"term1": 2, "term2": 0, "term3": 1}
+    journal.reset()
+    journal.append("term2", "write", True, 1)
+    journal.close()
+    journal = ProgressJournal(file_name)
+    assert journal.scores == {"term2": 1}
+    assert journal.seq == 6
+    journal.close()
+
+
+def test_automatic_compaction(tmp_path):
+    file_name = str(tmp_path / "progress")
+    journal = ProgressJournal(file_name, batch_size=2, compact_every=4)
+    for score in range(1, 10):
+        journal.append("term1", "write", True, score)
+    journal.close()
+    assert os.path.exists(file_name + ".snapshot")
+    journal = ProgressJournal(file_name)
+    assert journal.scores == {"term1": 9}
+    assert journal.seq == 9
+    journal.close()
+
+
+def test_unterminated_complete_last_line(tmp_path):
+    file_name = str(tmp_path / "progress")
+    with open(file_name + ".journal", "w", encoding="UTF-8") as file:
+        file.write('{"term": "term1", "score": 2, "seq": 1}')
+    journal = ProgressJournal(file_name)
+    journal.append("term2", "write", True, 1)
+    journal.close()
+    journal = ProgressJournal(file_name)
+    assert journal.scores == {"term1": 2, "term2": 1}
+    journal.close()
@@ -0,0 +1,126 @@
+"""Tests of malformed input to the session server, every one is answered with 400."""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import LearnSet
+from server import SessionServer
+
+
+def learn_set(cards: int = 9) -> LearnSet:
+    """Set of cards term1 ... termN."""
+    learn_set = LearnSet("server")
+    for number in range(1, cards + 1):
+        learn_set.add_card(f"term{number}", f"definition {number}")
+    return learn_set
+
+
+async def send(port: int, data: bytes) -> tuple[int, dict]:
+    """Send raw bytes, returns the status and json body of the response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def post(path: str, body) -> bytes:
+    """Raw POST request with a json body."""
+    data = json.dumps(body).encode()
+    return f"POST {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+
+
+def serve(test, cards: int = 9):
+    """Run test(server, port) against a running server."""
+    async def main():
+        server = SessionServer({"server": learn_set(cards)})
+        await server.start(port=0)
+        try:
+            await test(server, server.port)
+        finally:
+            await server.close()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("data", [
+    b"GARBAGE\r\n\r\n",
+    b"GET /stats HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+    b"GET /stats HTTP/1.1\r\nContent-Length: -3\r\n\r\n",
+    b"POST /sessions HTTP/1.1\r\nConnection: close\r\nContent-Length: 5\r\n\r\n{nope",
+    b"POST /sessions HTTP/1.1\r\nConnection: close\r\nContent-Length: 2\r\n\r\n[]",
+])
+def test_malformed_requests(data):
+    async def test(server, port):
+        status, response = await send(port, data)
+        assert status == 400
+        assert "error" in response
+    serve(test)
+
+
+@pytest.mark.parametrize("answer", [5, None, ["term1"], {"1": "term1"}, True])
+def test_bad_answer_types(answer):
+    async def test(server, port):
+        status, state = await send(port, post("/sessions", {"mode": "learn"}))
+        assert status == 201 and state["exercise"] != "connect"
+        status, response = await send(port, post(f"/sessions/{state['session']}/answer", {"answer": answer}))
+        assert status == 400
+        status, _ = await send(port, f"GET /sessions/{state['session']} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+        assert status == 200
+    serve(test)
+
+
+@pytest.mark.parametrize("answer", [{"x": "term1"}, {"1": 5}, 5, None])
+def test_bad_connect_answers(answer):
+    async def test(server, port):
+        _, state = await send(port, post("/sessions", {"mode": "test", "configuration": [["connect", 4]]}))
+        assert state["exercise"] == "connect"
+        status, _ = await send(port, post(f"/sessions/{state['session']}/answer", {"answer": answer}))
+        assert status == 400
+    serve(test)
+
+
+def test_connect_answer_object():
+    async def test(server, port):
+        _, state = await send(port, post("/sessions", {"mode": "test", "configuration": [["connect", 4]], "seed": 1}))
+        question = server.sessions[state["session"]].question
+        answer = {str(number): card.term for number, card in enumerate(question.cards, 1)}
+        status, response = await send(port, post(f"/sessions/{state['session']}/answer", {"answer": answer}))
+        assert status == 200
+        assert response["result"]["correct"]
+    serve(test)
+
+
+@pytest.mark.parametrize("body", [
+    {"mode": "test", "configuration": [{"count": 3}]},
+    {"mode": "test", "configuration": [["bogus"]]},
+    {"mode": "test", "configuration": [["bogus", 3]]},
+    {"mode": "test", "configuration": [["write", -1]]},
+    {"mode": "test", "configuration": [["write", "3"]]},
+    {"mode": "test", "configuration": [{"exercise": "multiple_choice", "options": 1}]},
+    {"mode": "test", "configuration": {"write": 3}},
+    {"mode": "learn", "nr_options": 1},
+    {"mode": "learn", "nr_options": -3},
+    {"mode": "bogus"},
+])
+def test_bad_sessions(body):
+    async def test(server, port):
+        status, response = await send(port, post("/sessions", body))
+        assert status == 400
+        assert not server.sessions
+    serve(test)
+
+
+def test_flashcards_of_an_empty_set():
+    async def test(server, port):
+        status, state = await send(port, post("/sessions", {"mode": "flashcards"}))
+        assert status == 201 and state["done"]
+        status, _ = await send(port, post(f"/sessions/{state['session']}/answer", {"answer": "k"}))
+        assert status == 400
+    serve(test, cards=0)
@@ -0,0 +1,40 @@
+"""Tests of sets shared between processes, see publish_set and attach_set."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import LearnObject, LearnSet, Scores, attach_set, publish_set
+
+
+def published(tmp_path) -> str:
+    """Publish a small set, returns the file name."""
+    learn_set = LearnSet("shared")
+    for number in range(1, 6):
+        learn_set.add_card(f"term{number}", f"definition {number}")
+    file_name = str(tmp_path / "shared.lset")
+    publish_set(file_name, learn_set)
+    return file_name
+
+
+def test_add_after_attach(tmp_path):
+    learn_set = attach_set(published(tmp_path))
+    learn_set.add(LearnObject("term6", "definition 6"))
+    learn_set.add_card("term7", "definition 7")
+    assert len(learn_set.set) == 7
+    assert learn_set.correct["term6"] == 0
+    learn_set.correct["term7"] = 2
+    assert learn_set.correct["term7"] == 2
+    learn_set.engine.start_learn()
+    question = learn_set.engine.next()
+    assert question is not None
+
+
+def test_detached_scores_grow_with_the_store(tmp_path):
+    learn_set = attach_set(published(tmp_path))
+    session = Scores.detached(learn_set.set)
+    learn_set.add_card("term6", "definition 6")
+    session["term6"] = 3
+    assert session["term6"] == 3
+    assert learn_set.correct["term6"] == 0
+    assert len(session.column) == len(learn_set.set)
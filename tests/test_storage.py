@@ -0,0 +1,62 @@
+"""Tests of binary sets, see save_set, load_set and the compiled set cache of set_from_file."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import LearnSet, load_set, save_set, set_from_file
+
+
+def cards(learn_set: LearnSet) -> list[tuple]:
+    """Everything a card keeps, in card order."""
+    return [(card.term, card.year, card.definition, card.raw_definition, card.hints, learn_set.correct[card.term]) for card in learn_set.set]
+
+
+def test_round_trip(tmp_path):
+    learn_set = LearnSet("stored")
+    learn_set.add_card("term1", "the term1 is first. hint1", year="1990")
+    learn_set.add_card("term2", "definition 2")
+    learn_set.add_card("Term3", "a term3 and TERM3 again. hint2. hint3", year="2000")
+    learn_set.add_card("term4", "definition; hint4", hint_delimiter="; ")
+    learn_set.correct["term1"] = 2
+    learn_set.correct["Term3"] = -1
+    file_name = str(tmp_path / "stored.lset")
+    save_set(file_name, learn_set)
+    loaded = load_set(file_name, "stored")
+    assert cards(loaded) == cards(learn_set)
+    assert loaded.set[0].definition == "the ___ is first. hint1"
+    assert loaded.set[0].raw_definition == "the term1 is first. hint1"
+    assert loaded.set[1].year is None
+
+
+def test_round_trip_of_replaced_texts(tmp_path):
+    source = tmp_path / "cards.txt"
+    source.write_text("Paris - paris is the capital. PARIS\nrome - 1946 - Rome became a republic\n", encoding="UTF-8")
+    learn_set = set_from_file(str(source), ignore_case=True, cache=False)
+    learn_set.correct["rome"] = 4
+    file_name = str(tmp_path / "cards.lset")
+    save_set(file_name, learn_set)
+    loaded = load_set(file_name)
+    assert cards(loaded) == cards(learn_set)
+    assert loaded.set[0].raw_definition == "paris is the capital. PARIS"
+    assert loaded.set[1].year == "1946"
+
+
+def test_empty_round_trip(tmp_path):
+    file_name = str(tmp_path / "empty.lset")
+    save_set(file_name, LearnSet("empty"))
+    assert len(load_set(file_name).set) == 0
+
+
+def test_cache_reports_bad_cards_and_duplicates(tmp_path, capsys):
+    source = tmp_path / "cards.txt"
+    source.write_text("term1 - definition 1\nbroken\nterm2 - definition 2\nterm1 - definition 3\n", encoding="UTF-8")
+    first = set_from_file(str(source))
+    printed = capsys.readouterr().out
+    assert os.path.exists(str(source) + ".lset")
+    second = set_from_file(str(source))
+    assert capsys.readouterr().out == printed
+    assert "No data found: broken" in printed
+    assert "Duplicate term: term1" in printed
+    assert cards(second) == cards(first)
+    assert [card.term for card in second.duplicates] == [card.term for card in first.duplicates]
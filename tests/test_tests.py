@@ -0,0 +1,64 @@
+"""Tests of generated tests, see TestGenerator."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import LearnSet
+
+CONFIGURATION = [
+    ("true_false", 4),
+    {"exercise": "multiple_choice", "count": 4, "difficulty": "hard", "options": 5},
+    ("connect", 6),
+    ("write", 4),
+    {"exercise": "year", "count": 3},
+]
+
+
+def learn_set(cards: int = 40) -> LearnSet:
+    """Set of cards term1 ... termN, every other card has a year."""
+    learn_set = LearnSet("tests")
+    for number in range(1, cards + 1):
+        learn_set.add_card(f"term{number}", f"definition {number}", year=str(1900 + number) if number % 2 else None)
+    return learn_set
+
+
+def asked(questions) -> list[tuple]:
+    """What a test asks, in question order."""
+    return [(question.exercise, question.prompt, question.options, [card.term for card in question.cards] if question.cards else question.card.term) for question in questions]
+
+
+def terms(questions) -> list[str]:
+    """Terms of the cards asked, connect pairs included."""
+    return [card.term for question in questions for card in (question.cards or [question.card])]
+
+
+def test_same_seed_same_test():
+    tests = learn_set().tests
+    first = tests.generate(CONFIGURATION, seed=7)
+    assert asked(tests.generate(CONFIGURATION, seed=7)) == asked(first)
+    assert asked(learn_set().tests.generate(CONFIGURATION, seed=7)) == asked(first)
+    assert asked(tests.generate(CONFIGURATION, seed=8)) != asked(first)
+
+
+def test_variants():
+    tests = learn_set().tests
+    variants = tests.variants(3, CONFIGURATION, seed=5)
+    assert [asked(test) for test in variants] == [asked(tests.generate(CONFIGURATION, seed)) for seed in (5, 6, 7)]
+
+
+def test_no_repeated_terms():
+    for seed in range(20):
+        questions = learn_set().tests.generate(CONFIGURATION, seed)
+        assert [question.exercise for question in questions].count("connect") == 1
+        asked_terms = terms(questions)
+        assert len(asked_terms) == 4 + 4 + 6 + 4 + 3
+        assert len(set(asked_terms)) == len(asked_terms)
+
+
+def test_connect_terms_differ_in_a_small_set():
+    for seed in range(20):
+        questions = learn_set(5).tests.generate([("write", 4), ("connect", 8)], seed)
+        connect = questions[-1]
+        assert len(connect.cards) == 5
+        assert len({card.term for card in connect.cards}) == 5
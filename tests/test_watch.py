@@ -0,0 +1,59 @@
+"""Tests of reloading edited set files, see LearnSet.watch and SetWatcher."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learner import set_from_file
+
+
+def write(path, lines: list[str]) -> None:
+    """Write the cards and move the modification time forward, so the edit is noticed."""
+    path.write_text("\n".join(lines) + "\n", encoding="UTF-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+
+def cards(learn_set) -> list[tuple]:
+    """Everything a card keeps, in card order."""
+    return [(card.term, card.year, card.definition, card.raw_definition, card.hints) for card in learn_set.set]
+
+
+@pytest.mark.parametrize("others", [False, True])
+def test_edits_match_a_full_reparse(tmp_path, others):
+    path = tmp_path / "cards.txt"
+    lines = [f"word{number} - word{number} follows word{number - 1}. hint {number}" for number in range(50)]
+    write(path, lines)
+    learn_set = set_from_file(str(path), cache=False, others=others)
+    learn_set.watch(str(path), others=others)
+    learn_set.correct["word20"] = 3
+
+    lines[20] = "word20 - 1999 - changed, mentions word3"
+    lines.insert(30, "newterm - a new term after word29")
+    del lines[40]
+    write(path, lines)
+    report = learn_set.reload()
+    # word40 mentions the removed word39, which is no longer censored as another term
+    assert report.changed == (["word20", "word40"] if others else ["word20"])
+    assert report.added == ["newterm"]
+    assert report.removed == ["word39"]
+    assert cards(learn_set) == cards(set_from_file(str(path), cache=False, others=others))
+    assert learn_set.correct["word20"] == 3
+
+    lines[5] = "word5 - now mentions newterm"
+    lines[30] = "renamed - was newterm"
+    write(path, lines)
+    report = learn_set.reload()
+    assert report.added == ["renamed"]
+    assert report.removed == ["newterm"]
+    assert cards(learn_set) == cards(set_from_file(str(path), cache=False, others=others))
+
+
+def test_unchanged_file(tmp_path):
+    path = tmp_path / "cards.txt"
+    write(path, ["term1 - definition 1", "term2 - definition 2"])
+    learn_set = set_from_file(str(path), cache=False)
+    learn_set.watch(str(path))
+    assert learn_set.reload() is None